@@ -0,0 +1,7 @@
+"""
+Performance benchmarks for the viewer's data paths (query building,
+fetching, streaming, formatting, rendering, export, catalog loading and
+table search) against a throwaway or existing PostgreSQL server.
+
+Run with `python -m benchmarks --help`; see run.py.
+"""
@@ -0,0 +1,261 @@
+import os
+import tempfile
+from typing import Callable, List
+
+from src.catalog import CatalogCache
+from src.database import DatabaseConnection
+from src.models import Filter, SortCriterion
+from src.params import QueryParams
+from src.query_builder import build_export_query, build_grid_query
+from src.results import ResultSet
+from src.search import TrigramIndex
+
+from .harness import Measurement, Work, describe, measure, skipped
+from .seed import CATALOG_SCHEMA, SCHEMA, catalog_table_names, rows_table
+
+# The cases mirror what the UI does: grid pages go through build_grid_query
+# and DatabaseConnection.execute_query exactly like DatabaseQueryGUI.build_query,
+# manual queries through stream_query, exports through copy_to and the table
+# search box through TrigramIndex.search.
+
+SEARCH_QUERIES = {
+    "exact": None,  # filled in with a real table name
+    "substring": "invoice",
+    "short_prefix": "cu",
+    "typo": "custmer_ordr",
+    "column": "payment_total",
+    "schema_qualified": f"{CATALOG_SCHEMA}.ledger",
+}
+
+
+class Suite:
+    def __init__(self, db: DatabaseConnection, sizes: List[int], doc_rows: int, catalog_tables: int,
+                 repeat: int = 5, log=print):
+        self.db = db
+        self.sizes = sizes
+        self.doc_rows = doc_rows
+        self.catalog_tables = catalog_tables
+        self.repeat = repeat
+        self.log = log
+        self.measurements: List[Measurement] = []
+
+    def _record(self, m: Measurement):
+        self.measurements.append(m)
+        self.log(describe(m))
+
+    def run(self, only: Callable[[str], bool] = lambda name: True) -> List[Measurement]:
+        for name, case in (
+            ("build_query", self.bench_build_query),
+            ("fetch", self.bench_fetch),
+            ("stream", self.bench_stream),
+            ("format", self.bench_format),
+            ("docs", self.bench_docs),
+            ("render", self.bench_render),
+            ("export", self.bench_export),
+            ("catalog", self.bench_catalog),
+            ("search", self.bench_search),
+        ):
+            if only(name):
+                case()
+        return self.measurements
+
+    # --- Query building ---
+
+    def bench_build_query(self):
+        filters = [Filter(1, "v", ">", "100"), Filter(2, "t", "ILIKE", "ab"), Filter(3, "id", "IN", "1,2,3,4,5")]
+        sorting = [SortCriterion("created", "DESC")]
+
+        def body() -> Work:
+            for page in range(1000):
+                build_grid_query(SCHEMA, "rows", filters, sorting, 50, primary_key=["id"],
+                                 after_values=[page, page], params=QueryParams())
+            return 1000, 0
+
+        self._record(measure("build_query", body, {"calls": 1000}, repeat=self.repeat))
+
+    # --- Fetching ---
+
+    def _grid_page(self, table: str, limit: int, after=None, **wide) -> ResultSet:
+        params = QueryParams()
+        query = build_grid_query(SCHEMA, table, [], [], limit, primary_key=["id"],
+                                 after_values=after, row_offset=0, params=params, **wide)
+        result = self.db.execute_query(query, params=params.values, timeout_ms=0)
+        if result.is_error:
+            raise RuntimeError(result.error)
+        return result
+
+    def bench_fetch(self):
+        for size in self.sizes:
+            table = rows_table(size)
+            for limit in (50, 10_000):
+                if limit > size:
+                    continue
+
+                def body(limit=limit, table=table) -> Work:
+                    result = self._grid_page(table, limit)
+                    return len(result), 0
+
+                self._record(measure("fetch_page", body, {"table": table, "limit": limit}, repeat=self.repeat))
+
+            # Keyset paging: the last page should cost what the first does.
+            def deep(table=table, size=size) -> Work:
+                return len(self._grid_page(table, 50, after=[size - 50])), 0
+
+            self._record(measure("fetch_last_page", deep, {"table": table, "limit": 50}, repeat=self.repeat))
+
+    def bench_stream(self):
+        for size in self.sizes:
+            table = rows_table(size)
+            if size > 1_000_000:
+                self._record(skipped("stream_all", "over 1M rows; covered by export", {"table": table}))
+                continue
+
+            def body(table=table) -> Work:
+                rows = 0
+                for batch in self.db.stream_query(f"SELECT * FROM {SCHEMA}.{table}", batch_size=1000, timeout_ms=0):
+                    if batch.is_error:
+                        raise RuntimeError(batch.error)
+                    rows += len(batch)
+                return rows, 0
+
+            self._record(measure("stream_all", body, {"table": table},
+                                 repeat=max(1, self.repeat // 2), trace_memory=size <= 100_000))
+
+    # --- Formatting and rendering ---
+
+    def bench_format(self):
+        table = rows_table(max(self.sizes))
+        result = self._grid_page(table, 10_000)
+
+        def body() -> Work:
+            for _ in result.formatted_rows():
+                pass
+            return len(result), 0
+
+        self._record(measure("format_rows", body, {"table": table, "rows": len(result)}, repeat=self.repeat))
+
+    def bench_docs(self):
+        rows = min(self.doc_rows, 500)
+
+        def fetch() -> Work:
+            result = self._grid_page("docs", rows)
+            return len(result), 0
+
+        self._record(measure("fetch_docs", fetch, {"rows": rows, "keys": 200}, repeat=self.repeat))
+
+        # Wide-column mode: previews of the documents plus their sizes.
+        def fetch_truncated() -> Work:
+            result = self._grid_page("docs", rows, columns=["id", "body"], truncate=["body"])
+            return len(result), 0
+
+        self._record(measure("fetch_docs_truncated", fetch_truncated, {"rows": rows, "keys": 200}, repeat=self.repeat))
+
+        result = self._grid_page("docs", rows)
+
+        def format_cells() -> Work:
+            size = sum(len(text) for text in result.formatted_column(result.column_names.index("body")))
+            return len(result), size
+
+        self._record(measure("format_docs", format_cells, {"rows": rows, "keys": 200}, repeat=self.repeat))
+
+    def bench_render(self):
+        """VirtualGrid set_result and scrolling; needs a display (e.g. run under xvfb-run)."""
+        try:
+            import tkinter as tk
+            root = tk.Tk()
+        except Exception as e:
+            self._record(skipped("render", f"no Tk display ({e.__class__.__name__})"))
+            return
+        from src.ui.components import VirtualGrid
+
+        try:
+            root.geometry("1200x800")
+            grid = VirtualGrid(root, columns=[])
+            grid.pack(fill="both", expand=True)
+            table = rows_table(max(self.sizes))
+            result = self._grid_page(table, 10_000)
+            grid.tree["columns"] = result.column_names
+            root.update()
+
+            def show() -> Work:
+                grid.set_result(result)
+                root.update_idletasks()
+                return grid.visible_rows(), 0
+
+            self._record(measure("render_set_result", show, {"rows": len(result)}, repeat=self.repeat))
+
+            def scroll() -> Work:
+                for step in range(100):
+                    grid.scroll_to(step * 97)
+                    root.update_idletasks()
+                return 100 * grid.visible_rows(), 0
+
+            self._record(measure("render_scroll", scroll, {"steps": 100}, repeat=self.repeat))
+        finally:
+            root.destroy()
+
+    # --- Export ---
+
+    def bench_export(self):
+        for size in self.sizes:
+            table = rows_table(size)
+            query = build_export_query(SCHEMA, table, [], [SortCriterion("id")])
+
+            def body(query=query) -> Work:
+                sink = _CountingSink()
+                rows = self.db.copy_to(query, sink, timeout_ms=0)
+                return rows, sink.bytes
+
+            self._record(measure("export_copy", body, {"table": table},
+                                 repeat=max(1, self.repeat // 2), trace_memory=size <= 1_000_000))
+
+    # --- Catalog and search ---
+
+    def bench_catalog(self):
+        """Cold catalog load (bulk pg_catalog queries) into an empty cache directory."""
+        def body() -> Work:
+            with tempfile.TemporaryDirectory() as cache_dir:
+                catalog = CatalogCache(lambda q: self.db.execute_query(q, lane="metadata", timeout_ms=0),
+                                       "bench", cache_dir=cache_dir)
+                catalog.refresh()
+                size = os.path.getsize(catalog.cache_path) if os.path.exists(catalog.cache_path) else 0
+                return len(catalog.relations()), size
+
+        self._record(measure("catalog_load", body, {"tables": self.catalog_tables},
+                             repeat=max(1, self.repeat // 2)))
+
+    def bench_search(self):
+        relations = self.db.get_relations({CATALOG_SCHEMA})
+        entries = [(rel.schema, rel.name, [c.name for c in rel.columns]) for rel in relations]
+        if not entries:
+            self._record(skipped("search", f"no tables in {CATALOG_SCHEMA}"))
+            return
+
+        def build() -> Work:
+            TrigramIndex().sync(entries)
+            return len(entries), 0
+
+        self._record(measure("search_index_build", build, {"tables": len(entries)}, repeat=self.repeat))
+
+        index = TrigramIndex()
+        index.sync(entries)
+        queries = dict(SEARCH_QUERIES, exact=catalog_table_names(self.catalog_tables)[len(entries) // 2])
+        for kind, query in queries.items():
+            def body(query=query) -> Work:
+                for _ in range(100):
+                    index.search(query)
+                return 100, 0
+
+            self._record(measure("search_query", body, {"kind": kind, "tables": len(entries), "calls": 100},
+                                 repeat=self.repeat, trace_memory=False))
+
+
+class _CountingSink:
+    """Binary file stand-in that only counts what COPY writes."""
+
+    def __init__(self):
+        self.bytes = 0
+
+    def write(self, data) -> int:
+        self.bytes += len(data)
+        return len(data)
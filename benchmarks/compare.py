@@ -0,0 +1,65 @@
+"""
+Compare two benchmark result files case by case.
+
+    python -m benchmarks.compare OLD.json NEW.json [--threshold 0.10]
+
+Prints the median latency ratio (new / old) for every case present in both
+files and exits with status 1 if any case got slower by more than the
+threshold, so it can gate CI.
+"""
+import argparse
+import json
+import sys
+from typing import Dict
+
+
+def load(path: str) -> Dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def medians(run: Dict) -> Dict[str, float]:
+    return {
+        m["key"]: m["latency_ms"]["median"]
+        for m in run["measurements"]
+        if not m.get("skipped") and m["latency_ms"].get("median")
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="relative slowdown counted as a regression (default 0.10 = 10%%)")
+    args = parser.parse_args(argv)
+
+    old_run, new_run = load(args.old), load(args.new)
+    old, new = medians(old_run), medians(new_run)
+    print(f"old: {old_run['commit'][:10]}{' (dirty)' if old_run['dirty'] else ''}  "
+          f"new: {new_run['commit'][:10]}{' (dirty)' if new_run['dirty'] else ''}")
+    if old_run.get("profile") != new_run.get("profile"):
+        print(f"warning: different profiles ({old_run.get('profile')} vs {new_run.get('profile')})")
+
+    regressions = 0
+    for key in sorted(old.keys() & new.keys()):
+        ratio = new[key] / old[key]
+        if ratio > 1 + args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        elif ratio < 1 - args.threshold:
+            flag = "  faster"
+        else:
+            flag = ""
+        print(f"{key:<60} {old[key]:>10.3f} -> {new[key]:>10.3f} ms  x{ratio:.2f}{flag}")
+    for key in sorted(old.keys() - new.keys()):
+        print(f"{key:<60} only in old")
+    for key in sorted(new.keys() - old.keys()):
+        print(f"{key:<60} only in new")
+
+    print(f"{regressions} regression(s) over {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
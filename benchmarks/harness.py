@@ -0,0 +1,162 @@
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# A benchmark body returns the amount of work it did: (rows, bytes). Either may be 0.
+Work = Tuple[int, int]
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@dataclass
+class Measurement:
+    """Timings of one benchmark case. Throughput is computed from the median run."""
+    name: str
+    params: Dict[str, Any]
+    runs: int
+    latency_ms: Dict[str, float]
+    rows: int = 0
+    bytes: int = 0
+    rows_per_s: Optional[float] = None
+    mb_per_s: Optional[float] = None
+    peak_alloc_mb: Optional[float] = None
+    skipped: Optional[str] = None
+
+    @property
+    def key(self) -> str:
+        """Identifies the same case across result files."""
+        params = ",".join(f"{k}={v}" for k, v in sorted(self.params.items()))
+        return f"{self.name}[{params}]" if params else self.name
+
+
+@dataclass
+class BenchmarkRun:
+    """One invocation of the suite: environment plus every measurement."""
+    commit: str
+    dirty: bool
+    started_at: str
+    python: str
+    platform: str
+    server_version: str
+    profile: str
+    measurements: List[Measurement] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["measurements"] = [dict(asdict(m), key=m.key) for m in self.measurements]
+        return data
+
+    def save(self, directory: str) -> str:
+        os.makedirs(directory, exist_ok=True)
+        stamp = self.started_at.replace(":", "").replace("-", "")[:15]
+        path = os.path.join(directory, f"{stamp}-{self.commit[:10]}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
+
+
+def new_run(server_version: str, profile: str) -> BenchmarkRun:
+    commit, dirty = git_state()
+    return BenchmarkRun(
+        commit=commit,
+        dirty=dirty,
+        started_at=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        python=platform.python_version(),
+        platform=platform.platform(),
+        server_version=server_version,
+        profile=profile,
+    )
+
+
+def git_state() -> Tuple[str, bool]:
+    """(commit hash, working tree has uncommitted changes); ("unknown", False) outside git."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        status = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+        ).stdout
+        return commit, bool(status.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+
+
+def measure(
+    name: str,
+    body: Callable[[], Work],
+    params: Optional[Dict[str, Any]] = None,
+    repeat: int = 5,
+    warmup: int = 1,
+    trace_memory: bool = True,
+) -> Measurement:
+    """
+    Run `body` warmup + repeat times and summarize the timed runs. Peak
+    Python allocation is measured in one extra run under tracemalloc, kept
+    apart because tracing slows allocation-heavy code down severalfold.
+    """
+    for _ in range(warmup):
+        body()
+
+    times = []
+    work: Work = (0, 0)
+    for _ in range(repeat):
+        start = time.perf_counter()
+        work = body()
+        times.append(time.perf_counter() - start)
+
+    peak = None
+    if trace_memory:
+        tracemalloc.start()
+        try:
+            body()
+            peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        finally:
+            tracemalloc.stop()
+
+    times.sort()
+    median = statistics.median(times)
+    rows, size = work
+    return Measurement(
+        name=name,
+        params=params or {},
+        runs=repeat,
+        latency_ms={
+            "min": round(times[0] * 1000, 3),
+            "median": round(median * 1000, 3),
+            "p95": round(times[min(len(times) - 1, int(0.95 * len(times)))] * 1000, 3),
+            "mean": round(statistics.fmean(times) * 1000, 3),
+            "max": round(times[-1] * 1000, 3),
+        },
+        rows=rows,
+        bytes=size,
+        rows_per_s=round(rows / median, 1) if rows and median > 0 else None,
+        mb_per_s=round(size / median / (1024 * 1024), 2) if size and median > 0 else None,
+        peak_alloc_mb=round(peak, 2) if peak is not None else None,
+    )
+
+
+def skipped(name: str, reason: str, params: Optional[Dict[str, Any]] = None) -> Measurement:
+    return Measurement(name=name, params=params or {}, runs=0, latency_ms={}, skipped=reason)
+
+
+def describe(m: Measurement) -> str:
+    """One console line per measurement."""
+    if m.skipped:
+        return f"{m.key:<55} skipped: {m.skipped}"
+    parts = [f"median {m.latency_ms['median']:>10.3f} ms", f"p95 {m.latency_ms['p95']:>10.3f} ms"]
+    if m.rows_per_s:
+        parts.append(f"{m.rows_per_s:>12,.0f} rows/s")
+    if m.mb_per_s:
+        parts.append(f"{m.mb_per_s:>8.1f} MB/s")
+    if m.peak_alloc_mb is not None:
+        parts.append(f"peak {m.peak_alloc_mb:.1f} MB")
+    return f"{m.key:<55} " + "  ".join(parts)
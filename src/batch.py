@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Headless runner for saved query configurations (AppState JSON files from
+saved_queries/), e.g. from cron on a server without a display:
+
+    python -m src.batch saved_queries/*.json --format jsonl --output-dir out/
+
+Each file's SQL is rebuilt exactly as the grid builds its first page
+(filters, sorting, row limit and primary-key tiebreaker), or taken as-is
+for manual queries, and the queries run concurrently over the connection
+pool. Rows are streamed to <output-dir>/<file name>.csv or .jsonl through a
+server-side cursor, so memory use does not depend on the result size.
+Connection settings come from .env / DB_* variables (see config.py).
+Never imports tkinter.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .config import DatabaseConfig
+from .database import DatabaseConnection, QueryCancelled, QueryTicket
+from .models import AppState
+from .params import QueryParams
+from .query_builder import build_export_query, build_grid_query
+from .results import ResultSet, format_value
+from .utils import setup_logging, write_csv
+
+FORMATS = ("csv", "jsonl")
+
+
+@dataclass
+class BatchJob:
+    path: str
+    state: AppState
+    output: str
+    ticket: QueryTicket
+
+
+def load_state(path: str) -> AppState:
+    with open(path, 'r', encoding='utf-8') as f:
+        return AppState.from_dict(json.load(f))
+
+
+def output_path(path: str, output_dir: str, fmt: str) -> str:
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(output_dir, f"{name}.{fmt}")
+
+
+def build_state_query(db: DatabaseConnection, state: AppState, all_rows: bool = False) -> Tuple[str, Dict[str, Any]]:
+    """
+    (sql, params) for a saved state: the manual query text, or the grid
+    query for its first page as DatabaseQueryGUI.build_query builds it.
+    `all_rows` drops the row limit, like "Export Full Result".
+    """
+    if state.is_manual_mode:
+        return state.manual_query_text, {}
+    params = QueryParams()
+    if all_rows:
+        return build_export_query(state.schema, state.table, state.filters, state.sorting, params), params.values
+    query = build_grid_query(
+        state.schema,
+        state.table,
+        state.filters,
+        state.sorting,
+        state.row_limit,
+        primary_key=db.get_primary_key(state.schema, state.table),
+        not_null=db.get_not_null_columns(state.schema, state.table),
+        params=params,
+    )
+    return query, params.values
+
+
+def _batches(db: DatabaseConnection, job: BatchJob, all_rows: bool, timeout_ms: Optional[int]) -> Iterator[ResultSet]:
+    query, params = build_state_query(db, job.state, all_rows)
+    if not query.strip():
+        raise ValueError("Saved state has neither a table nor a query")
+    for batch in db.stream_query(query, lane="long", ticket=job.ticket, timeout_ms=timeout_ms, params=params):
+        if batch.is_error:
+            if job.ticket.cancelled:
+                raise QueryCancelled()
+            raise RuntimeError(batch.error)
+        yield batch
+
+
+def _json_value(val: Any) -> Any:
+    """Keep values JSON can represent (including decoded json/jsonb); format the rest like the grid."""
+    if val is None or isinstance(val, (str, int, float, bool, dict, list)):
+        return val
+    if isinstance(val, (bytes, bytearray, memoryview)):
+        return "\\x" + bytes(val).hex()
+    return format_value(val)
+
+
+def write_jsonl(filepath: str, batches: Iterator[ResultSet]) -> int:
+    """One JSON object per row, keyed by column name. Returns the number of rows written."""
+    row_count = 0
+    with open(filepath, 'w', encoding='utf-8') as f:
+        for batch in batches:
+            names = batch.column_names
+            for row in batch.rows():
+                f.write(json.dumps(dict(zip(names, map(_json_value, row))), ensure_ascii=False, default=str))
+                f.write("\n")
+            row_count += len(batch)
+    return row_count
+
+
+def run_job(db: DatabaseConnection, job: BatchJob, fmt: str, all_rows: bool, timeout_ms: Optional[int]) -> int:
+    """
+    Stream one saved query into its output file. The file is written under a
+    temporary name and renamed when complete, so readers never see a partial export.
+    """
+    partial = job.output + ".part"
+    batches = _batches(db, job, all_rows, timeout_ms)
+    try:
+        if fmt == "csv":
+            row_count = write_csv(partial, ((b.column_names, list(b.formatted_rows())) for b in batches))
+        else:
+            row_count = write_jsonl(partial, batches)
+        os.replace(partial, job.output)
+        return row_count
+    except BaseException:
+        batches.close()
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run saved query configurations without the GUI.")
+    parser.add_argument("files", nargs="+", help="AppState JSON files saved from the viewer")
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--output-dir", default=".", help="directory for the result files (default: current)")
+    parser.add_argument("--jobs", type=int, default=4, help="queries to run at once (default: 4)")
+    parser.add_argument("--all-rows", action="store_true", help="ignore the saved row limit and export every matching row")
+    parser.add_argument("--timeout", type=float, help="statement_timeout in seconds (default: DB_STATEMENT_TIMEOUT, 0 disables)")
+    parser.add_argument("--log-level", default="INFO")
+    args = parser.parse_args(argv)
+
+    setup_logging(args.log_level)
+    logger = logging.getLogger("db_viewer.batch")
+    timeout_ms = int(args.timeout * 1000) if args.timeout is not None else None
+    jobs_count = max(1, args.jobs)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    jobs: List[BatchJob] = []
+    failures = 0
+    # Output files are named after the input's base name; inputs that would
+    # share one (same name in different directories) are refused rather than
+    # overwriting each other's results.
+    outputs: Dict[str, List[str]] = {}
+    for path in args.files:
+        outputs.setdefault(output_path(path, args.output_dir, args.format), []).append(path)
+
+    for path in args.files:
+        output = output_path(path, args.output_dir, args.format)
+        if len(outputs[output]) > 1:
+            logger.error(f"{path}: {', '.join(outputs[output])} would all write {output}; rename them or run them separately")
+            failures += 1
+            continue
+        try:
+            state = load_state(path)
+        except Exception as e:
+            logger.error(f"Could not load {path}: {e}")
+            failures += 1
+            continue
+        jobs.append(BatchJob(path, state, output, QueryTicket()))
+
+    if not jobs:
+        return 1
+
+    config = DatabaseConfig.from_env_file()
+    db = DatabaseConnection(config, pool_lanes={"metadata": 1, "long": jobs_count, "control": 1})
+    if not db.connect():
+        logger.error(f"Could not connect to {config.host}:{config.port}/{config.database}")
+        return 2
+
+    executor = ThreadPoolExecutor(max_workers=jobs_count, thread_name_prefix="batch")
+    try:
+        futures = {executor.submit(run_job, db, job, args.format, args.all_rows, timeout_ms): job for job in jobs}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                row_count = future.result()
+                logger.info(f"{job.path}: {row_count} rows -> {job.output}")
+            except Exception as e:
+                logger.error(f"{job.path}: {e}")
+                failures += 1
+    except KeyboardInterrupt:
+        logger.info("Interrupted, cancelling running queries")
+        for job in jobs:
+            db.cancel(job.ticket)
+        return 130
+    finally:
+        # Queued jobs are only left after an interrupt; they are dropped.
+        executor.shutdown(wait=True, cancel_futures=True)
+        db.close()
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
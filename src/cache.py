@@ -0,0 +1,78 @@
+import threading
+import time
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Hashable, Optional
+
+from .results import ResultSet
+
+
+@dataclass
+class CacheEntry:
+    result: ResultSet
+    size: int
+    stored_at: float
+
+
+class ResultCache:
+    """
+    Bounded in-memory cache of query results.
+
+    Entries are evicted least-recently-used first once their combined
+    estimated size exceeds max_bytes, and are ignored once older than
+    ttl_seconds. Results larger than the whole budget are never stored.
+    """
+
+    def __init__(self, max_bytes: int = 200 * 1024 * 1024, ttl_seconds: float = 300.0):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._total_bytes = 0
+
+    def get(self, key: Hashable) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry.stored_at > self.ttl_seconds:
+                self._remove_locked(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: Hashable, result: ResultSet):
+        if result.is_error:
+            return
+        size = result.estimated_size()
+        if size > self.max_bytes:
+            self.logger.debug(f"Result of {size} bytes exceeds the cache budget; not cached")
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove_locked(key)
+            self._entries[key] = CacheEntry(result=result, size=size, stored_at=time.monotonic())
+            self._total_bytes += size
+            while self._total_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove_locked(oldest)
+
+    def invalidate(self, predicate: Optional[Callable[[Hashable], bool]] = None):
+        """Drop every entry, or only those whose key matches the predicate."""
+        with self._lock:
+            for key in [k for k in self._entries if predicate is None or predicate(k)]:
+                self._remove_locked(key)
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove_locked(self, key: Hashable):
+        entry = self._entries.pop(key)
+        self._total_bytes -= entry.size
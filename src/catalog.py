@@ -0,0 +1,303 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from .results import ResultSet
+
+CATALOG_FORMAT_VERSION = 1
+
+# Relation kinds shown in the browser: tables, partitioned tables, views,
+# materialized views and foreign tables.
+BROWSABLE_RELKINDS = "('r', 'p', 'v', 'm', 'f')"
+
+SYSTEM_SCHEMAS = ("pg_catalog", "information_schema")
+
+_NAMESPACE_FILTER = (
+    "n.nspname NOT LIKE 'pg\\_toast%' AND n.nspname NOT LIKE 'pg\\_temp\\_%'"
+)
+
+_SIGNATURE_QUERY = f"""
+WITH rels AS (
+    SELECT c.oid, c.relnamespace, c.xmin::text::bigint AS x
+    FROM pg_class c
+    WHERE c.relkind IN {BROWSABLE_RELKINDS}
+),
+rel_sig AS (
+    SELECT relnamespace, count(*) AS n, sum(oid::bigint) AS oids, max(x) AS x
+    FROM rels GROUP BY relnamespace
+),
+att_sig AS (
+    SELECT r.relnamespace, max(a.xmin::text::bigint) AS x
+    FROM pg_attribute a JOIN rels r ON r.oid = a.attrelid
+    GROUP BY r.relnamespace
+),
+idx_sig AS (
+    SELECT r.relnamespace, count(*) AS n, max(i.xmin::text::bigint) AS x
+    FROM pg_index i JOIN rels r ON r.oid = i.indrelid
+    GROUP BY r.relnamespace
+)
+SELECT n.nspname, concat_ws(':', rs.n, rs.oids, rs.x, a.x, i.n, i.x)
+FROM rel_sig rs
+JOIN pg_namespace n ON n.oid = rs.relnamespace
+LEFT JOIN att_sig a ON a.relnamespace = rs.relnamespace
+LEFT JOIN idx_sig i ON i.relnamespace = rs.relnamespace
+WHERE {_NAMESPACE_FILTER}
+"""
+
+
+@dataclass
+class ColumnInfo:
+    name: str
+    type_name: str
+    type_oid: int
+    not_null: bool
+
+
+@dataclass
+class IndexInfo:
+    name: str
+    columns: List[str]
+    is_unique: bool
+    is_primary: bool
+
+
+@dataclass
+class RelationInfo:
+    schema: str
+    name: str
+    kind: str
+    estimated_rows: int = -1
+    columns: List[ColumnInfo] = field(default_factory=list)
+    indexes: List[IndexInfo] = field(default_factory=list)
+
+    @property
+    def primary_key(self) -> List[str]:
+        for index in self.indexes:
+            if index.is_primary:
+                return index.columns
+        return []
+
+    @property
+    def not_null_columns(self) -> Set[str]:
+        return {c.name for c in self.columns if c.not_null}
+
+    def to_dict(self):
+        return {
+            "schema": self.schema,
+            "name": self.name,
+            "kind": self.kind,
+            "estimated_rows": self.estimated_rows,
+            # Compact positional form: catalogs can hold millions of columns.
+            "columns": [[c.name, c.type_name, c.type_oid, c.not_null] for c in self.columns],
+            "indexes": [[i.name, i.columns, i.is_unique, i.is_primary] for i in self.indexes],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            schema=data["schema"],
+            name=data["name"],
+            kind=data["kind"],
+            estimated_rows=data["estimated_rows"],
+            columns=[ColumnInfo(*c) for c in data["columns"]],
+            indexes=[IndexInfo(*i) for i in data["indexes"]],
+        )
+
+
+def default_cache_dir() -> str:
+    return os.getenv("DB_VIEWER_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "db_viewer")
+
+
+def profile_key(host: str, port: int, database: str, user: str) -> str:
+    """Stable file-name-safe key for one connection profile."""
+    raw = f"{user}@{host}:{port}/{database}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+class CatalogCache:
+    """
+    Metadata for every browsable relation (schemas, tables, columns, types,
+    primary keys and indexes), loaded from pg_catalog in a few bulk queries
+    instead of per-schema information_schema lookups.
+
+    The cache is persisted to disk per connection profile, so reconnecting is
+    free. refresh() compares a cheap per-schema signature of pg_class,
+    pg_attribute and pg_index against the cached one and reloads only the
+    schemas whose catalog entries changed.
+    """
+
+    def __init__(self, run_query: Callable[[str], ResultSet], profile: str, cache_dir: Optional[str] = None):
+        self.run_query = run_query
+        self.profile = profile
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.RLock()
+        self._relations: Dict[Tuple[str, str], RelationInfo] = {}
+        self._signatures: Dict[str, str] = {}
+        self.loaded = False
+
+    @property
+    def cache_path(self) -> str:
+        return os.path.join(self.cache_dir, f"catalog_{self.profile}.json")
+
+    # --- Lookups ---
+
+    def schemas(self) -> List[str]:
+        with self._lock:
+            return sorted({schema for schema, _ in self._relations})
+
+    def tables(self, schema: str) -> List[str]:
+        with self._lock:
+            return sorted(name for s, name in self._relations if s == schema)
+
+    def all_tables(self) -> List[Tuple[str, str]]:
+        with self._lock:
+            return sorted(
+                key for key in self._relations
+                if key[0] not in SYSTEM_SCHEMAS
+            )
+
+    def relation(self, schema: str, table: str) -> Optional[RelationInfo]:
+        with self._lock:
+            return self._relations.get((schema, table))
+
+    def relations(self, schemas: Optional[Set[str]] = None) -> List[RelationInfo]:
+        with self._lock:
+            return [rel for rel in self._relations.values() if schemas is None or rel.schema in schemas]
+
+    # --- Loading ---
+
+    def ensure_loaded(self) -> bool:
+        """Make lookups usable: from disk if possible, otherwise from the server."""
+        if self.loaded:
+            return True
+        if self.load_from_disk():
+            return True
+        return self.refresh() is not None
+
+    def load_from_disk(self) -> bool:
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != CATALOG_FORMAT_VERSION:
+                return False
+            relations = {}
+            for item in data["relations"]:
+                rel = RelationInfo.from_dict(item)
+                relations[(rel.schema, rel.name)] = rel
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable catalog cache {self.cache_path}: {e}")
+            return False
+
+        with self._lock:
+            self._relations = relations
+            self._signatures = data["signatures"]
+            self.loaded = True
+        self.logger.info(f"Loaded {len(relations)} relations from catalog cache")
+        return True
+
+    def save(self):
+        with self._lock:
+            data = {
+                "version": CATALOG_FORMAT_VERSION,
+                "signatures": dict(self._signatures),
+                "relations": [rel.to_dict() for rel in self._relations.values()],
+            }
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = self.cache_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            self.logger.warning(f"Could not write catalog cache: {e}")
+
+    def refresh(self) -> Optional[Set[str]]:
+        """
+        Bring the cache up to date with the server. Returns the set of schemas
+        that were (re)loaded or dropped, or None if the catalog could not be read.
+        """
+        result = self.run_query(_SIGNATURE_QUERY)
+        if result.is_error:
+            self.logger.error(f"Could not read catalog signatures: {result.error}")
+            return None
+        signatures = dict(result.rows())
+
+        with self._lock:
+            changed = {s for s, sig in signatures.items() if self._signatures.get(s) != sig}
+            dropped = set(self._signatures) - set(signatures)
+
+        if changed and not self._load_schemas(changed):
+            return None
+
+        with self._lock:
+            for key in [k for k in self._relations if k[0] in dropped]:
+                del self._relations[key]
+            self._signatures = signatures
+            self.loaded = True
+
+        if changed or dropped:
+            self.logger.info(f"Catalog refreshed: {len(changed)} schema(s) reloaded, {len(dropped)} dropped")
+            self.save()
+        return changed | dropped
+
+    def _load_schemas(self, schemas: Set[str]) -> bool:
+        names = ", ".join("'" + s.replace("'", "''") + "'" for s in sorted(schemas))
+        scope = f"c.relkind IN {BROWSABLE_RELKINDS} AND n.nspname IN ({names})"
+
+        relations_result = self.run_query(f"""
+            SELECT c.oid, n.nspname, c.relname, c.relkind::text, c.reltuples::bigint
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE {scope}
+        """)
+        columns_result = self.run_query(f"""
+            SELECT a.attrelid, a.attname, format_type(a.atttypid, a.atttypmod), a.atttypid::int, a.attnotnull
+            FROM pg_attribute a
+            JOIN pg_class c ON c.oid = a.attrelid
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE {scope} AND a.attnum > 0 AND NOT a.attisdropped
+            ORDER BY a.attrelid, a.attnum
+        """)
+        indexes_result = self.run_query(f"""
+            SELECT i.indrelid, ic.relname, i.indisunique, i.indisprimary,
+                   ARRAY(
+                       SELECT a.attname
+                       FROM unnest(i.indkey) WITH ORDINALITY AS k(attnum, ord)
+                       JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = k.attnum
+                       ORDER BY k.ord
+                   )
+            FROM pg_index i
+            JOIN pg_class ic ON ic.oid = i.indexrelid
+            JOIN pg_class c ON c.oid = i.indrelid
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE {scope}
+        """)
+        for result in (relations_result, columns_result, indexes_result):
+            if result.is_error:
+                self.logger.error(f"Could not load catalog: {result.error}")
+                return False
+
+        by_oid: Dict[int, RelationInfo] = {}
+        for oid, schema, name, kind, reltuples in relations_result.rows():
+            by_oid[oid] = RelationInfo(schema=schema, name=name, kind=kind, estimated_rows=reltuples)
+        for relid, name, type_name, type_oid, not_null in columns_result.rows():
+            if relid in by_oid:
+                by_oid[relid].columns.append(ColumnInfo(name, type_name, type_oid, not_null))
+        for relid, name, is_unique, is_primary, columns in indexes_result.rows():
+            if relid in by_oid:
+                by_oid[relid].indexes.append(IndexInfo(name, list(columns), is_unique, is_primary))
+
+        with self._lock:
+            for key in [k for k in self._relations if k[0] in schemas]:
+                del self._relations[key]
+            for rel in by_oid.values():
+                self._relations[(rel.schema, rel.name)] = rel
+        return True
@@ -0,0 +1,198 @@
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, Tuple
+
+from .params import QueryParams, sql_literal
+
+# Rows a sampled profile aims to read; the TABLESAMPLE percentage is derived from it.
+SAMPLE_TARGET_ROWS = 30000
+# Pages a sample may read when there is no row estimate (about 8 MB with 8 kB pages).
+SAMPLE_MAX_PAGES = 1000
+SAMPLE_TOP_VALUES = 10
+# pg_class.relkind values TABLESAMPLE works on: tables, materialized views, partitioned tables
+SAMPLEABLE_RELKINDS = {"r", "m", "p"}
+
+
+@dataclass
+class ColumnProfile:
+    """
+    Value distribution of one column, either from the planner statistics
+    (pg_stats, free to read) or from a TABLESAMPLE of the table.
+    Frequencies are fractions of all rows.
+    """
+    schema: str
+    table: str
+    column: str
+    source: str  # "pg_stats" or "sample"
+    estimated_rows: int = -1
+    relkind: str = "r"
+    pages: int = 0  # size on disk in pages, including partitions and inheritance children
+    null_frac: Optional[float] = None
+    n_distinct: Optional[float] = None
+    avg_width: Optional[int] = None
+    correlation: Optional[float] = None
+    most_common: List[Tuple[Optional[str], float]] = field(default_factory=list)
+    histogram_bounds: List[Optional[str]] = field(default_factory=list)
+    sampled_rows: int = 0
+    sample_percent: float = 0.0
+
+    @property
+    def can_sample(self) -> bool:
+        return self.relkind in SAMPLEABLE_RELKINDS
+
+    @property
+    def has_stats(self) -> bool:
+        return self.null_frac is not None
+
+    @property
+    def distinct_values(self) -> Optional[int]:
+        """Estimated number of distinct values (pg_stats stores large ones as a negative fraction of rows)."""
+        if self.n_distinct is None:
+            return None
+        if self.n_distinct < 0:
+            return round(-self.n_distinct * max(self.estimated_rows, 0))
+        return round(self.n_distinct)
+
+    def histogram_buckets(self) -> List[Tuple[Optional[str], Optional[str], float]]:
+        """(low, high, fraction of rows) for each equal-population histogram bucket."""
+        if len(self.histogram_bounds) < 2:
+            return []
+        # The histogram covers the rows that are neither NULL nor a most common value.
+        rest = max(0.0, 1.0 - (self.null_frac or 0.0) - sum(freq for _, freq in self.most_common))
+        share = rest / (len(self.histogram_bounds) - 1)
+        return [
+            (low, high, share)
+            for low, high in zip(self.histogram_bounds, self.histogram_bounds[1:])
+        ]
+
+
+def parse_array_text(text: Optional[str]) -> List[Optional[str]]:
+    """Elements of a one-dimensional Postgres array in text form ('{a,"b c",NULL}')."""
+    if not text or len(text) < 2:
+        return []
+    body = text[1:-1]
+    items: List[Optional[str]] = []
+    i, n = 0, len(body)
+    while i < n:
+        if body[i] == '"':
+            i += 1
+            chars = []
+            while i < n and body[i] != '"':
+                if body[i] == "\\" and i + 1 < n:
+                    i += 1
+                chars.append(body[i])
+                i += 1
+            items.append("".join(chars))
+            i += 2  # closing quote and comma
+        else:
+            end = body.find(",", i)
+            if end == -1:
+                end = n
+            token = body[i:end]
+            items.append(None if token == "NULL" else token)
+            i = end + 1
+    return items
+
+
+def build_stats_query(schema: str, table: str, column: str, params: QueryParams) -> str:
+    """
+    Planner statistics for a column plus the table's row estimate, relkind and
+    size in pages (one row; NULL stats if never analyzed). The size adds up
+    partitions and inheritance children, which TABLESAMPLE reads as well.
+    """
+    return f"""
+SELECT c.reltuples::bigint, s.null_frac, s.n_distinct, s.avg_width, s.correlation,
+       s.most_common_vals::text, s.most_common_freqs, s.histogram_bounds::text,
+       c.relkind::text,
+       (WITH RECURSIVE tree(oid) AS (
+            SELECT c.oid
+            UNION ALL
+            SELECT i.inhrelid FROM pg_inherits i JOIN tree t ON i.inhparent = t.oid
+        )
+        SELECT sum(pg_relation_size(oid)) FROM tree)::bigint / current_setting('block_size')::int
+FROM pg_class c
+JOIN pg_namespace n ON n.oid = c.relnamespace
+LEFT JOIN pg_stats s
+       ON s.schemaname = n.nspname AND s.tablename = c.relname AND s.attname = {params.add(column)}
+WHERE n.nspname = {params.add(schema)} AND c.relname = {params.add(table)}
+ORDER BY s.inherited DESC
+LIMIT 1
+"""
+
+
+def profile_from_stats(schema: str, table: str, column: str, row: List[Any]) -> ColumnProfile:
+    reltuples, null_frac, n_distinct, avg_width, correlation, mcv_text, mcf, bounds_text, relkind, pages = row
+    values = parse_array_text(mcv_text)
+    return ColumnProfile(
+        schema=schema,
+        table=table,
+        column=column,
+        source="pg_stats",
+        estimated_rows=reltuples,
+        relkind=relkind,
+        pages=pages or 0,
+        null_frac=null_frac,
+        n_distinct=n_distinct,
+        avg_width=avg_width,
+        correlation=correlation,
+        most_common=list(zip(values, mcf or [])),
+        histogram_bounds=parse_array_text(bounds_text),
+    )
+
+
+def sample_percent(estimated_rows: int, pages: int = 0) -> float:
+    """
+    TABLESAMPLE percentage that reads about SAMPLE_TARGET_ROWS rows. Without a
+    row estimate (reltuples is -1 for a never-analyzed table, 0 before
+    PostgreSQL 14) it reads at most SAMPLE_MAX_PAGES of the table's pages.
+    """
+    if estimated_rows <= 0:
+        target, total = SAMPLE_MAX_PAGES, pages
+    else:
+        target, total = SAMPLE_TARGET_ROWS, estimated_rows
+    if total <= target:
+        return 100.0
+    return max(0.01, round(100.0 * target / total, 4))
+
+
+def build_sample_query(schema: str, table: str, column: str, percent: float) -> str:
+    """
+    Null count, distinct count and top values over a block sample of the
+    table. SYSTEM sampling reads whole pages, so it costs about `percent`
+    of a full scan; values are compared as text so every type works.
+    """
+    return f"""
+WITH sample AS (
+    SELECT "{column}"::text AS v FROM "{schema}"."{table}" TABLESAMPLE SYSTEM ({sql_literal(percent)})
+),
+top AS (
+    SELECT v, count(*) AS n FROM sample GROUP BY v ORDER BY n DESC LIMIT {SAMPLE_TOP_VALUES}
+)
+SELECT (SELECT count(*) FROM sample),
+       (SELECT count(*) FROM sample WHERE v IS NULL),
+       (SELECT count(DISTINCT v) FROM sample),
+       array_agg(v ORDER BY n DESC, v),
+       array_agg(n ORDER BY n DESC, v)
+FROM top
+"""
+
+
+def profile_from_sample(stats: ColumnProfile, percent: float, row: List[Any]) -> ColumnProfile:
+    """A sampled profile, scaled to the table size known from `stats`."""
+    total, nulls, distinct, values, counts = row
+    profile = ColumnProfile(
+        schema=stats.schema,
+        table=stats.table,
+        column=stats.column,
+        source="sample",
+        estimated_rows=stats.estimated_rows if stats.estimated_rows > 0 else round(total * 100 / percent),
+        relkind=stats.relkind,
+        pages=stats.pages,
+        sampled_rows=total,
+        sample_percent=percent,
+    )
+    if total:
+        profile.null_frac = nulls / total
+        # Distinct counts don't scale with the sample size; report what was seen.
+        profile.n_distinct = float(distinct)
+        profile.most_common = [(v, n / total) for v, n in zip(values or [], counts or [])]
+    return profile
@@ -1,6 +1,5 @@
 from dataclasses import dataclass
 import os
-from dotenv import load_dotenv, find_dotenv
 
 @dataclass
 class DatabaseConfig:
@@ -9,10 +8,14 @@ class DatabaseConfig:
     database: str
     user: str
     password: str
+    statement_timeout_ms: int = 0  # 0 disables the server-side timeout
+    connect_timeout_s: float = 10.0  # TCP connect and authentication; 0 waits indefinitely
 
     @classmethod
     def _load_env(cls):
         """Load variables from .env file, overriding existing environment variables."""
+        from dotenv import load_dotenv, find_dotenv  # only needed when reading a .env file
+
         dotenv_path = find_dotenv(usecwd=True)
         if dotenv_path:
             load_dotenv(dotenv_path=dotenv_path, override=True)
@@ -28,6 +31,8 @@ class DatabaseConfig:
             database=os.getenv("DB_NAME", ""),
             user=os.getenv("DB_USER", ""),
             password=os.getenv("DB_PASS", ""),
+            statement_timeout_ms=int(os.getenv("DB_STATEMENT_TIMEOUT", 0)),
+            connect_timeout_s=float(os.getenv("DB_CONNECT_TIMEOUT", 10)),
         )
 
     @classmethod
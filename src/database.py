@@ -1,124 +1,538 @@
 import threading
+import json
+import time
+import itertools
 import logging
-from typing import Optional, List, Any, Tuple
-from datetime import datetime
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Optional, List, Tuple, Dict, Iterator, Set
+import importlib.util
 import sys
+from contextlib import contextmanager
 from .config import DatabaseConfig
+from .pool import ConnectionPool, PooledConnection
+from .catalog import SYSTEM_SCHEMAS, CatalogCache, RelationInfo, profile_key
+from .metrics import QueryTimings, TimedStream
+from .plan import build_explain_query
+from .results import ResultSet
 
-# --- DEPENDENCY CHECK ---
-try:
+if TYPE_CHECKING:
     import pg8000.native
-except ImportError:
-    print("CRITICAL ERROR: The required library 'pg8000' is not installed.")
-    print("Please install it by running the following command in your terminal:")
-    print(f"{sys.executable} -m pip install pg8000")
-    sys.exit(1)
+
+# --- DEPENDENCY CHECK ---
+# pg8000 (with its TLS/SCRAM and date parsing dependencies) is about a third
+# of the application's import time, so it is only imported when the first
+# connection is opened; check_driver() tells main() up front whether it exists.
+MISSING_DRIVER_MESSAGE = (
+    "CRITICAL ERROR: The required library 'pg8000' is not installed.\n"
+    "Please install it by running the following command in your terminal:\n"
+    f"{sys.executable} -m pip install pg8000"
+)
+
+
+def check_driver():
+    """Exit with installation instructions if pg8000 is missing, without importing it."""
+    if importlib.util.find_spec("pg8000") is None:
+        print(MISSING_DRIVER_MESSAGE)
+        sys.exit(1)
+
+
+_pg8000_native = None
+
+
+def _driver():
+    """The pg8000.native module, imported on first use."""
+    global _pg8000_native
+    if _pg8000_native is None:
+        try:
+            import pg8000.native
+        except ImportError as e:
+            raise ImportError(MISSING_DRIVER_MESSAGE) from e
+        _pg8000_native = pg8000.native
+    return _pg8000_native
+
+class QueryTicket:
+    """
+    Handle for one in-flight query. Pass it to execute_query/stream_query and
+    call DatabaseConnection.cancel(ticket) from any thread to stop the query.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.backend_pid: Optional[int] = None
+        self.cancelled = False
+
+
+class QueryCancelled(Exception):
+    pass
+
 
 class DatabaseConnection:
-    def __init__(self, config: DatabaseConfig):
+    # Prepared statements kept per pooled connection, least recently used evicted first
+    STATEMENT_CACHE_SIZE = 64
+
+    def __init__(self, config: DatabaseConfig, pool_lanes: Optional[Dict[str, int]] = None):
         self.config = config
-        self.conn: Optional[pg8000.native.Connection] = None
+        self.pool_lanes = pool_lanes
         self.logger = logging.getLogger(__name__)
         self.lock = threading.Lock()
+        self._cursor_ids = itertools.count()
+        self.pool = self._create_pool()
+        self.catalog = self._create_catalog()
+
+    def _create_catalog(self) -> CatalogCache:
+        profile = profile_key(self.config.host, self.config.port, self.config.database, self.config.user)
+        return CatalogCache(lambda query: self.execute_query(query, lane="metadata"), profile)
+
+    def _create_pool(self) -> ConnectionPool:
+        return ConnectionPool(
+            factory=self._open_connection,
+            is_alive=lambda conn: conn._sock is not None,
+            ping=lambda conn: conn.run("SELECT 1"),
+            closer=lambda conn: conn.close() if conn._sock is not None else None,
+            reset=self._reset_session,
+            lanes=self.pool_lanes,
+        )
+
+    @staticmethod
+    def _reset_session(conn: "pg8000.native.Connection"):
+        """
+        Roll back whatever transaction a failed query left open. Sent even
+        when none is open: pg8000 keeps `_sock` after a network error, so this
+        round trip is what tells a dead connection from a live one.
+        """
+        conn.run("ROLLBACK")
+
+    def _open_connection(self) -> "pg8000.native.Connection":
+        conn = _driver().Connection(
+            host=self.config.host,
+            port=self.config.port,
+            database=self.config.database,
+            user=self.config.user,
+            password=self.config.password,
+            timeout=self.config.connect_timeout_s or None,
+        )
+        # The timeout is for the TCP and auth handshake only; running queries
+        # are bounded by statement_timeout and cancellation instead.
+        conn._usock.settimeout(None)
+        # Lets execute_query tell server time from row transfer time
+        conn._sock = TimedStream(conn._sock)
+        self.logger.info(f"Connected to '{self.config.database}'")
+        return conn
 
     def update_config(self, new_config: DatabaseConfig):
         with self.lock:
-            self.close()
+            self.pool.close_all()
             self.config = new_config
+            self.pool = self._create_pool()
+            self.catalog = self._create_catalog()
 
     def connect(self) -> bool:
+        """Validate the configuration by checking out (and warming) a metadata connection."""
+        # Check if minimal info is present
+        if not self.config.host or not self.config.database:
+            return False
         try:
-            with self.lock:
-                if self.conn and self.conn._sock is not None:
-                    return True
-
-                # Check if minimal info is present
-                if not self.config.host or not self.config.database:
-                    return False
-
-                self.conn = pg8000.native.Connection(
-                    host=self.config.host,
-                    port=self.config.port,
-                    database=self.config.database,
-                    user=self.config.user,
-                    password=self.config.password,
-                )
-                self.logger.info(f"Connected to '{self.config.database}'")
+            with self.pool.connection("metadata"):
                 return True
         except Exception as e:
             self.logger.error(f"Connection failed: {e}")
             return False
 
-    def execute_query(self, query: str) -> Optional[List[List[Any]]]:
-        with self.lock:
+    @contextmanager
+    def _checkout(
+        self,
+        lane: str,
+        ticket: Optional[QueryTicket] = None,
+        timeout_ms: Optional[int] = None,
+        timings: Optional[QueryTimings] = None,
+    ):
+        """
+        Check out a pooled connection, apply the statement_timeout for this query
+        and publish its backend PID on the ticket while the query runs.
+        Yields the PooledConnection (driver connection in .raw). The time until
+        then is added to `timings` as the "connect" phase.
+        """
+        start = time.perf_counter()
+        with self.pool.connection(lane) as pooled:
+            conn = pooled.raw
+            if "pid" not in pooled.info:
+                pooled.info["pid"] = conn.run("SELECT pg_backend_pid()")[0][0]
+
+            wanted_timeout = self.config.statement_timeout_ms if timeout_ms is None else timeout_ms
+            if pooled.info.get("statement_timeout") != wanted_timeout:
+                conn.run(f"SET statement_timeout = {int(wanted_timeout)}")
+                pooled.info["statement_timeout"] = wanted_timeout
+
+            if ticket is not None:
+                with ticket.lock:
+                    if ticket.cancelled:
+                        raise QueryCancelled()
+                    ticket.backend_pid = pooled.info["pid"]
+            if timings is not None:
+                timings.add("connect", (time.perf_counter() - start) * 1000)
             try:
-                if not self.conn or self.conn._sock is None:
-                    self.logger.warning(
-                        "Connection closed/missing. Attempting to reconnect..."
-                    )
-                    if not self.connect():
-                        raise ConnectionError(
-                            "Failed to establish database connection."
-                        )
-
-                rows = self.conn.run(query)
-                column_names = [col["name"] for col in self.conn.columns]
-
-                formatted_rows = []
-                for row in rows:
-                    formatted_row = []
-                    for val in row:
-                        if isinstance(val, datetime):
-                            formatted_row.append(val.strftime("%Y-%m-%d %H:%M:%S"))
-                        elif val is None:
-                            formatted_row.append("NULL")
-                        else:
-                            formatted_row.append(str(val))
-                    formatted_rows.append(formatted_row)
-
-                return [column_names] + formatted_rows
-
-            except Exception as e:
-                self.logger.error(f"Query execution failed: {e}")
-                return [["Error"], [[str(e)]]]
+                yield pooled
+            finally:
+                if ticket is not None:
+                    # Cleared before the connection returns to the pool, so a late
+                    # cancel can never hit whatever query runs on it next.
+                    with ticket.lock:
+                        ticket.backend_pid = None
+
+    def cancel(self, ticket: QueryTicket) -> bool:
+        """
+        Mark the ticket cancelled and, if its query is running, ask the server to
+        stop it with pg_cancel_backend. Returns True if a cancel was sent.
+        """
+        with ticket.lock:
+            ticket.cancelled = True
+            pid = ticket.backend_pid
+        if pid is None:
+            return False
+        # Sent without holding the lock: checking out a control connection can
+        # take a while, and the finishing query must not wait for it.
+        try:
+            with self.pool.connection("control") as pooled:
+                pooled.raw.run("SELECT pg_cancel_backend(:pid)", pid=pid)
+            self.logger.info(f"Cancelled query on backend {pid}")
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to cancel backend {pid}: {e}")
+            return False
+
+    def execute_query(
+        self,
+        query: str,
+        lane: str = "grid",
+        ticket: Optional[QueryTicket] = None,
+        timeout_ms: Optional[int] = None,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> ResultSet:
+        """
+        Run a query on a connection checked out from the given pool lane
+        ('metadata', 'grid' or 'long'). Values are returned raw, by column;
+        failures and cancellations come back as an error ResultSet.
+        timeout_ms overrides the configured statement_timeout for this query.
+
+        Queries with `params` (:name placeholders, see QueryParams) run as
+        prepared statements cached per connection, so re-running the same
+        query shape with new values skips parsing and planning.
+
+        The result carries QueryTimings for the connect, server, transfer and
+        (ResultSet building) format phases; callers add the rest.
+        """
+        timings = QueryTimings(label=lane)
+        try:
+            with self._checkout(lane, ticket, timeout_ms, timings) as pooled:
+                conn = pooled.raw
+                stream = conn._sock
+                waited = stream.reply_wait
+                start = time.perf_counter()
+                if params:
+                    columns, rows = self._run_prepared(pooled, query, params)
+                else:
+                    rows = conn.run(query)
+                    columns = conn.columns
+                server_ms = (stream.reply_wait - waited) * 1000
+                timings.add("server", server_ms)
+                timings.add("transfer", (time.perf_counter() - start) * 1000 - server_ms)
+
+                with timings.phase("format"):
+                    result = ResultSet.from_driver(columns, rows)
+                result.timings = timings
+                timings.rows = len(result)
+                return result
+
+        except Exception as e:
+            if ticket is not None and ticket.cancelled:
+                self.logger.info("Query cancelled")
+                return ResultSet.from_error("Query cancelled.")
+            self.logger.error(f"Query execution failed: {e}")
+            return ResultSet.from_error(str(e))
+
+    def _run_prepared(self, pooled: PooledConnection, query: str, params: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], List[List[Any]]]:
+        """Run a query through the connection's statement cache; returns the row description and rows."""
+        statements = pooled.info.setdefault("statements", OrderedDict())
+        statement = statements.pop(query, None)
+        if statement is None:
+            statement = pooled.raw.prepare(query)
+        statements[query] = statement
+        if len(statements) > self.STATEMENT_CACHE_SIZE:
+            _, evicted = statements.popitem(last=False)
+            evicted.close()
+
+        try:
+            rows = statement.run(**params)
+        except _driver().DatabaseError as e:
+            # "cached plan must not change result type": the table was altered
+            # since the statement was prepared. Prepare it again once.
+            if not (e.args and isinstance(e.args[0], dict) and e.args[0].get("C") == "0A000"):
+                raise
+            del statements[query]
+            statement.close()
+            statement = pooled.raw.prepare(query)
+            statements[query] = statement
+            rows = statement.run(**params)
+        return statement.columns, rows
+
+    def stream_query(
+        self,
+        query: str,
+        batch_size: int = 1000,
+        lane: str = "grid",
+        ticket: Optional[QueryTicket] = None,
+        timeout_ms: Optional[int] = None,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[ResultSet]:
+        """
+        Yield ResultSet batches for a query using a named server-side cursor
+        (DECLARE ... / FETCH FORWARD n inside a transaction), so only one
+        batch is ever held in memory. Statements that cannot be declared as a
+        cursor (DML, SHOW, multiple statements, ...) fall back to a single run.
+        Close the generator (or cancel its ticket) to abandon the stream early;
+        the cursor and its transaction are released and the connection goes
+        back to the pool.
+        """
+        body = query.strip().rstrip(";").strip()
+        cursor_name = f"db_viewer_stream_{next(self._cursor_ids)}"
+        params = params or {}
+        try:
+            with self._checkout(lane, ticket, timeout_ms) as pooled:
+                conn = pooled.raw
+                conn.run("BEGIN")
+                try:
+                    try:
+                        conn.run(f"DECLARE {cursor_name} NO SCROLL CURSOR FOR {body}", **params)
+                    except _driver().DatabaseError:
+                        conn.run("ROLLBACK")
+                        rows = conn.run(query, **params)
+                        yield ResultSet.from_driver(conn.columns, rows)
+                        return
+
+                    while ticket is None or not ticket.cancelled:
+                        rows = conn.run(f"FETCH FORWARD {int(batch_size)} FROM {cursor_name}")
+                        yield ResultSet.from_driver(conn.columns, rows)
+                        if len(rows) < batch_size:
+                            break
+                finally:
+                    # COMMIT closes the cursor (and acts as ROLLBACK if it failed).
+                    if conn._sock is not None:
+                        conn.run("COMMIT")
+
+        except Exception as e:
+            if ticket is not None and ticket.cancelled:
+                self.logger.info("Streaming query cancelled")
+                yield ResultSet.from_error("Query cancelled.")
+                return
+            self.logger.error(f"Streaming query failed: {e}")
+            yield ResultSet.from_error(str(e))
+
+    def copy_to(
+        self,
+        query: str,
+        stream: Any,
+        lane: str = "long",
+        ticket: Optional[QueryTicket] = None,
+        timeout_ms: Optional[int] = None,
+    ) -> int:
+        """
+        Run COPY (query) TO STDOUT as CSV with a header and write the data into
+        a binary file-like object as the server sends it, so memory use does
+        not depend on the result size. Returns the number of rows copied.
+        Raises QueryCancelled if the ticket was cancelled, or the driver error.
+        """
+        body = query.strip().rstrip(";").strip()
+        try:
+            with self._checkout(lane, ticket, timeout_ms) as pooled:
+                conn = pooled.raw
+                try:
+                    conn.run(f"COPY ({body}) TO STDOUT WITH (FORMAT csv, HEADER)", stream=stream)
+                except Exception as e:
+                    if not isinstance(e, _driver().DatabaseError):
+                        # Failed on our side mid-COPY (e.g. disk full): the protocol
+                        # state is unknown, so make sure the pool drops this connection.
+                        conn.close()
+                    raise
+                return conn.row_count
+        except Exception:
+            if ticket is not None and ticket.cancelled:
+                self.logger.info("COPY cancelled")
+                raise QueryCancelled()
+            raise
+
+    def explain_query(
+        self,
+        query: str,
+        analyze: bool = False,
+        lane: str = "long",
+        ticket: Optional[QueryTicket] = None,
+        timeout_ms: Optional[int] = None,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> ResultSet:
+        """
+        EXPLAIN a statement in JSON form (one row, one value; see plan.parse_explain).
+        With `analyze` the statement really runs, so it is wrapped in a
+        transaction that is always rolled back: data changes are undone
+        (sequence increments and other non-transactional effects are not).
+        Errors come back as an error ResultSet, like execute_query.
+        """
+        try:
+            with self._checkout(lane, ticket, timeout_ms) as pooled:
+                conn = pooled.raw
+                conn.run("BEGIN")
+                try:
+                    rows = conn.run(build_explain_query(query, analyze), **(params or {}))
+                    return ResultSet.from_driver(conn.columns, rows)
+                finally:
+                    if conn._sock is not None:
+                        conn.run("ROLLBACK")
+
+        except Exception as e:
+            if ticket is not None and ticket.cancelled:
+                self.logger.info("EXPLAIN cancelled")
+                return ResultSet.from_error("Query cancelled.")
+            self.logger.error(f"EXPLAIN failed: {e}")
+            return ResultSet.from_error(str(e))
 
     def get_schemas(self) -> List[str]:
-        query = "SELECT DISTINCT table_schema FROM information_schema.tables ORDER BY table_schema;"
-        results = self.execute_query(query)
-        if results and len(results) > 1 and results[0][0] != "Error":
-            return [row[0] for row in results[1:]]
+        if self.catalog.ensure_loaded():
+            return self.catalog.schemas()
         return []
 
     def get_tables(self, schema: str) -> List[str]:
-        query = f"""
-        SELECT table_name
-        FROM information_schema.tables
-        WHERE table_schema = '{schema}'
-        ORDER BY table_name
-        """
-        results = self.execute_query(query)
-        if results and len(results) > 1 and results[0][0] != "Error":
-            return [row[0] for row in results[1:]]
+        if self.catalog.ensure_loaded():
+            return self.catalog.tables(schema)
         return []
 
     def get_all_tables(self) -> List[Tuple[str, str]]:
-        query = """
-        SELECT table_schema, table_name
-        FROM information_schema.tables
-        WHERE table_schema NOT IN ('pg_catalog', 'information_schema')
-        ORDER BY table_schema, table_name;
-        """
-        results = self.execute_query(query)
-        if results and len(results) > 1 and results[0][0] != "Error":
-            return [tuple(row) for row in results[1:]]
+        if self.catalog.ensure_loaded():
+            return self.catalog.all_tables()
         return []
 
+    def get_relations(self, schemas: Optional[Set[str]] = None) -> List[RelationInfo]:
+        """Catalog entries of all user relations (those listed by get_all_tables), optionally only in `schemas`."""
+        if not self.catalog.ensure_loaded():
+            return []
+        return [rel for rel in self.catalog.relations(schemas) if rel.schema not in SYSTEM_SCHEMAS]
+
+    def get_relation(self, schema: str, table: str) -> Optional[RelationInfo]:
+        """Cached catalog entry (columns, types, keys, indexes) for a relation, if known."""
+        return self.catalog.relation(schema, table)
+
+    def refresh_catalog(self) -> Optional[Set[str]]:
+        """Reload catalog entries for schemas changed on the server; returns those schema names."""
+        return self.catalog.refresh()
+
+    def get_primary_key(self, schema: str, table: str) -> List[str]:
+        """Primary key column names of a table, in key order ([] for views or keyless tables)."""
+        relation = self.catalog.relation(schema, table)
+        if relation is not None:
+            return relation.primary_key
+
+        query = f"""
+        SELECT a.attname
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        CROSS JOIN LATERAL unnest(i.indkey) WITH ORDINALITY AS k(attnum, ord)
+        JOIN pg_attribute a ON a.attrelid = c.oid AND a.attnum = k.attnum
+        WHERE i.indisprimary
+          AND n.nspname = '{schema.replace("'", "''")}'
+          AND c.relname = '{table.replace("'", "''")}'
+        ORDER BY k.ord
+        """
+        results = self.execute_query(query, lane="metadata")
+        if not results.is_error:
+            return results.column_values(0)
+        return []
+
+    def get_not_null_columns(self, schema: str, table: str) -> Set[str]:
+        relation = self.catalog.relation(schema, table)
+        return relation.not_null_columns if relation is not None else set()
+
+    def get_bytewise_text_columns(self, schema: str, table: str) -> Set[str]:
+        """
+        Columns of a table whose collation orders text by code point (C/POSIX
+        under libc, or the builtin C locales) in a UTF8 database, i.e. exactly
+        like Python compares str. Linguistic collations are left out.
+        """
+        query = f"""
+        WITH db AS (
+            SELECT d.datcollate,
+                   coalesce(to_jsonb(d)->>'datlocprovider', 'c') AS provider,
+                   to_jsonb(d)->>'datlocale' AS locale,
+                   pg_encoding_to_char(d.encoding) AS encoding
+            FROM pg_database d
+            WHERE d.datname = current_database()
+        )
+        SELECT a.attname
+        FROM pg_attribute a
+        JOIN pg_class c ON c.oid = a.attrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        JOIN pg_collation co ON co.oid = a.attcollation
+        CROSS JOIN db
+        WHERE n.nspname = '{schema.replace("'", "''")}'
+          AND c.relname = '{table.replace("'", "''")}'
+          AND a.attnum > 0 AND NOT a.attisdropped
+          AND db.encoding = 'UTF8'
+          AND CASE WHEN co.collname = 'default'
+                   THEN (db.provider = 'c' AND db.datcollate IN ('C', 'POSIX'))
+                        OR (db.provider = 'b' AND db.locale IN ('C', 'C.UTF-8'))
+                   ELSE (co.collprovider = 'c' AND co.collcollate IN ('C', 'POSIX'))
+                        OR (co.collprovider = 'b' AND to_jsonb(co)->>'colllocale' IN ('C', 'C.UTF-8'))
+              END
+        """
+        results = self.execute_query(query, lane="metadata")
+        if results.is_error:
+            return set()
+        return set(results.column_values(0))
+
+    def estimate_table_rows(self, schema: str, table: str) -> Optional[int]:
+        """
+        Instant row estimate from pg_class statistics, scaled to the relation's
+        current size the same way the planner does. Returns None when the
+        relation has no usable statistics (views, partitioned or never-analyzed
+        tables), in which case estimate_query_rows should be used instead.
+        """
+        query = f"""
+        SELECT CASE
+                   WHEN c.relpages > 0 THEN
+                       (c.reltuples / c.relpages)
+                       * (pg_relation_size(c.oid) / current_setting('block_size')::int)
+                   ELSE c.reltuples
+               END::bigint
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = '{schema.replace("'", "''")}'
+          AND c.relname = '{table.replace("'", "''")}'
+          AND c.relkind IN ('r', 'm')
+          AND c.reltuples >= 0
+        """
+        results = self.execute_query(query, lane="metadata")
+        if results.is_error or not len(results):
+            return None
+        return results.column_values(0)[0]
+
+    def estimate_query_rows(self, query: str, params: Optional[Dict[str, Any]] = None) -> Optional[int]:
+        """Planner's row estimate for a query, from EXPLAIN (FORMAT JSON). Nothing is executed."""
+        results = self.execute_query(
+            f"EXPLAIN (FORMAT JSON) {query.strip().rstrip(';')}", lane="metadata", params=params
+        )
+        if results.is_error or not len(results):
+            return None
+        plan = results.column_values(0)[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        try:
+            return int(plan[0]["Plan"]["Plan Rows"])
+        except (LookupError, TypeError, ValueError):
+            return None
+
+    def evict_idle_connections(self):
+        """Close pooled connections that have sat unused longer than the pool's max_idle_seconds."""
+        self.pool.evict_idle()
+
     def close(self):
         with self.lock:
-            if self.conn and self.conn._sock is not None:
-                try:
-                    self.conn.close()
-                    self.logger.info("Database connection closed")
-                except Exception as e:
-                    self.logger.error(f"Error closing connection: {e}")
-            self.conn = None
+            self.pool.close_all()
+            self.logger.info("Database connection pool closed")
@@ -0,0 +1,107 @@
+from typing import Dict, List, Optional
+
+from .models import AppState
+
+# Rough per-object overhead of a snapshot and of each filter/sort entry in it.
+_STATE_OVERHEAD = 512
+_ITEM_OVERHEAD = 128
+
+
+def estimated_size(state: AppState) -> int:
+    """Approximate memory held by one snapshot; dominated by manual SQL text."""
+    return (
+        _STATE_OVERHEAD
+        + len(state.manual_query_text)
+        + _ITEM_OVERHEAD * (len(state.filters) + len(state.sorting))
+    )
+
+
+class HistoryStore:
+    """
+    Back/forward stack of AppState snapshots.
+
+    Snapshots are immutable and interned (see AppState.snapshot), so
+    consecutive entries share their unchanged filters and recording a
+    state equal to the current one is an O(1) hash/identity check. The
+    stack is bounded both by entry count and by estimated memory; a state
+    that appears several times is only counted once.
+    """
+
+    def __init__(self, max_entries: int = 100, max_bytes: int = 8 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._entries: List[AppState] = []
+        self._index = -1
+        # id(state) -> number of entries referring to it; sizes count each state once.
+        self._refs: Dict[int, int] = {}
+        self._total_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    @property
+    def current(self) -> Optional[AppState]:
+        return self._entries[self._index] if self._entries else None
+
+    @property
+    def can_go_back(self) -> bool:
+        return self._index > 0
+
+    @property
+    def can_go_forward(self) -> bool:
+        return self._index < len(self._entries) - 1
+
+    def record(self, state: AppState) -> bool:
+        """
+        Push a state after the current one, dropping any forward history.
+        Returns False (and records nothing) if it equals the current state.
+        """
+        state = state.snapshot()
+        if state is self.current:
+            return False
+
+        for old in self._entries[self._index + 1:]:
+            self._release(old)
+        del self._entries[self._index + 1:]
+
+        self._entries.append(state)
+        self._retain(state)
+        self._index = len(self._entries) - 1
+
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes
+        ):
+            self._release(self._entries.pop(0))
+            self._index -= 1
+        return True
+
+    def back(self) -> Optional[AppState]:
+        if not self.can_go_back:
+            return None
+        self._index -= 1
+        return self._entries[self._index]
+
+    def forward(self) -> Optional[AppState]:
+        if not self.can_go_forward:
+            return None
+        self._index += 1
+        return self._entries[self._index]
+
+    def _retain(self, state: AppState):
+        count = self._refs.get(id(state), 0)
+        if count == 0:
+            self._total_bytes += estimated_size(state)
+        self._refs[id(state)] = count + 1
+
+    def _release(self, state: AppState):
+        count = self._refs[id(state)] - 1
+        if count == 0:
+            del self._refs[id(state)]
+            self._total_bytes -= estimated_size(state)
+        else:
+            self._refs[id(state)] = count
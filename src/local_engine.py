@@ -0,0 +1,247 @@
+import math
+import struct
+import uuid
+from datetime import date, datetime, time
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Collection, Dict, List, Optional, Sequence
+
+from .models import Filter, FilterState, SortCriterion
+from .query_builder import ROW_NUMBER_COLUMN, paging_key
+from .results import ResultSet
+
+# Type OIDs whose Python values order exactly like Postgres orders them.
+_BOOL, _INT8, _INT2, _INT4, _OID = 16, 20, 21, 23, 26
+_FLOAT4, _FLOAT8, _NUMERIC = 700, 701, 1700
+_DATE, _TIME, _TIMESTAMP, _TIMESTAMPTZ, _UUID = 1082, 1083, 1114, 1184, 2950
+ORDERED_OIDS = {
+    _BOOL, _INT8, _INT2, _INT4, _OID, _FLOAT4, _FLOAT8, _NUMERIC,
+    _DATE, _TIME, _TIMESTAMP, _TIMESTAMPTZ, _UUID,
+}
+# Text types: equality is exact, but ordering depends on the collation.
+TEXT_OIDS = {19, 25, 1043}  # name, text, varchar
+
+_TRUE_WORDS = {"t", "true", "y", "yes", "on", "1"}
+_FALSE_WORDS = {"f", "false", "n", "no", "off", "0"}
+
+
+class Unsupported(Exception):
+    """The query can't be reproduced locally with the server's exact semantics."""
+
+
+def _parse_bool(text: str) -> bool:
+    word = text.strip().lower()
+    if word in _TRUE_WORDS:
+        return True
+    if word in _FALSE_WORDS:
+        return False
+    raise ValueError(text)
+
+
+def _parse_float(text: str) -> float:
+    value = float(text)
+    if math.isnan(value):
+        raise ValueError(text)  # NaN sorts above everything in Postgres, but compares False in Python
+    return value
+
+
+def _to_float4(value: float) -> float:
+    """Round a Python float to the nearest real (float4), as the server stores it."""
+    return struct.unpack("f", struct.pack("f", value))[0]
+
+
+def _parse_float4(text: str) -> float:
+    value = _parse_float(text)
+    try:
+        rounded = _to_float4(value)
+    except OverflowError:  # older Pythons raise instead of rounding to inf
+        rounded = math.inf
+    if math.isinf(rounded) and not math.isinf(value):
+        raise ValueError(text)  # out of range for real; the server rejects it
+    return rounded
+
+
+def _parse_numeric(text: str) -> Decimal:
+    value = Decimal(text)
+    if value.is_nan():
+        raise ValueError(text)  # equal to itself and above every number in Postgres
+    return value
+
+
+def _naive(parse: Callable[[str], Any]) -> Callable[[str], Any]:
+    """Reject values with a UTC offset: the server drops it when casting to timestamp/time."""
+    def parse_naive(text: str) -> Any:
+        value = parse(text)
+        if value.tzinfo is not None:
+            raise ValueError(text)
+        return value
+    return parse_naive
+
+
+# How a filter value (always typed-in text) is read for each column type.
+# timestamptz is missing on purpose: the server reads a bare value in the session time zone.
+_PARSERS: Dict[int, Callable[[str], Any]] = {
+    _BOOL: _parse_bool,
+    _INT8: int, _INT2: int, _INT4: int, _OID: int,
+    _FLOAT4: _parse_float4, _FLOAT8: _parse_float,
+    _NUMERIC: _parse_numeric,
+    _DATE: date.fromisoformat,
+    _TIME: _naive(time.fromisoformat),
+    _TIMESTAMP: _naive(datetime.fromisoformat),
+    _UUID: uuid.UUID,
+    19: str, 25: str, 1043: str,
+}
+
+
+class LocalQuery:
+    """
+    Re-evaluates the grid query (active filters, sort order and "row"
+    numbering; see build_grid_query) in memory over a result that is known to
+    hold every row of the table matching its own filters.
+
+    Each operation works a column at a time: filters build a row mask from
+    one column's values, sorts are stable passes over one column's keys, and
+    the output is gathered column by column into a new ResultSet - the
+    input, which may be shared with the result caches, is never modified.
+    Anything whose result could differ from the server's (ordering text
+    columns that aren't in `bytewise_columns`, i.e. use a linguistic
+    collation; ILIKE wildcards; NaN; unknown types) raises Unsupported so
+    the caller can fall back to the server.
+    """
+
+    def __init__(self, base: ResultSet, bytewise_columns: Collection[str] = ()):
+        self.base = base
+        self.bytewise_columns = bytewise_columns
+        self._index = {name: i for i, name in enumerate(base.column_names)}
+
+    def run(
+        self,
+        filters: Sequence[Filter],
+        sorting: Sequence[SortCriterion],
+        primary_key: Sequence[str] = (),
+    ) -> ResultSet:
+        rows = self._filter(list(range(len(self.base))), filters)
+
+        inner_sorting = [s for s in sorting if s.column != ROW_NUMBER_COLUMN]
+        outer_sorting = [s for s in sorting if s.column == ROW_NUMBER_COLUMN]
+        order_key = paging_key(sorting, primary_key) if primary_key else inner_sorting
+        rows = self._sort(rows, order_key)
+        if outer_sorting and outer_sorting[0].direction == "DESC":
+            row_numbers = list(range(len(rows), 0, -1))
+            rows.reverse()
+        else:
+            row_numbers = list(range(1, len(rows) + 1))
+        return self._gather(rows, row_numbers)
+
+    # --- Filtering ---
+
+    def _filter(self, rows: List[int], filters: Sequence[Filter]) -> List[int]:
+        for f in filters:
+            if f.state != FilterState.ACTIVE:
+                continue
+            values = self._column(f.column)
+            oid = self.base.type_oids[self._index[f.column]]
+            if oid == _FLOAT4:
+                # The server compares reals with the literal read as real. Round
+                # both sides the same way, whether the driver decoded the value
+                # widened (0.100000001...) or from its shortest text form (0.1).
+                values = [None if v is None else _to_float4(v) for v in values]
+            test = self._predicate(f, oid)
+            try:
+                rows = [i for i in rows if test(values[i])]
+            except (TypeError, InvalidOperation):  # 'infinity' dates arrive as strings; NaN numerics don't order
+                raise Unsupported(f"values of {f.column}")
+        return rows
+
+    def _predicate(self, f: Filter, oid: Optional[int]) -> Callable[[Any], bool]:
+        # Mirrors Filter.to_sql
+        if f.value is None or str(f.value).upper() == "NULL":
+            if f.operator == "=":
+                return lambda v: v is None
+            if f.operator == "!=":
+                return lambda v: v is not None
+            return lambda v: True
+
+        if f.operator in ("IN", "NOT IN"):
+            items = [item.strip().strip("'").strip('"') for item in str(f.value).split(',') if item.strip()]
+            wanted = {self._parse(item, oid) for item in items}
+            if f.operator == "IN":
+                return lambda v: v is not None and v in wanted
+            return lambda v: v is not None and v not in wanted
+
+        if f.operator in ("ILIKE", "NOT ILIKE"):
+            needle = str(f.value)
+            if oid not in TEXT_OIDS or not needle.isascii() or any(c in needle for c in "%_\\"):
+                raise Unsupported(f"ILIKE on {f.column}")
+            needle = needle.lower()
+            if f.operator == "ILIKE":
+                return lambda v: v is not None and needle in v.lower()
+            return lambda v: v is not None and needle not in v.lower()
+
+        target = self._parse(str(f.value), oid)
+        if f.operator in ("=", "!="):
+            if f.operator == "=":
+                return lambda v: v is not None and v == target
+            return lambda v: v is not None and v != target
+        self._check_orderable(f.column, oid)
+        compare = {
+            ">": lambda v: v > target,
+            "<": lambda v: v < target,
+            ">=": lambda v: v >= target,
+            "<=": lambda v: v <= target,
+        }.get(f.operator)
+        if compare is None:
+            raise Unsupported(f"operator {f.operator}")
+        return lambda v: v is not None and compare(v)
+
+    @staticmethod
+    def _parse(text: str, oid: Optional[int]) -> Any:
+        parser = _PARSERS.get(oid)
+        if parser is None:
+            raise Unsupported(f"filter on type {oid}")
+        try:
+            return parser(text)
+        except (ValueError, InvalidOperation):
+            raise Unsupported(f"value {text!r} for type {oid}")
+
+    # --- Sorting ---
+
+    def _sort(self, rows: List[int], order_key: Sequence[SortCriterion]) -> List[int]:
+        # Stable passes from the least to the most significant column. Postgres
+        # puts NULLs last for ASC and first for DESC: (is_null, value) keys do
+        # exactly that, reversed or not.
+        for criterion in reversed(order_key):
+            values = self._column(criterion.column)
+            oid = self.base.type_oids[self._index[criterion.column]]
+            self._check_orderable(criterion.column, oid)
+            keys = [(v is None, v) for v in values]
+            if oid in (_FLOAT4, _FLOAT8, _NUMERIC) and any(v != v for v in values if v is not None):
+                raise Unsupported(f"NaN in {criterion.column}")
+            try:
+                rows.sort(key=keys.__getitem__, reverse=criterion.direction == "DESC")
+            except (TypeError, InvalidOperation):
+                raise Unsupported(f"values of {criterion.column}")
+        return rows
+
+    def _check_orderable(self, column: str, oid: Optional[int]):
+        if oid in ORDERED_OIDS or (oid in TEXT_OIDS and column in self.bytewise_columns):
+            return
+        raise Unsupported(f"ordering of {column} (type {oid})")
+
+    # --- Output ---
+
+    def _column(self, name: str) -> List[Any]:
+        if name not in self._index or name == ROW_NUMBER_COLUMN:
+            raise Unsupported(f"column {name}")
+        index = self._index[name]
+        if self.base.has_truncated(index):
+            raise Unsupported(f"truncated values in {name}")
+        return self.base.columns[index]
+
+    def _gather(self, rows: List[int], row_numbers: List[int]) -> ResultSet:
+        columns = []
+        for name, values in zip(self.base.column_names, self.base.columns):
+            if name == ROW_NUMBER_COLUMN:
+                columns.append(row_numbers)
+            else:
+                columns.append([values[i] for i in rows])
+        return ResultSet(list(self.base.column_names), list(self.base.type_oids), columns)
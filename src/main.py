@@ -1,25 +1,42 @@
 #!/usr/bin/env python3
+import time
+
+STARTED = time.perf_counter()  # taken before the imports below, for the startup timing
+
+import os
 import tkinter as tk
+from src.catalog import default_cache_dir
 from src.config import DatabaseConfig
-from src.database import DatabaseConnection
-from src.ui.app import DatabaseQueryGUI
+from src.database import check_driver
+from src.metrics import StartupTimer
+from src.ui.workspaces import WorkspaceTabs
 from src.utils import setup_logging
 
 
 def main():
-    setup_logging()
+    startup = StartupTimer(STARTED)
+    startup.mark("imports")
+    check_driver()
+
+    # Per-query phase timings (JSON lines); DB_VIEWER_METRICS_LOG overrides the location.
+    setup_logging(
+        metrics_file=os.getenv("DB_VIEWER_METRICS_LOG") or os.path.join(default_cache_dir(), "metrics.log")
+    )
 
     # Use demo config or load from .env / environment variables
     # db_config = DatabaseConfig.from_env_file()
     db_config = DatabaseConfig.get_demo_config()
 
-    db = DatabaseConnection(db_config)
-
     root = tk.Tk()
-    app = DatabaseQueryGUI(root, db)
+    # One tab per connection profile; more are opened with "+ New Connection..."
+    workspaces = WorkspaceTabs(root)
+    workspaces.pack(fill=tk.BOTH, expand=True)
+    workspaces.open_tab(db_config, startup=startup)
+    # The first idle moment of the event loop: the window is drawn and responds.
+    root.after_idle(startup.mark, "window")
 
     def on_closing():
-        db.close()
+        workspaces.close_all()
         root.destroy()
 
     root.protocol("WM_DELETE_WINDOW", on_closing)
@@ -0,0 +1,175 @@
+import io
+import json
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, BinaryIO, Dict, Optional
+
+# Phases of a grid query, in the order they happen:
+#   connect  - checking out a pooled connection (opening one if needed, applying the timeout)
+#   server   - waiting for the server's first reply byte after each request (execution + round trips)
+#   transfer - receiving and decoding the rest of the rows in the driver
+#   format   - building the ResultSet and turning the visible cells into strings
+#   render   - updating the Treeview
+PHASES = ("connect", "server", "transfer", "format", "render")
+
+# Structured (one JSON object per line) timing records go to this logger; see setup_logging.
+METRICS_LOGGER = "db_viewer.metrics"
+
+
+@dataclass
+class QueryTimings:
+    """Milliseconds spent in each phase of one query, from checkout to the grid update."""
+    label: str = "query"
+    rows: int = 0
+    phases: Dict[str, float] = field(default_factory=dict)
+
+    def add(self, phase: str, ms: float):
+        self.phases[phase] = self.phases.get(phase, 0.0) + ms
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, (time.perf_counter() - start) * 1000)
+
+    @property
+    def total_ms(self) -> float:
+        return sum(self.phases.values())
+
+    def summary(self) -> str:
+        """Compact form for the status bar, e.g. 'connect 0.3 | server 12 | ... ms'."""
+        parts = [f"{name} {_ms(self.phases[name])}" for name in PHASES if name in self.phases]
+        return " | ".join(parts) + " ms" if parts else ""
+
+    def to_record(self) -> Dict[str, Any]:
+        record: Dict[str, Any] = {"label": self.label, "rows": self.rows}
+        record.update({f"{name}_ms": round(ms, 3) for name, ms in self.phases.items()})
+        record["total_ms"] = round(self.total_ms, 3)
+        return record
+
+
+def _ms(value: float) -> str:
+    return f"{value:.1f}" if value < 10 else f"{value:.0f}"
+
+
+def log_timings(timings: QueryTimings):
+    logging.getLogger(METRICS_LOGGER).info(json.dumps(timings.to_record()))
+
+
+class StartupTimer:
+    """
+    Startup milestones in milliseconds since `started` (a perf_counter value
+    taken before the application's imports). Written as one metrics record
+    once every milestone in `required` has been reached, whatever their order.
+    """
+
+    def __init__(self, started: float, required=("imports", "window", "connect")):
+        self.started = started
+        self.required = tuple(required)
+        self.marks: Dict[str, float] = {}
+        self.details: Dict[str, Any] = {}
+        self._logged = False
+
+    def mark(self, name: str, **details: Any):
+        if name in self.marks:
+            return
+        self.marks[name] = (time.perf_counter() - self.started) * 1000
+        self.details.update(details)
+        if not self._logged and all(m in self.marks for m in self.required):
+            self._logged = True
+            log_startup(self)
+
+    def to_record(self) -> Dict[str, Any]:
+        record: Dict[str, Any] = {"label": "startup"}
+        record.update({f"{name}_ms": round(ms, 3) for name, ms in self.marks.items()})
+        record.update(self.details)
+        return record
+
+
+def log_startup(timer: StartupTimer):
+    logging.getLogger(METRICS_LOGGER).info(json.dumps(timer.to_record()))
+    marks = ", ".join(f"{name} {_ms(ms)}" for name, ms in timer.marks.items())
+    logging.getLogger(__name__).info(f"Startup (ms since launch): {marks}")
+
+
+class TimedStream:
+    """
+    Wraps a driver connection's socket file and accumulates the time spent
+    blocked on the first read after each flush - i.e. waiting for the
+    server to answer a request - in reply_wait (seconds). Everything else
+    is passed through untouched.
+    """
+
+    def __init__(self, raw: BinaryIO):
+        self.raw = raw
+        self.reply_wait = 0.0
+        self._awaiting_reply = False
+
+    def read(self, size: int = -1) -> bytes:
+        if not self._awaiting_reply:
+            return self.raw.read(size)
+        start = time.perf_counter()
+        try:
+            return self.raw.read(size)
+        finally:
+            self.reply_wait += time.perf_counter() - start
+            self._awaiting_reply = False
+
+    def write(self, data) -> int:
+        return self.raw.write(data)
+
+    def flush(self):
+        self.raw.flush()
+        self._awaiting_reply = True
+
+    def __getattr__(self, name: str):
+        return getattr(self.raw, name)
+
+
+class Profiler:
+    """
+    cProfile for one query: profile() can be entered on several threads
+    (the worker running the query, then the UI thread rendering it); each
+    run is kept separately and save() writes them all to one report.
+    """
+
+    def __init__(self, label: str, top: int = 30):
+        self.label = label
+        self.top = top
+        self._runs: Dict[str, Any] = {}  # part -> cProfile.Profile
+
+    @contextmanager
+    def profile(self, part: str):
+        import cProfile  # profiling is opt-in; keep it out of startup
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            self._runs[part] = profiler
+
+    def report(self) -> str:
+        import pstats
+
+        out = io.StringIO()
+        for part, profiler in self._runs.items():
+            out.write(f"=== {self.label}: {part} ===\n")
+            pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(self.top)
+        return out.getvalue()
+
+    def save(self, path_prefix: str) -> Optional[str]:
+        """Write <prefix>.txt (readable report) and <prefix>-<part>.prof (pstats) files; returns the report path."""
+        if not self._runs:
+            return None
+        for part, profiler in self._runs.items():
+            profiler.dump_stats(f"{path_prefix}-{part}.prof")
+        report_path = f"{path_prefix}.txt"
+        with open(report_path, "w", encoding="utf-8") as f:
+            f.write(self.report())
+        return report_path
@@ -1,7 +1,27 @@
-from dataclasses import dataclass, field, asdict
+import weakref
+from dataclasses import dataclass, field, asdict, fields, replace
 from datetime import datetime
 from enum import Enum
-from typing import List, Any
+from typing import Any, Optional, Tuple, TypeVar
+
+from .params import InlineParams, QueryParams, array_literal
+
+
+T = TypeVar("T")
+
+# Canonical instance per distinct value; entries vanish with their last user.
+_INTERNED: "weakref.WeakValueDictionary[Tuple, Any]" = weakref.WeakValueDictionary()
+
+
+def interned(obj: T) -> T:
+    """
+    Hash-consing for the immutable models below: returns the one shared
+    instance equal to `obj`, so snapshots built separately reuse the same
+    Filter/SortCriterion/AppState objects and equal ones are identical.
+    """
+    # Key on the field values rather than the object, which would keep it alive.
+    key = (type(obj),) + tuple(getattr(obj, f.name) for f in fields(obj) if f.compare)
+    return _INTERNED.setdefault(key, obj)
 
 
 class FilterState(Enum):
@@ -9,7 +29,7 @@ class FilterState(Enum):
     INACTIVE = "Inactive"
 
 
-@dataclass
+@dataclass(frozen=True)
 class Filter:
     id: int
     column: str
@@ -18,7 +38,14 @@ class Filter:
     force_string: bool = False
     state: FilterState = FilterState.ACTIVE
 
-    def to_sql(self) -> str:
+    def to_sql(self, params: Optional[QueryParams] = None) -> str:
+        """
+        SQL condition for this filter. Values are bound through `params`
+        (placeholders plus a value dict); without it they are inlined as literals.
+        """
+        if params is None:
+            params = InlineParams()
+
         # Handle NULLs
         if self.value is None or str(self.value).upper() == 'NULL':
             if self.operator == "=": 
@@ -29,40 +56,28 @@ class Filter:
 
         # Handle IN / NOT IN
         if self.operator in ["IN", "NOT IN"]:
-            items = [item.strip() for item in str(self.value).split(',') if item.strip()]
+            items = [item.strip().strip("'").strip('"') for item in str(self.value).split(',') if item.strip()]
             if not items:
                 return "1=0"
-            
-            sql_items = []
-            for item in items:
-                cleaned_item = item.strip().strip("'").strip('"')
-                try:
-                    # Check if numeric
-                    float(cleaned_item)
-                    sql_items.append(cleaned_item)
-                except ValueError:
-                    # It's a string, escape quotes
-                    sql_items.append("'" + cleaned_item.replace("'", "''") + "'")
-
-            values_sql = ', '.join(sql_items)
-            return f'"{self.column}" {self.operator} ({values_sql})'
+
+            if params.inline:
+                values_sql = ', '.join(params.add(item) for item in items)
+                return f'"{self.column}" {self.operator} ({values_sql})'
+
+            # One array parameter keeps the statement identical whatever the list length
+            placeholder = params.add(array_literal(items))
+            if self.operator == "IN":
+                return f'"{self.column}" = ANY({placeholder})'
+            return f'"{self.column}" <> ALL({placeholder})'
 
         # Handle ILIKE
         if self.operator in ["ILIKE", "NOT ILIKE"]:
-            raw_value = str(self.value).replace("'", "''")
-            return f'"{self.column}" {self.operator} \'%{raw_value}%\''
-        
-        # Standard operators
-        if self.force_string:
-            sql_value = "'" + str(self.value).replace("'", "''") + "'"
-        else:
-            try:
-                float(self.value)
-                sql_value = str(self.value)
-            except (ValueError, TypeError):
-                sql_value = "'" + str(self.value).replace("'", "''") + "'"
-
-        return f'"{self.column}" {self.operator} {sql_value}'
+            return f'"{self.column}" {self.operator} {params.add(f"%{self.value}%")}'
+
+        # Standard operators. Values stay untyped text, so Postgres reads them
+        # as the column's type (force_string is no longer needed to keep digits
+        # from being compared as numbers against text columns).
+        return f'"{self.column}" {self.operator} {params.add(str(self.value))}'
 
     def __str__(self):
         op_map = {"ILIKE": "contains", "NOT ILIKE": "not contains"}
@@ -82,9 +97,9 @@ class Filter:
     @classmethod
     def from_dict(cls, data):
         data['state'] = FilterState(data['state'])
-        return cls(**data)
+        return interned(cls(**data))
 
-@dataclass
+@dataclass(frozen=True)
 class SortCriterion:
     column: str
     direction: str = "ASC"
@@ -100,21 +115,52 @@ class SortCriterion:
     
     @classmethod
     def from_dict(cls, data):
-        return cls(**data)
+        return interned(cls(**data))
 
-@dataclass
+@dataclass(frozen=True)
 class AppState:
     """
     Represents a snapshot of the application state for history navigation and saving.
+
+    Immutable: snapshots share their filter and sort objects instead of
+    copying them, and compare (and hash) by value, ignoring the timestamp.
+    Use snapshot() to get the canonical, fully interned instance.
     """
     schema: str
     table: str
-    filters: List[Filter]
-    sorting: List[SortCriterion]
+    filters: Tuple[Filter, ...]
+    sorting: Tuple[SortCriterion, ...]
     row_limit: int
     is_manual_mode: bool
     manual_query_text: str
-    timestamp: datetime = field(default_factory=datetime.now)
+    timestamp: datetime = field(default_factory=datetime.now, compare=False)
+
+    def __post_init__(self):
+        # Accept lists from callers; store tuples so the state stays hashable.
+        object.__setattr__(self, "filters", tuple(self.filters))
+        object.__setattr__(self, "sorting", tuple(self.sorting))
+
+    def snapshot(self) -> "AppState":
+        """The interned instance equal to this state (its timestamp is the first one seen)."""
+        return interned(replace(
+            self,
+            filters=tuple(interned(f) for f in self.filters),
+            sorting=tuple(interned(s) for s in self.sorting),
+        ))
+
+    def result_key(self) -> Tuple:
+        """
+        Hashable identity of the rows this state displays. Ignores the
+        timestamp, inactive filters and filter order; manual queries are
+        keyed by their SQL alone.
+        """
+        if self.is_manual_mode:
+            return ("manual", self.manual_query_text.strip())
+        filters = tuple(sorted(
+            (f.column, f.operator, str(f.value)) for f in self.filters if f.state == FilterState.ACTIVE
+        ))
+        sorting = tuple((s.column, s.direction) for s in self.sorting)
+        return ("table", self.schema, self.table, filters, sorting, self.row_limit)
 
     def to_dict(self):
         return {
@@ -130,7 +176,7 @@ class AppState:
 
     @classmethod
     def from_dict(cls, data):
-        return cls(
+        return interned(cls(
             schema=data["schema"],
             table=data["table"],
             filters=[Filter.from_dict(f) for f in data["filters"]],
@@ -139,4 +185,4 @@ class AppState:
             is_manual_mode=data["is_manual_mode"],
             manual_query_text=data["manual_query_text"],
             timestamp=datetime.fromisoformat(data["timestamp"])
-        )
\ No newline at end of file
+        ))
\ No newline at end of file
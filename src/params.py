@@ -0,0 +1,63 @@
+import json
+import math
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Dict, Iterable
+
+
+def sql_literal(value: Any) -> str:
+    """Render a Python value (as returned by the driver) as a SQL literal."""
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, float) and not math.isfinite(value):
+        return f"'{value}'"
+    if isinstance(value, (int, float, Decimal)):
+        return str(value)
+    if isinstance(value, (datetime, date, time)):
+        return f"'{value.isoformat()}'"
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return f"'\\x{bytes(value).hex()}'::bytea"
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def array_literal(items: Iterable[Any]) -> str:
+    """Postgres array input syntax ('{"a","b"}'), left untyped so the server casts it to the column's array type."""
+    quoted = []
+    for item in items:
+        text = str(item).replace("\\", "\\\\").replace('"', '\\"')
+        quoted.append(f'"{text}"')
+    return "{" + ",".join(quoted) + "}"
+
+
+class QueryParams:
+    """
+    Collects bind values while a query is being built.
+
+    add() returns the placeholder to splice into the SQL text, so the text only
+    depends on the query's shape and can be reused as a prepared statement while
+    the values change. Values are sent untyped and Postgres infers each type
+    from the column it is compared with.
+    """
+
+    inline = False
+
+    def __init__(self):
+        self.values: Dict[str, Any] = {}
+
+    def add(self, value: Any) -> str:
+        name = f"p{len(self.values)}"
+        self.values[name] = value
+        return f":{name}"
+
+
+class InlineParams(QueryParams):
+    """Renders values as literals instead: for SQL shown to the user, copied or run through COPY."""
+
+    inline = True
+
+    def add(self, value: Any) -> str:
+        return sql_literal(value)
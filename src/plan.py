@@ -0,0 +1,192 @@
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+# EXPLAIN fields shown as dedicated columns/figures rather than in a node's details.
+_SUMMARY_FIELDS = {
+    "Node Type", "Plans", "Startup Cost", "Total Cost", "Plan Rows", "Plan Width",
+    "Actual Startup Time", "Actual Total Time", "Actual Rows", "Actual Loops",
+    "Shared Hit Blocks", "Shared Read Blocks",
+}
+_AGGREGATE_NAMES = {"Hashed": "HashAggregate", "Sorted": "GroupAggregate", "Mixed": "MixedAggregate"}
+
+# A node's self time share of the whole execution at which it is highlighted.
+HOT_SHARE = 0.20
+WARM_SHARE = 0.05
+# Estimated vs. actual rows off by this factor (either way) are flagged.
+MISESTIMATE_FACTOR = 10.0
+
+
+def build_explain_query(query: str, analyze: bool = False) -> str:
+    """EXPLAIN in JSON form; with `analyze` the statement is executed and buffer usage collected."""
+    options = "ANALYZE, BUFFERS, FORMAT JSON" if analyze else "FORMAT JSON"
+    return f"EXPLAIN ({options}) {query.strip().rstrip(';')}"
+
+
+@dataclass
+class PlanNode:
+    """
+    One node of an EXPLAIN plan. Actual figures are None unless the plan
+    was ANALYZEd. Like EXPLAIN itself, actual_rows and actual_total_ms are
+    per loop, and times and buffer counts include the node's children.
+    """
+    node_type: str
+    details: Dict[str, Any]
+    startup_cost: float
+    total_cost: float
+    plan_rows: int
+    actual_rows: Optional[float] = None
+    loops: Optional[int] = None
+    actual_total_ms: Optional[float] = None
+    shared_hit: int = 0
+    shared_read: int = 0
+    children: List["PlanNode"] = field(default_factory=list)
+    # Below a Limit a node is expected to stop before producing its estimated rows.
+    under_limit: bool = False
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any], under_limit: bool = False) -> "PlanNode":
+        node_type = data.get("Node Type", "?")
+        child_under_limit = under_limit or node_type == "Limit"
+        return cls(
+            node_type=node_type,
+            # Unused block counters are just noise
+            details={
+                k: v for k, v in data.items()
+                if k not in _SUMMARY_FIELDS and not (k.endswith(" Blocks") and not v)
+            },
+            startup_cost=data.get("Startup Cost", 0.0),
+            total_cost=data.get("Total Cost", 0.0),
+            plan_rows=data.get("Plan Rows", 0),
+            actual_rows=data.get("Actual Rows"),
+            loops=data.get("Actual Loops"),
+            actual_total_ms=data.get("Actual Total Time"),
+            shared_hit=data.get("Shared Hit Blocks", 0),
+            shared_read=data.get("Shared Read Blocks", 0),
+            children=[cls.from_json(child, child_under_limit) for child in data.get("Plans", [])],
+            under_limit=under_limit,
+        )
+
+    @property
+    def label(self) -> str:
+        """Node type plus what it works on, e.g. 'Index Scan using items_pkey on items'."""
+        d = self.details
+        # Named the way psql's text format names them
+        label = _AGGREGATE_NAMES.get(d.get("Strategy"), self.node_type) if self.node_type == "Aggregate" else self.node_type
+        join_type = d.get("Join Type")
+        if join_type and join_type != "Inner":
+            label = label[:-len(" Join")] if label.endswith(" Join") else label
+            label += f" {join_type} Join"
+        if d.get("Index Name"):
+            label += f" using {d['Index Name']}"
+        if d.get("Relation Name"):
+            label += f" on {d['Relation Name']}"
+            if d.get("Alias") and d["Alias"] != d["Relation Name"]:
+                label += f" {d['Alias']}"
+        elif d.get("CTE Name"):
+            label += f" on {d['CTE Name']}"
+        if d.get("Parent Relationship") in ("InitPlan", "SubPlan") and d.get("Subplan Name"):
+            label = f"{d['Subplan Name']}: {label}"
+        return label
+
+    @property
+    def analyzed(self) -> bool:
+        return self.actual_total_ms is not None
+
+    @property
+    def never_executed(self) -> bool:
+        return self.analyzed and not self.loops
+
+    @property
+    def total_ms(self) -> float:
+        """Time spent in this node and its children over all loops."""
+        if not self.analyzed:
+            return 0.0
+        return self.actual_total_ms * (self.loops or 0)
+
+    @property
+    def self_ms(self) -> float:
+        """Time spent in this node alone (clamped: parallel workers and CTEs make the subtraction inexact)."""
+        return max(0.0, self.total_ms - sum(child.total_ms for child in self.children))
+
+    @property
+    def self_hit(self) -> int:
+        return max(0, self.shared_hit - sum(child.shared_hit for child in self.children))
+
+    @property
+    def self_read(self) -> int:
+        return max(0, self.shared_read - sum(child.shared_read for child in self.children))
+
+    @property
+    def row_misestimate(self) -> Optional[float]:
+        """
+        How far the planner's row estimate was off, as a factor >= 1: positive
+        when it expected too few rows, negative when too many. None if not
+        analyzed, or if fewer rows than estimated were read because of a Limit.
+        """
+        if not self.analyzed or not self.loops:
+            return None
+        actual = max(self.actual_rows, 1.0)
+        estimated = max(float(self.plan_rows), 1.0)
+        if actual >= estimated:
+            return actual / estimated
+        return None if self.under_limit else -estimated / actual
+
+    def walk(self) -> Iterator["PlanNode"]:
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+
+@dataclass
+class ExplainResult:
+    root: PlanNode
+    planning_ms: Optional[float] = None
+    execution_ms: Optional[float] = None
+    triggers: List[Dict[str, Any]] = field(default_factory=list)
+    raw: Any = None
+
+    @property
+    def analyzed(self) -> bool:
+        return self.root.analyzed
+
+    @property
+    def total_ms(self) -> float:
+        """Execution time, falling back to the root node's time."""
+        return self.execution_ms if self.execution_ms is not None else self.root.total_ms
+
+    def share(self, node: PlanNode) -> float:
+        """Fraction of the execution spent in a node alone."""
+        total = self.total_ms
+        return node.self_ms / total if total > 0 else 0.0
+
+    def heat(self, node: PlanNode) -> Optional[str]:
+        """'hot' or 'warm' for the nodes that take a large share of the execution time."""
+        share = self.share(node)
+        if share >= HOT_SHARE:
+            return "hot"
+        if share >= WARM_SHARE:
+            return "warm"
+        return None
+
+    def hottest(self, count: int = 3) -> List[PlanNode]:
+        nodes = [node for node in self.root.walk() if node.self_ms > 0]
+        return sorted(nodes, key=lambda node: node.self_ms, reverse=True)[:count]
+
+
+def parse_explain(value: Any) -> ExplainResult:
+    """Parse the single value returned by EXPLAIN (FORMAT JSON), as text or already decoded."""
+    doc = json.loads(value) if isinstance(value, str) else value
+    if isinstance(doc, list):
+        doc = doc[0]
+    try:
+        plan = doc["Plan"]
+    except (KeyError, TypeError):
+        raise ValueError("Not an EXPLAIN (FORMAT JSON) document")
+    return ExplainResult(
+        root=PlanNode.from_json(plan),
+        planning_ms=doc.get("Planning Time"),
+        execution_ms=doc.get("Execution Time"),
+        triggers=doc.get("Triggers", []),
+        raw=doc,
+    )
@@ -0,0 +1,206 @@
+import threading
+import time
+import logging
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes available within the checkout timeout."""
+
+
+@dataclass
+class PooledConnection:
+    """A raw driver connection plus the bookkeeping the pool needs for it."""
+    raw: Any
+    lane: str
+    info: Dict[str, Any] = field(default_factory=dict)
+    created_at: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+
+
+class ConnectionPool:
+    """
+    Bounded connection pool split into per-purpose lanes.
+
+    Each lane owns its own connections and capacity, so a long-running count in
+    the 'long' lane can never take the connection a grid page load is waiting for.
+    The pool itself is driver-agnostic: opening, pinging, resetting and closing
+    connections is delegated to the callables passed in by the owner.
+    """
+
+    DEFAULT_LANES = {"metadata": 1, "grid": 2, "long": 2, "control": 1, "prefetch": 1}
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        is_alive: Callable[[Any], bool],
+        ping: Callable[[Any], None],
+        closer: Callable[[Any], None],
+        reset: Optional[Callable[[Any], None]] = None,
+        lanes: Optional[Dict[str, int]] = None,
+        max_idle_seconds: float = 300.0,
+        health_check_after: float = 30.0,
+        checkout_timeout: float = 30.0,
+    ):
+        self.factory = factory
+        self.is_alive = is_alive
+        self.ping = ping
+        self.closer = closer
+        self.reset = reset
+        self.lanes = dict(lanes or self.DEFAULT_LANES)
+        self.max_idle_seconds = max_idle_seconds
+        self.health_check_after = health_check_after
+        self.checkout_timeout = checkout_timeout
+        self.logger = logging.getLogger(__name__)
+
+        self._cond = threading.Condition()
+        self._idle: Dict[str, Deque[PooledConnection]] = {lane: deque() for lane in self.lanes}
+        self._in_use: Dict[str, int] = {lane: 0 for lane in self.lanes}
+        self._closed = False
+
+    @contextmanager
+    def connection(self, lane: str = "grid") -> Iterator[PooledConnection]:
+        """Check out a connection for the duration of the with-block."""
+        pooled = self.acquire(lane)
+        discard = False
+        try:
+            yield pooled
+        except Exception:
+            # The session may be left in an aborted transaction: only a connection
+            # that could be reset to a clean state goes back to the pool.
+            discard = not self._reset(pooled)
+            raise
+        finally:
+            self.release(pooled, discard=discard)
+
+    def acquire(self, lane: str = "grid", timeout: Optional[float] = None) -> PooledConnection:
+        if lane not in self.lanes:
+            raise ValueError(f"Unknown pool lane '{lane}'")
+        timeout = self.checkout_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        stale: List[PooledConnection] = []
+        try:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise ConnectionError("Connection pool is closed.")
+                    stale.extend(self._take_stale_locked())
+
+                    idle = self._idle[lane]
+                    if idle:
+                        pooled = idle.pop()
+                        self._in_use[lane] += 1
+                        break
+                    if self._in_use[lane] < self.lanes[lane]:
+                        # Reserve the slot now, open the socket outside the lock.
+                        self._in_use[lane] += 1
+                        pooled = None
+                        break
+
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeout(f"No '{lane}' connection available after {timeout:.0f}s")
+                    self._cond.wait(remaining)
+        finally:
+            # Socket I/O stays outside the lock.
+            for old in stale:
+                self._close_raw(old.raw)
+
+        try:
+            if pooled is not None and not self._is_healthy(pooled):
+                self._close_raw(pooled.raw)
+                pooled = None
+            if pooled is None:
+                pooled = PooledConnection(raw=self.factory(), lane=lane)
+                self.logger.debug(f"Opened new '{lane}' pool connection")
+        except Exception:
+            with self._cond:
+                self._in_use[lane] -= 1
+                self._cond.notify()
+            raise
+
+        pooled.last_used = time.monotonic()
+        return pooled
+
+    def release(self, pooled: PooledConnection, discard: bool = False):
+        lane = pooled.lane
+        close_it = discard or not self.is_alive(pooled.raw)
+        with self._cond:
+            self._in_use[lane] -= 1
+            if self._closed:
+                close_it = True
+            if not close_it:
+                pooled.last_used = time.monotonic()
+                self._idle[lane].append(pooled)
+            self._cond.notify()
+        if close_it:
+            self._close_raw(pooled.raw)
+
+    def evict_idle(self):
+        """Close connections that have sat unused longer than max_idle_seconds."""
+        with self._cond:
+            stale = self._take_stale_locked()
+        for pooled in stale:
+            self._close_raw(pooled.raw)
+
+    def close_all(self):
+        """Close every idle connection and refuse further checkouts."""
+        with self._cond:
+            self._closed = True
+            to_close = [p for lane in self._idle.values() for p in lane]
+            for lane in self._idle.values():
+                lane.clear()
+            self._cond.notify_all()
+        for pooled in to_close:
+            self._close_raw(pooled.raw)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._cond:
+            return {
+                lane: {"idle": len(self._idle[lane]), "in_use": self._in_use[lane], "max": size}
+                for lane, size in self.lanes.items()
+            }
+
+    def _take_stale_locked(self) -> List[PooledConnection]:
+        """Remove connections idle longer than max_idle_seconds; the caller closes them after releasing the lock."""
+        cutoff = time.monotonic() - self.max_idle_seconds
+        stale = []
+        for lane, idle in self._idle.items():
+            # Most recently used connections are appended on the right.
+            while idle and idle[0].last_used < cutoff:
+                stale.append(idle.popleft())
+                self.logger.debug(f"Evicting idle '{lane}' pool connection")
+        return stale
+
+    def _reset(self, pooled: PooledConnection) -> bool:
+        """Bring a connection back to a clean session after a failed checkout; False if it can't be reused."""
+        if self.reset is None or not self.is_alive(pooled.raw):
+            return False
+        try:
+            self.reset(pooled.raw)
+            return True
+        except Exception as e:
+            self.logger.warning(f"Discarding pooled connection that could not be reset: {e}")
+            return False
+
+    def _is_healthy(self, pooled: PooledConnection) -> bool:
+        if not self.is_alive(pooled.raw):
+            return False
+        if time.monotonic() - pooled.last_used < self.health_check_after:
+            return True
+        try:
+            self.ping(pooled.raw)
+            return True
+        except Exception as e:
+            self.logger.warning(f"Pooled connection failed health check: {e}")
+            return False
+
+    def _close_raw(self, raw: Any):
+        try:
+            self.closer(raw)
+        except Exception as e:
+            self.logger.error(f"Error closing pooled connection: {e}")
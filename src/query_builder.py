@@ -0,0 +1,226 @@
+from typing import Any, Collection, Dict, List, Optional, Sequence, Tuple
+
+from .models import Filter, FilterState, SortCriterion
+from .params import InlineParams, QueryParams
+from .results import FULL_SIZE_PREFIX, PREVIEW_PREFIX
+
+ROW_NUMBER_COLUMN = "row"
+
+# Column types whose values can be arbitrarily large (text, varchar, json, jsonb, bytea, xml);
+# candidates for truncation in wide-column mode.
+WIDE_TYPE_OIDS = {25, 1043, 114, 3802, 17, 142}
+TEXT_PREFIX = "__text__"
+
+
+def build_where(filters: Sequence[Filter], params: QueryParams, extra: Sequence[str] = ()) -> str:
+    """Return a WHERE clause (with leading newline) for the active filters, or ''."""
+    clauses = [f.to_sql(params) for f in filters if f.state == FilterState.ACTIVE]
+    clauses.extend(extra)
+    if not clauses:
+        return ""
+    return "\nWHERE\n" + " AND\n  ".join(clauses)
+
+
+def keyset_predicate(
+    key: Sequence[SortCriterion],
+    values: Sequence[Any],
+    params: QueryParams,
+    not_null: Collection[str] = (),
+) -> str:
+    """
+    Predicate selecting the rows strictly after `values` in the ordering `key`
+    (Postgres defaults: ASC sorts NULLs last, DESC sorts them first).
+
+    When every key column is known NOT NULL and shares one direction this is a
+    single row comparison, which Postgres can answer straight from a matching
+    composite index. Otherwise it expands to the equivalent lexicographic OR-chain,
+    adding a bound on the leading column when that is sound so the index on it
+    still narrows the scan.
+    """
+    directions = {s.direction for s in key}
+    if len(directions) == 1 and all(s.column in not_null for s in key):
+        op = ">" if directions == {"ASC"} else "<"
+        cols = ", ".join(f'"{s.column}"' for s in key)
+        vals = ", ".join(params.add(v) for v in values)
+        return f"({cols}) {op} ({vals})"
+
+    branches = []
+    for i, (criterion, value) in enumerate(zip(key, values)):
+        after = _after_clause(criterion, value, params, criterion.column in not_null)
+        if after is None:
+            continue
+        ties = [
+            f'"{s.column}" = {params.add(v)}' if s.column in not_null and v is not None
+            else f'"{s.column}" IS NOT DISTINCT FROM {params.add(v)}'
+            for s, v in zip(key[:i], values[:i])
+        ]
+        branches.append("(" + " AND ".join(ties + [after]) + ")" if ties else after)
+
+    if not branches:
+        return "FALSE"
+    predicate = "(" + "\n     OR ".join(branches) + ")"
+
+    lead, lead_value = key[0], values[0]
+    if lead.column in not_null and lead_value is not None:
+        op = ">=" if lead.direction == "ASC" else "<="
+        predicate = f'"{lead.column}" {op} {params.add(lead_value)} AND {predicate}'
+    return predicate
+
+
+def _after_clause(criterion: SortCriterion, value: Any, params: QueryParams, is_not_null: bool) -> Optional[str]:
+    column = f'"{criterion.column}"'
+    if criterion.direction == "ASC":
+        if value is None:
+            return None  # NULLs sort last; nothing comes after them
+        if is_not_null:
+            return f"{column} > {params.add(value)}"
+        return f"({column} > {params.add(value)} OR {column} IS NULL)"
+    if value is None:
+        return f"{column} IS NOT NULL"  # NULLs sort first in DESC
+    return f"{column} < {params.add(value)}"
+
+
+def paging_key(sorting: Sequence[SortCriterion], primary_key: Sequence[str]) -> List[SortCriterion]:
+    """The user's sort columns followed by any primary key columns as a unique tiebreaker."""
+    key = [s for s in sorting if s.column != ROW_NUMBER_COLUMN]
+    sorted_columns = {s.column for s in key}
+    key.extend(SortCriterion(column=c, direction="ASC") for c in primary_key if c not in sorted_columns)
+    return key
+
+
+def build_grid_query(
+    schema: str,
+    table: str,
+    filters: Sequence[Filter],
+    sorting: Sequence[SortCriterion],
+    row_limit: int,
+    primary_key: Sequence[str] = (),
+    after_values: Optional[Sequence[Any]] = None,
+    offset: int = 0,
+    row_offset: int = 0,
+    not_null: Collection[str] = (),
+    params: Optional[QueryParams] = None,
+    columns: Sequence[str] = (),
+    truncate: Collection[str] = (),
+    truncate_chars: int = 200,
+) -> str:
+    """
+    Build the grid query for a table page.
+
+    With a primary key, pages are addressed by keyset: `after_values` are the key
+    values (see paging_key) of the last row on the previous page, so page N costs
+    the same as page 1. Without one, `offset` is used as a fallback.
+    `row_offset` keeps the "row" column numbering continuous across pages.
+
+    Pass a QueryParams to get placeholder SQL (values collected in
+    params.values) whose text is the same for every page of a filter/sort
+    combination; by default values are inlined as literals.
+
+    Wide-column mode: given the table's `columns` (in order), values of the
+    `truncate` columns whose text form is over `truncate_chars` bytes come back
+    as NULL, and each such column is followed at the end of the select list by
+    a preview (its first `truncate_chars` characters) and its full size in bytes
+    (see ResultSet.from_driver). Only the page's rows are measured, after the
+    LIMIT; filters and sorting still see the complete values.
+    """
+    if not schema or not table:
+        return ""
+    if params is None:
+        params = InlineParams()
+
+    inner_sorting = [s for s in sorting if s.column != ROW_NUMBER_COLUMN]
+    outer_sorting = [s for s in sorting if s.column == ROW_NUMBER_COLUMN]
+    order_key = paging_key(sorting, primary_key) if primary_key else inner_sorting
+
+    extra = []
+    if after_values is not None and primary_key:
+        extra.append(keyset_predicate(order_key, after_values, params, set(not_null) | set(primary_key)))
+
+    inner_query = f'SELECT * FROM "{schema}"."{table}"'
+    inner_query += build_where(filters, params, extra)
+
+    if order_key:
+        sort_clauses = [s.to_sql() for s in order_key]
+        inner_query += f"\nORDER BY\n  {', '.join(sort_clauses)}"
+
+    inner_query += f"\nLIMIT {params.add(row_limit)}"
+    # Bound values always keep their placeholder so page 1 shares page N's statement.
+    if not primary_key and (offset or not params.inline):
+        inner_query += f" OFFSET {params.add(offset)}"
+
+    inner_query_indented = "    " + inner_query.replace("\n", "\n    ")
+    row_number = "ROW_NUMBER() OVER ()"
+    if row_offset or not params.inline:
+        row_number += f" + {params.add(row_offset)}"
+
+    select_list, source = "*", "sorted_results"
+    if columns and truncate:
+        select_list, source = _wide_select(columns, truncate, int(truncate_chars))
+
+    query = f"""WITH sorted_results AS (
+{inner_query_indented}
+)
+SELECT
+    {row_number} AS "row",
+    {select_list}
+FROM {source}"""
+
+    if outer_sorting:
+        sort_clauses = [s.to_sql() for s in outer_sorting]
+        query += f"\nORDER BY\n  {', '.join(sort_clauses)}"
+
+    query += ";"
+    return query
+
+
+def _wide_select(columns: Sequence[str], truncate: Collection[str], limit: int) -> Tuple[str, str]:
+    """Select list and FROM source for wide-column mode (see build_grid_query)."""
+    items, extra, texts = [], [], []
+    for column in columns:
+        if column not in truncate:
+            items.append(f'"{column}"')
+            continue
+        text = f'"{TEXT_PREFIX}{column}"'
+        texts.append(f'"{column}"::text AS {text}')
+        is_wide = f"octet_length({text}) > {limit}"
+        items.append(f'CASE WHEN {is_wide} THEN NULL ELSE "{column}" END AS "{column}"')
+        extra.append(f'CASE WHEN {is_wide} THEN left({text}, {limit}) END AS "{PREVIEW_PREFIX}{column}"')
+        extra.append(f'CASE WHEN {is_wide} THEN octet_length({text}) END AS "{FULL_SIZE_PREFIX}{column}"')
+    # OFFSET 0 keeps the planner from inlining the subquery, which would
+    # repeat each (possibly large) text conversion at every use.
+    source = f"(SELECT *, {', '.join(texts)} FROM sorted_results OFFSET 0) AS sorted_results"
+    return ",\n    ".join(items + extra), source
+
+
+def build_export_query(
+    schema: str,
+    table: str,
+    filters: Sequence[Filter],
+    sorting: Sequence[SortCriterion],
+    params: Optional[QueryParams] = None,
+) -> str:
+    """Every row matching the filters, in the grid's sort order, without LIMIT or row numbers (for COPY)."""
+    params = params if params is not None else InlineParams()
+    query = f'SELECT * FROM "{schema}"."{table}"' + build_where(filters, params)
+    sort_clauses = [s.to_sql() for s in sorting if s.column != ROW_NUMBER_COLUMN]
+    if sort_clauses:
+        query += f"\nORDER BY\n  {', '.join(sort_clauses)}"
+    return query
+
+
+def build_count_query(schema: str, table: str, filters: Sequence[Filter], params: Optional[QueryParams] = None) -> str:
+    """SQL strictly for counting (ignores sort/limit)."""
+    params = params if params is not None else InlineParams()
+    return f'SELECT count(*) FROM "{schema}"."{table}"' + build_where(filters, params) + ";"
+
+
+def build_estimate_query(schema: str, table: str, filters: Sequence[Filter], params: Optional[QueryParams] = None) -> str:
+    """Row-producing form of the count query, for reading the planner's row estimate."""
+    params = params if params is not None else InlineParams()
+    return f'SELECT 1 FROM "{schema}"."{table}"' + build_where(filters, params) + ";"
+
+
+def build_cell_query(schema: str, table: str, column: str, key: Dict[str, Any], params: QueryParams) -> str:
+    """One cell's complete value, as text, located by its row's primary key values."""
+    conditions = " AND ".join(f'"{name}" = {params.add(value)}' for name, value in key.items())
+    return f'SELECT "{column}"::text FROM "{schema}"."{table}" WHERE {conditions};'
@@ -0,0 +1,197 @@
+import json
+import sys
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+# Postgres type OIDs that need something other than plain str() for display
+JSON_OID = 114
+JSONB_OID = 3802
+TIMESTAMP_OID = 1114
+TIMESTAMPTZ_OID = 1184
+BYTEA_OID = 17
+
+NULL_DISPLAY = "NULL"
+
+# Grid queries in wide-column mode (see build_grid_query) return oversized
+# cells as NULL, followed by "<prefix><column>" columns with their first
+# characters and their full size in bytes.
+PREVIEW_PREFIX = "__preview__"
+FULL_SIZE_PREFIX = "__full_size__"
+
+
+class TruncatedText(str):
+    """The first characters of a wide cell, as text; `full_size` is the complete value's size in bytes."""
+
+    def __new__(cls, text: str, full_size: int):
+        obj = super().__new__(cls, text)
+        obj.full_size = full_size
+        return obj
+
+
+def format_size(size: int) -> str:
+    for unit, scale in (("MB", 1 << 20), ("KB", 1 << 10)):
+        if size >= scale:
+            return f"{size / scale:.1f} {unit}"
+    return f"{size} B"
+
+
+def format_value(val: Any) -> str:
+    """Type-agnostic display formatting, matching the grid's historical output."""
+    if val is None:
+        return NULL_DISPLAY
+    if isinstance(val, TruncatedText):
+        return f"{val}… [{format_size(val.full_size)}]"
+    if isinstance(val, datetime):
+        return val.strftime("%Y-%m-%d %H:%M:%S")
+    return str(val)
+
+
+def _format_json(val: Any) -> str:
+    if val is None:
+        return NULL_DISPLAY
+    if isinstance(val, str):
+        return format_value(val)
+    return json.dumps(val)
+
+
+def _format_bytes(val: Any) -> str:
+    if val is None:
+        return NULL_DISPLAY
+    if isinstance(val, TruncatedText):
+        return format_value(val)
+    return "\\x" + bytes(val).hex()
+
+
+_FORMATTERS: Dict[int, Callable[[Any], str]] = {
+    JSON_OID: _format_json,
+    JSONB_OID: _format_json,
+    BYTEA_OID: _format_bytes,
+}
+
+
+def formatter_for(type_oid: Optional[int]) -> Callable[[Any], str]:
+    return _FORMATTERS.get(type_oid, format_value)
+
+
+class ResultSet:
+    """
+    Column-oriented query result.
+
+    Raw driver values are kept per column together with the Postgres type OIDs
+    reported in the row description; cells are only turned into strings when
+    they are displayed, copied or exported.
+    """
+
+    __slots__ = ("column_names", "type_oids", "columns", "error", "timings", "_formatters")
+
+    def __init__(
+        self,
+        column_names: List[str],
+        type_oids: Optional[List[Optional[int]]] = None,
+        columns: Optional[List[List[Any]]] = None,
+        error: Optional[str] = None,
+    ):
+        self.column_names = column_names
+        self.type_oids = type_oids if type_oids is not None else [None] * len(column_names)
+        self.columns = columns if columns is not None else [[] for _ in column_names]
+        self.error = error
+        self.timings = None  # QueryTimings, when the result came from DatabaseConnection.execute_query
+        self._formatters = [formatter_for(oid) for oid in self.type_oids]
+
+    @classmethod
+    def from_rows(cls, column_names: List[str], type_oids: Optional[List[Optional[int]]], rows: Sequence[Sequence[Any]]) -> "ResultSet":
+        if rows:
+            columns = [list(col) for col in zip(*rows)]
+        else:
+            columns = [[] for _ in column_names]
+        return cls(column_names, type_oids, columns)
+
+    @classmethod
+    def from_driver(cls, driver_columns: Optional[List[Dict[str, Any]]], rows: Sequence[Sequence[Any]]) -> "ResultSet":
+        """
+        Build from a pg8000 row description (conn.columns) and its rows.
+        The preview columns of a wide-column grid query are folded back into
+        the columns they belong to: cells that were cut short become TruncatedText.
+        """
+        driver_columns = driver_columns or []
+        names = [col["name"] for col in driver_columns]
+        oids = [col.get("type_oid") for col in driver_columns]
+        result = cls.from_rows(names, oids, rows)
+        if any(name.startswith(PREVIEW_PREFIX) for name in names):
+            result = result._fold_previews()
+        return result
+
+    def _fold_previews(self) -> "ResultSet":
+        index = {name: i for i, name in enumerate(self.column_names)}
+        for name, target in index.items():
+            preview = index.get(PREVIEW_PREFIX + name)
+            size = index.get(FULL_SIZE_PREFIX + name)
+            if preview is None or size is None:
+                continue
+            values = self.columns[target]
+            for row, full_size in enumerate(self.columns[size]):
+                if full_size is not None:
+                    values[row] = TruncatedText(self.columns[preview][row], full_size)
+        keep = [i for i, name in enumerate(self.column_names)
+                if not name.startswith((PREVIEW_PREFIX, FULL_SIZE_PREFIX))]
+        return ResultSet(
+            [self.column_names[i] for i in keep],
+            [self.type_oids[i] for i in keep],
+            [self.columns[i] for i in keep],
+        )
+
+    @classmethod
+    def from_error(cls, message: str) -> "ResultSet":
+        return cls(["Error"], columns=[[message]], error=message)
+
+    @property
+    def is_error(self) -> bool:
+        return self.error is not None
+
+    def __len__(self) -> int:
+        return len(self.columns[0]) if self.columns else 0
+
+    def extend(self, other: "ResultSet"):
+        """Append the rows of another batch with the same shape."""
+        for mine, theirs in zip(self.columns, other.columns):
+            mine.extend(theirs)
+
+    def row(self, index: int) -> List[Any]:
+        return [col[index] for col in self.columns]
+
+    def rows(self) -> Iterator[List[Any]]:
+        return (list(row) for row in zip(*self.columns))
+
+    def column_values(self, col_index: int) -> List[Any]:
+        return self.columns[col_index]
+
+    def has_truncated(self, col_index: Optional[int] = None) -> bool:
+        """Whether any cell (of one column, or of all) holds only the start of its value."""
+        columns = self.columns if col_index is None else [self.columns[col_index]]
+        return any(isinstance(val, TruncatedText) for col in columns for val in col)
+
+    def formatted_cell(self, row_index: int, col_index: int) -> str:
+        return self._formatters[col_index](self.columns[col_index][row_index])
+
+    def formatted_row(self, index: int) -> List[str]:
+        return [fmt(col[index]) for fmt, col in zip(self._formatters, self.columns)]
+
+    def formatted_rows(self, start: int = 0, stop: Optional[int] = None) -> Iterator[List[str]]:
+        stop = len(self) if stop is None else min(stop, len(self))
+        for index in range(start, stop):
+            yield self.formatted_row(index)
+
+    def formatted_column(self, col_index: int) -> List[str]:
+        fmt = self._formatters[col_index]
+        return [fmt(val) for val in self.columns[col_index]]
+
+    def estimated_size(self) -> int:
+        """Rough in-memory footprint in bytes (containers plus a sample of cells)."""
+        size = sys.getsizeof(self.columns)
+        for col in self.columns:
+            size += sys.getsizeof(col)
+            if col:
+                sample = col[:: max(1, len(col) // 32)]
+                avg = sum(sys.getsizeof(v) for v in sample) / len(sample)
+                size += int(avg * len(col))
+        return size
@@ -0,0 +1,182 @@
+import threading
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Hashable, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class Lane:
+    """
+    Scheduling class for background jobs. Lower priority values are started
+    first; at most max_concurrent jobs of a lane run at once. Urgent lanes have
+    their own worker threads, so they never wait for the shared workers.
+    Idle-only lanes start a job only when nothing else is queued and a shared
+    worker would still be left free, so speculative work never delays real work.
+    """
+    priority: int
+    max_concurrent: int
+    urgent: bool = False
+    idle_only: bool = False
+
+
+class Job:
+    __slots__ = ("lane", "key", "fn", "args", "on_done", "on_error")
+
+    def __init__(self, lane, key, fn, args, on_done, on_error):
+        self.lane = lane
+        self.key = key
+        self.fn = fn
+        self.args = args
+        self.on_done = on_done
+        self.on_error = on_error
+
+
+class JobScheduler:
+    """
+    Bounded pool of worker threads shared by all background work of the GUI.
+
+    Jobs are queued per lane and started in lane priority order, within each
+    lane's concurrency limit. Submitting a job with a key replaces any job with
+    the same key that is still waiting in that lane ("latest wins"), so rapid
+    clicking never piles up stale work.
+
+    Worker threads never touch Tk: completion callbacks, and anything a job
+    hands to post(), are queued and run on the UI thread by drain(), which the
+    owner calls from a single periodic `after` pump.
+    """
+
+    DEFAULT_LANES = {
+        "control": Lane(priority=0, max_concurrent=1, urgent=True),  # cancellations
+        "grid": Lane(priority=1, max_concurrent=2),                  # what the user is looking at
+        "metadata": Lane(priority=2, max_concurrent=1),              # catalog, keys, estimates
+        "long": Lane(priority=3, max_concurrent=2),                  # exact counts, exports
+        "prefetch": Lane(priority=4, max_concurrent=1, idle_only=True),  # speculative page loads
+    }
+
+    def __init__(self, lanes: Optional[Dict[str, Lane]] = None, max_workers: int = 4):
+        self.lanes = dict(lanes or self.DEFAULT_LANES)
+        self.max_workers = max_workers
+        self.logger = logging.getLogger(__name__)
+
+        self._order = sorted(self.lanes, key=lambda name: self.lanes[name].priority)
+        self._cond = threading.Condition()
+        self._pending: Dict[str, Deque[Job]] = {name: deque() for name in self.lanes}
+        self._running: Dict[str, int] = {name: 0 for name in self.lanes}
+        self._shared_running = 0
+        self._callbacks: Deque[Tuple[Callable, Tuple]] = deque()
+        self._shutdown = False
+
+        urgent_workers = sum(lane.max_concurrent for lane in self.lanes.values() if lane.urgent)
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"db-viewer-worker-{i}", daemon=True)
+            for i in range(max_workers + urgent_workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(
+        self,
+        lane: str,
+        fn: Callable,
+        *args: Any,
+        key: Optional[Hashable] = None,
+        on_done: Optional[Callable[[Any], None]] = None,
+        on_error: Optional[Callable[[Exception], None]] = None,
+    ):
+        """
+        Run fn(*args) on a worker. on_done(result) / on_error(exception) are
+        called on the UI thread. A pending job in the same lane with the same
+        key is dropped in favour of this one.
+        """
+        if lane not in self.lanes:
+            raise ValueError(f"Unknown scheduler lane '{lane}'")
+        job = Job(lane, key, fn, args, on_done, on_error)
+        with self._cond:
+            if self._shutdown:
+                return
+            pending = self._pending[lane]
+            if key is not None:
+                stale = [j for j in pending if j.key == key]
+                for old in stale:
+                    pending.remove(old)
+                if stale:
+                    self.logger.debug(f"Dropped {len(stale)} superseded '{key}' job(s) in lane '{lane}'")
+            pending.append(job)
+            self._cond.notify_all()
+
+    def post(self, callback: Callable, *args: Any):
+        """Queue callback(*args) to run on the UI thread at the next drain()."""
+        self._callbacks.append((callback, args))
+
+    def drain(self, limit: Optional[int] = None) -> int:
+        """Run queued UI callbacks (all of them, or at most `limit`). Call from the UI thread only."""
+        count = 0
+        while self._callbacks and (limit is None or count < limit):
+            callback, args = self._callbacks.popleft()
+            count += 1
+            try:
+                callback(*args)
+            except Exception as e:
+                self.logger.exception(f"UI callback {getattr(callback, '__name__', callback)} failed: {e}")
+        return count
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._cond:
+            return {
+                name: {"pending": len(self._pending[name]), "running": self._running[name]}
+                for name in self.lanes
+            }
+
+    def shutdown(self):
+        """Drop pending jobs and let the workers exit once their current job finishes."""
+        with self._cond:
+            self._shutdown = True
+            for pending in self._pending.values():
+                pending.clear()
+            self._cond.notify_all()
+
+    def _next_job_locked(self) -> Optional[Job]:
+        for name in self._order:
+            lane = self.lanes[name]
+            if not self._pending[name] or self._running[name] >= lane.max_concurrent:
+                continue
+            if not lane.urgent and self._shared_running >= self.max_workers:
+                continue
+            if lane.idle_only and (
+                self._shared_running >= self.max_workers - 1
+                or any(self._pending[other] for other in self._order if other != name)
+            ):
+                continue
+            self._running[name] += 1
+            if not lane.urgent:
+                self._shared_running += 1
+            return self._pending[name].popleft()
+        return None
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                job = self._next_job_locked()
+                while job is None:
+                    if self._shutdown:
+                        return
+                    self._cond.wait()
+                    job = self._next_job_locked()
+
+            try:
+                result = job.fn(*job.args)
+            except Exception as e:
+                if job.on_error is not None:
+                    self.post(job.on_error, e)
+                else:
+                    self.logger.error(f"Background job {getattr(job.fn, '__name__', job.fn)} failed: {e}")
+            else:
+                if job.on_done is not None:
+                    self.post(job.on_done, result)
+            finally:
+                with self._cond:
+                    self._running[job.lane] -= 1
+                    if not self.lanes[job.lane].urgent:
+                        self._shared_running -= 1
+                    self._cond.notify_all()
@@ -0,0 +1,342 @@
+import itertools
+import math
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+TableKey = Tuple[str, str]
+
+_WORD_SPLIT = re.compile(r"[_\W]+")
+
+
+def trigrams(text: str) -> Set[str]:
+    """Character trigrams of a lower-cased string, without padding."""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def word_prefixes(text: str) -> Set[str]:
+    """
+    Padded leading grams of the whole name and of each `_`-separated word
+    ("  c", " cu"), so queries shorter than a trigram still find word prefixes.
+    """
+    grams = set()
+    for word in [text] + _WORD_SPLIT.split(text):
+        if word:
+            padded = "  " + word
+            grams.add(padded[:3])
+            grams.add(padded[1:4])
+    return grams
+
+
+def name_grams(text: str) -> Set[str]:
+    return trigrams(text) | word_prefixes(text)
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Optimal string alignment distance (insertions, deletions, substitutions
+    and swaps of adjacent letters), or limit + 1 once it is known to exceed limit.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+
+def query_grams(text: str) -> Set[str]:
+    if len(text) < 3:
+        return {("  " + text)[-3:]}  # the word-prefix gram
+    return trigrams(text)
+
+
+class TrigramIndex:
+    """
+    Inverted trigram index over table names and their column names, for the
+    table search box.
+
+    search() ranks the exact name first, then names containing the query,
+    then typo-tolerant matches (for short queries, names one edit away; then
+    names holding most of the query's trigrams), then tables with a matching
+    column. Substring matches come from intersecting posting sets, and every
+    table has a precomputed rank (public first, then shorter names), so a
+    keystroke only touches tables that share trigrams with the query.
+
+    Column names are indexed once per distinct name (most of them repeat
+    across tables). add()/remove()/sync() keep the index current when the
+    catalog changes, without rebuilding it.
+    """
+
+    def __init__(self, min_score: float = 0.5):
+        self.min_score = min_score
+
+        self._lock = threading.RLock()
+        self._ids: Dict[TableKey, int] = {}
+        self._keys: List[Optional[TableKey]] = []
+        self._names: List[str] = []
+        self._columns: Dict[TableKey, Tuple[str, ...]] = {}
+        self._by_name: Dict[str, Set[int]] = {}
+        self._by_schema: Dict[str, Set[int]] = {}
+        self._name_grams: Dict[str, Set[int]] = {}
+        self._column_grams: Dict[str, Set[str]] = {}
+        self._column_tables: Dict[str, Set[int]] = {}
+        self._rank: List[int] = []
+        self._by_rank: List[int] = []
+        self._rank_dirty = False
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, key: TableKey) -> bool:
+        return key in self._ids
+
+    # --- Updates ---
+
+    def add(self, schema: str, table: str, columns: Iterable[str] = ()):
+        """Index a table (replacing any previous entry for it)."""
+        key = (schema, table)
+        columns = tuple(sorted({c.lower() for c in columns}))
+        with self._lock:
+            if key in self._ids:
+                if self._columns[key] == columns:
+                    return
+                self.remove(schema, table)
+
+            table_id = len(self._keys)
+            name = table.lower()
+            self._ids[key] = table_id
+            self._keys.append(key)
+            self._names.append(name)
+            self._columns[key] = columns
+            self._by_name.setdefault(name, set()).add(table_id)
+            self._by_schema.setdefault(schema, set()).add(table_id)
+            for gram in name_grams(name):
+                self._name_grams.setdefault(gram, set()).add(table_id)
+            for column in columns:
+                tables = self._column_tables.get(column)
+                if tables is None:
+                    tables = self._column_tables[column] = set()
+                    for gram in name_grams(column):
+                        self._column_grams.setdefault(gram, set()).add(column)
+                tables.add(table_id)
+            self._rank_dirty = True
+
+    def remove(self, schema: str, table: str):
+        key = (schema, table)
+        with self._lock:
+            table_id = self._ids.pop(key, None)
+            if table_id is None:
+                return
+            name = self._names[table_id]
+            self._keys[table_id] = None
+            self._names[table_id] = ""
+            _discard(self._by_name, name, table_id)
+            _discard(self._by_schema, schema, table_id)
+            for gram in name_grams(name):
+                _discard(self._name_grams, gram, table_id)
+            for column in self._columns.pop(key):
+                tables = self._column_tables[column]
+                tables.discard(table_id)
+                if not tables:
+                    del self._column_tables[column]
+                    for gram in name_grams(column):
+                        _discard(self._column_grams, gram, column)
+
+            # Ids are never reused; compact once most of them are dead.
+            if len(self._keys) > 1024 and len(self._ids) < len(self._keys) // 2:
+                self._rebuild()
+
+    def sync(self, tables: Iterable[Tuple[str, str, Iterable[str]]], schemas: Optional[Set[str]] = None):
+        """
+        Make the index match `tables` ((schema, table, columns) triples): new
+        and changed tables are (re)indexed, and indexed tables that are not
+        listed are removed - within `schemas` only, when given.
+        """
+        with self._lock:
+            seen = set()
+            for schema, table, columns in tables:
+                self.add(schema, table, columns)
+                seen.add((schema, table))
+            stale = [
+                key for key in self._ids
+                if key not in seen and (schemas is None or key[0] in schemas)
+            ]
+            for key in stale:
+                self.remove(*key)
+            # Re-rank here, on the caller's (background) thread, not on the next keystroke.
+            self._ensure_rank()
+
+    def _rebuild(self):
+        entries = [(key[0], key[1], self._columns[key]) for key in self._ids]
+        self._ids, self._keys, self._names, self._columns = {}, [], [], {}
+        self._by_name, self._by_schema = {}, {}
+        self._name_grams, self._column_grams, self._column_tables = {}, {}, {}
+        for schema, table, columns in entries:
+            self.add(schema, table, columns)
+
+    def _ensure_rank(self):
+        if not self._rank_dirty:
+            return
+        live = [i for i, key in enumerate(self._keys) if key is not None]
+        live.sort(key=lambda i: (
+            self._keys[i][0] != "public", len(self._names[i]), self._names[i], self._keys[i][0]
+        ))
+        self._by_rank = live
+        self._rank = [0] * len(self._keys)
+        for position, table_id in enumerate(live):
+            self._rank[table_id] = position
+        self._rank_dirty = False
+
+    # --- Search ---
+
+    def search(self, query: str, limit: int = 200, prefer_schema: Optional[str] = None) -> List[TableKey]:
+        """
+        Best matching (schema, table) pairs for a search string, best first. A
+        "schema.table" query restricts matches to schemas containing the part
+        before the dot. Within each kind of match, tables in `prefer_schema`
+        come first. For queries shorter than three characters, names with a
+        word starting with the query come before other names containing it.
+        """
+        query = query.strip().lower()
+        schema_part = None
+        if "." in query:
+            schema_part, query = query.split(".", 1)
+
+        with self._lock:
+            self._ensure_rank()
+            allowed = None
+            if schema_part is not None:
+                allowed = set().union(*(
+                    ids for schema, ids in self._by_schema.items() if schema_part in schema.lower()
+                ))
+
+            # Groups of ids, best first; each group is ordered by rank.
+            if not query:
+                groups = [allowed if allowed is not None else set(self._ids.values())]
+            else:
+                exact = self._by_name.get(query, set())
+                containing = self._containing(query)
+                groups = [exact]
+                if len(query) < 3:
+                    # "or": orders before customers
+                    prefixed = self._name_grams.get(("  " + query)[-3:], set())
+                    groups.append(prefixed - exact)
+                    groups.append(containing - prefixed - exact)
+                else:
+                    groups.append(containing - exact)
+                if len(containing) < limit:
+                    seen = set(containing)
+                    for find in (self._fuzzy_names, self._fuzzy_columns):
+                        if len(seen) >= limit:
+                            break
+                        for ids in find(query):
+                            groups.append(ids - seen)
+                            seen |= ids
+
+            results: List[TableKey] = []
+            preferred = self._by_schema.get(prefer_schema, set()) if prefer_schema else set()
+            for group in groups:
+                if allowed is not None:
+                    group = group & allowed
+                for part in (group & preferred, group - preferred):
+                    results.extend(self._keys[i] for i in self._top(part, limit - len(results)))
+                    if len(results) >= limit:
+                        return results
+        return results
+
+    def _top(self, ids: Set[int], count: int) -> List[int]:
+        """The `count` best-ranked ids of a set."""
+        if not ids or count <= 0:
+            return []
+        # Walking the global order is cheaper than sorting when the set is dense.
+        if len(ids) * len(ids) > count * len(self._by_rank):
+            return list(itertools.islice((i for i in self._by_rank if i in ids), count))
+        return sorted(ids, key=self._rank.__getitem__)[:count]
+
+    def _containing(self, query: str) -> Set[int]:
+        """Ids of tables whose name contains the query."""
+        names = self._names
+        if len(query) < 3:
+            # No trigram to look up: test the names themselves.
+            return {i for i in self._ids.values() if query in names[i]}
+        postings = sorted((self._name_grams.get(gram, set()) for gram in query_grams(query)), key=len)
+        ids = postings[0].intersection(*postings[1:])
+        if len(query) == 3:
+            return ids  # the gram is the query itself
+        return {i for i in ids if query in names[i]}
+
+    def _fuzzy_names(self, query: str) -> List[Set[int]]:
+        """
+        Ids of names one typo away from a short query, then of names holding
+        at least min_score of the query's trigrams, grouped by how many they
+        hold (most first).
+        """
+        if len(query) < 4:
+            return []
+        # Word-prefix grams too, so a typo in a short name still leaves some overlap.
+        postings = sorted((self._name_grams.get(gram, set()) for gram in name_grams(query)), key=len)
+        needed = math.ceil(self.min_score * len(postings))
+        # A name missing more than len - needed grams can't qualify, so it must
+        # hold one of the rarest len - needed + 1: only those are counted.
+        candidates = set().union(*postings[:len(postings) - needed + 1])
+        hits: Counter = Counter()
+        for ids in postings:
+            hits.update(ids & candidates)
+        levels = _levels(hits, needed)
+
+        # Two swapped letters break up to four trigrams, which sinks names
+        # shorter than about eight letters below min_score ("usres" shares
+        # none with "users"). Those are measured by edit distance instead,
+        # over every name sharing any gram and of about the query's length.
+        if len(query) < 8:
+            names = self._names
+            near = {
+                i for i in set().union(*postings)
+                if abs(len(names[i]) - len(query)) <= 1 and edit_distance(query, names[i], 1) <= 1
+            }
+            levels.insert(0, near)
+        return levels
+
+    def _fuzzy_columns(self, query: str) -> List[Set[int]]:
+        """Ids of tables with a matching column, grouped by the best column's match (best first)."""
+        grams = query_grams(query) if len(query) < 4 else name_grams(query)
+        hits: Counter = Counter()
+        for gram in grams:
+            hits.update(self._column_grams.get(gram, ()))
+
+        by_score: Dict[int, Set[int]] = {}
+        needed = math.ceil(self.min_score * len(grams))
+        for column, shared in hits.items():
+            if query in column:
+                shared = len(grams) + 1  # above any fuzzy match
+            elif len(query) < 4 or shared < needed:
+                continue
+            by_score.setdefault(shared, set()).update(self._column_tables[column])
+        return [by_score[score] for score in sorted(by_score, reverse=True)]
+
+
+def _levels(hits: Counter, needed: int) -> List[Set[int]]:
+    by_count: Dict[int, Set[int]] = {}
+    for item, count in hits.items():
+        if count >= needed:
+            by_count.setdefault(count, set()).add(item)
+    return [by_count[count] for count in sorted(by_count, reverse=True)]
+
+
+def _discard(postings: Dict, gram: str, item):
+    items = postings.get(gram)
+    if items is not None:
+        items.discard(item)
+        if not items:
+            del postings[gram]
@@ -1,58 +1,152 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog, filedialog
-import threading
 import itertools
-import csv
 import json
 import logging
 import os
-import copy
+import threading
+import time
+from contextlib import nullcontext
+from dataclasses import replace
 from datetime import datetime
-from typing import Any, List, Tuple, Optional
+from typing import Any, Dict, List, Set, Tuple, Optional
 
 from ..config import DatabaseConfig
-from ..database import DatabaseConnection
+from ..database import DatabaseConnection, QueryTicket, QueryCancelled
+from ..cache import ResultCache
+from ..catalog import default_cache_dir
+from ..column_stats import (
+    ColumnProfile, build_sample_query, build_stats_query, profile_from_sample, profile_from_stats, sample_percent,
+)
+from ..history import HistoryStore
+from ..local_engine import LocalQuery, Unsupported
+from ..metrics import Profiler, QueryTimings, StartupTimer, log_timings
+from ..plan import ExplainResult, parse_explain
+from ..scheduler import JobScheduler
+from ..search import TrigramIndex
 from ..models import Filter, FilterState, SortCriterion, AppState
-from .components import FlowFrame
+from ..results import ResultSet, TruncatedText, JSON_OID, JSONB_OID, format_size, format_value
+from ..query_builder import (
+    WIDE_TYPE_OIDS, build_grid_query, build_count_query, build_estimate_query, build_export_query, build_cell_query,
+    paging_key,
+)
+from ..params import InlineParams, QueryParams
+from ..utils import write_csv, ProgressWriter
+from .components import ColumnProfileWindow, FlowFrame, JsonInspector, PlanWindow, VirtualGrid
 
 class DatabaseQueryGUI:
-    def __init__(self, root: tk.Tk, db_connection: DatabaseConnection):
+    def __init__(
+        self,
+        root: tk.Tk,
+        db_connection: DatabaseConnection,
+        startup: Optional[StartupTimer] = None,
+        parent: Optional[tk.Misc] = None,
+    ):
         self.root = root
+        # Widgets go into `parent` (a workspace tab) or straight into the window.
+        self.container = parent if parent is not None else root
         self.db = db_connection
         self.logger = logging.getLogger(__name__)
+        self.startup = startup
+        # Set while this workspace's tab is in the background (see suspend)
+        self.suspended = False
+        self._closed = False
+
+        # All background work runs on the scheduler's bounded worker pool; its
+        # results come back to Tk through one periodic pump.
+        self.scheduler = JobScheduler()
+        self.pump_interval_ms = 20
+        # How often idle pool connections are checked for eviction
+        self.pool_evict_interval_ms = 60_000
         
         # Application state variables
         self.current_schema = ""
         self.current_table = ""
         self.row_limit = 50
         self.column_names: List[str] = []
-        self.data_rows: List[List[Any]] = []
+        self.result: Optional[ResultSet] = None
         self.available_tables: List[str] = []
-        self.last_query_results: Optional[List[List[Any]]] = None
+        self.last_query_results: Optional[ResultSet] = None
+
+        # Streaming (manual mode) state
+        self._query_generation = 0
+        self.stream_batch_size = 1000
+        self.max_streamed_rows = 100000
+        self.stream_truncated = False
+
+        # Keyset pagination: page_cursors[i] holds the key values page i starts after
+        self.page_index = 0
+        self.page_cursors: List[Optional[List[Any]]] = [None]
+        self._primary_keys: Dict[Tuple[str, str], List[str]] = {}
+
+        # Recently displayed results, keyed by (AppState.result_key(), page index)
+        self.result_cache = ResultCache()
+
+        # Speculative loads of the next page / reversed sort, kept apart so they
+        # never evict pages the user has actually seen. Prefetch queries use their
+        # own pool connection and an idle-only scheduler lane.
+        self.prefetch_cache = ResultCache(max_bytes=32 * 1024 * 1024, ttl_seconds=60.0)
+        self.prefetch_delay_ms = 400
+        self.prefetch_timeout_ms = 5000
+        self._last_sorted_column: Optional[str] = None
+
+        # The last page-0 grid result that held every matching row (fewer than
+        # row_limit), as (schema, table, row_limit, active filter keys, result,
+        # stored_at). Sorts and narrower filters of it are evaluated in memory.
+        self._local_base: Optional[Tuple] = None
+        # Text columns that sort by code point, per table (see LocalQuery)
+        self._bytewise_columns: Dict[Tuple[str, str], Set[str]] = {}
+
+        # Cancellation: one ticket per kind of in-flight work
+        self._grid_ticket: Optional[QueryTicket] = None
+        self._count_ticket: Optional[QueryTicket] = None
+        self._export_ticket: Optional[QueryTicket] = None
+        self._explain_ticket: Optional[QueryTicket] = None
+        self.statement_timeout_ms = self.db.config.statement_timeout_ms
         
         # State for manual query editing
         self._programmatic_update = False
+        # Inputs longer than this open in the lazy JSON inspector instead of being highlighted inline
+        self.json_highlight_limit = 200_000
+        # Wide-column mode: text/json/bytea cells over this many bytes are fetched as a preview
+        self.wide_column_chars = 200
         
         # Filter and sorting management
         self._filter_id_counter = itertools.count()
-        self.filters: List[Filter] = []
-        self.sorting: List[SortCriterion] = []
+        # Immutable tuples: edits build new ones, so history snapshots share them
+        self.filters: Tuple[Filter, ...] = ()
+        self.sorting: Tuple[SortCriterion, ...] = ()
 
         # State for fuzzy table search
         self.all_tables_cache: List[Tuple[str, str]] = []
+        # Schema, table and column names of all_tables_cache, for the search box
+        self.table_index = TrigramIndex()
         self.is_fuzzy_finding = False
         
         # --- History Management ---
-        self.history: List[AppState] = []
-        self.history_index = -1 # Points to current state
-        self.max_history = 100
+        self.history = HistoryStore()
         self.is_navigating_history = False # Flag to prevent loops
 
         self.setup_ui()
+        self._pump_background_results()
+        self.root.after(self.pool_evict_interval_ms, self._evict_idle_connections)
         
-        # Connect on startup if config is present
-        if self.db.connect():
-             self.load_schemas()
+        # Connect on startup if config is present, without holding up the window
+        self.connect_in_background()
+
+    def _pump_background_results(self):
+        """Run every UI callback queued by background jobs, then re-arm."""
+        if self._closed:
+            return
+        self.scheduler.drain()
+        self.root.after(self.pump_interval_ms, self._pump_background_results)
+
+    def _evict_idle_connections(self):
+        """Periodically close pool connections nobody has used for a while, then re-arm."""
+        if self._closed:
+            return
+        self.scheduler.submit("metadata", self.db.evict_idle_connections, key="evict-idle")
+        self.root.after(self.pool_evict_interval_ms, self._evict_idle_connections)
 
     def get_saved_queries_dir(self):
         """
@@ -77,15 +171,15 @@ class DatabaseQueryGUI:
         return target_folder_path
 
     def setup_ui(self):
-        self.root.title("DB_GUI_Viewer")
-                
-        self.root.geometry("1600x900")
+        if self.container is self.root:
+            self.root.title("DB_GUI_Viewer")
+            self.root.geometry("1600x900")
         self.setup_treeview_style()
         
-        main_frame = ttk.Frame(self.root, padding="10")
+        main_frame = ttk.Frame(self.container, padding="10")
         main_frame.grid(row=0, column=0, sticky="nsew")
-        self.root.columnconfigure(0, weight=1)
-        self.root.rowconfigure(0, weight=1)
+        self.container.columnconfigure(0, weight=1)
+        self.container.rowconfigure(0, weight=1)
         main_frame.columnconfigure(0, weight=1)
         main_frame.rowconfigure(3, weight=1)
 
@@ -124,31 +218,49 @@ class DatabaseQueryGUI:
         limit_entry.grid(row=0, column=6, padx=(0, 10))
         limit_entry.bind('<Return>', lambda event: self.on_limit_changed())
 
+        ttk.Label(table_frame, text="Timeout (s):").grid(row=0, column=7, padx=(0, 5))
+        self.timeout_var = tk.StringVar(value=self._timeout_seconds_text())
+        timeout_entry = ttk.Entry(table_frame, textvariable=self.timeout_var, width=5)
+        timeout_entry.grid(row=0, column=8, padx=(0, 10))
+        timeout_entry.bind('<Return>', lambda event: self.on_timeout_changed())
+        timeout_entry.bind('<FocusOut>', lambda event: self.on_timeout_changed())
+
         self.refresh_table_btn = ttk.Button(table_frame, text="Refresh Data", command=self.refresh_current_table)
-        self.refresh_table_btn.grid(row=0, column=7)
+        self.refresh_table_btn.grid(row=0, column=9)
+
+        self.cancel_btn = ttk.Button(table_frame, text="Cancel", command=self.cancel_running_queries, state=tk.DISABLED)
+        self.cancel_btn.grid(row=0, column=10, padx=(5, 0))
 
-        self.get_count_btn = ttk.Button(table_frame, text="Get Total Count", command=self.get_total_count)
-        self.get_count_btn.grid(row=0, column=8, padx=(5, 0))
+        count_frame = ttk.Frame(table_frame)
+        count_frame.grid(row=0, column=11, padx=(5, 0))
+        self.estimate_count_btn = ttk.Button(count_frame, text="Estimate Count", command=self.get_estimated_count)
+        self.estimate_count_btn.pack(side=tk.LEFT)
+        self.get_count_btn = ttk.Button(count_frame, text="Exact Count", command=self.get_total_count)
+        self.get_count_btn.pack(side=tk.LEFT, padx=(2, 0))
         
-        self.save_csv_btn = ttk.Button(table_frame, text="Save as CSV", command=self.save_to_csv, state=tk.DISABLED)
-        self.save_csv_btn.grid(row=0, column=9, padx=(5, 0))
+        export_frame = ttk.Frame(table_frame)
+        export_frame.grid(row=0, column=12, padx=(5, 0))
+        self.save_csv_btn = ttk.Button(export_frame, text="Save as CSV", command=self.save_to_csv, state=tk.DISABLED)
+        self.save_csv_btn.pack(side=tk.LEFT)
+        self.export_full_btn = ttk.Button(export_frame, text="Export Full Result", command=self.export_full_result)
+        self.export_full_btn.pack(side=tk.LEFT, padx=(2, 0))
 
         self.toggle_json_btn = ttk.Button(table_frame, text="Show Query & JSON Tools", command=self.toggle_middle_frame)
-        self.toggle_json_btn.grid(row=0, column=10, padx=(10, 0))
+        self.toggle_json_btn.grid(row=0, column=13, padx=(10, 0))
         
         # --- NEW SAVED QUERY BUTTONS ---
         self.load_query_btn = ttk.Button(table_frame, text="Load Query", command=self.load_query_state)
-        self.load_query_btn.grid(row=0, column=11, padx=(10, 0))
+        self.load_query_btn.grid(row=0, column=14, padx=(10, 0))
 
         self.save_query_btn = ttk.Button(table_frame, text="Save Query", command=self.save_query_state)
-        self.save_query_btn.grid(row=0, column=12, padx=(5, 0))
+        self.save_query_btn.grid(row=0, column=15, padx=(5, 0))
         # -------------------------------
 
         self.copy_query_btn = ttk.Button(table_frame, text="Copy Query", command=self.copy_query_to_clipboard)
-        self.copy_query_btn.grid(row=0, column=13, padx=(10, 0))
+        self.copy_query_btn.grid(row=0, column=16, padx=(10, 0))
         
         self.copy_results_btn = ttk.Button(table_frame, text="Copy Query & Results", command=self.copy_query_and_results_to_clipboard, state=tk.DISABLED)
-        self.copy_results_btn.grid(row=0, column=14, padx=(5, 0))
+        self.copy_results_btn.grid(row=0, column=17, padx=(5, 0))
 
         # --- Middle Frame (Query/JSON) ---
         self.middle_frame = ttk.Frame(main_frame)
@@ -174,6 +286,16 @@ class DatabaseQueryGUI:
         query_button_frame.grid(row=1, column=0, columnspan=2, sticky='ew', pady=(5,0))
         self.run_custom_query_btn = ttk.Button(query_button_frame, text="Run Custom Query", command=self.run_custom_query, state=tk.DISABLED)
         self.run_custom_query_btn.pack(side=tk.RIGHT)
+        ttk.Button(query_button_frame, text="Explain", command=self.explain_current_query).pack(side=tk.RIGHT, padx=(0, 5))
+        self.explain_analyze_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(query_button_frame, text="Analyze (runs it, then rolls back)",
+                        variable=self.explain_analyze_var).pack(side=tk.RIGHT, padx=(0, 5))
+        self.profile_next_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(query_button_frame, text="Profile next grid query (cProfile)",
+                        variable=self.profile_next_var).pack(side=tk.LEFT)
+        self.wide_mode_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(query_button_frame, text="Truncate wide columns",
+                        variable=self.wide_mode_var, command=self.refresh_current_table).pack(side=tk.LEFT, padx=(10, 0))
         
         # JSON Input Frame
         json_input_frame = ttk.LabelFrame(self.middle_frame, text="JSON Input", padding="5")
@@ -208,22 +330,20 @@ class DatabaseQueryGUI:
         results_frame.columnconfigure(0, weight=1)
         results_frame.rowconfigure(0, weight=1)
         
-        tree_frame = ttk.Frame(results_frame)
-        tree_frame.grid(row=0, column=0, sticky="nsew")
-        tree_frame.columnconfigure(0, weight=1)
-        tree_frame.rowconfigure(0, weight=1)
-        
-        self.tree = ttk.Treeview(tree_frame, show='headings', style='Custom.Treeview')
-        self.tree.grid(row=0, column=0, sticky="nsew")
-        
-        v_scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.tree.yview)
-        v_scrollbar.grid(row=0, column=1, sticky="ns")
-        self.tree.configure(yscrollcommand=v_scrollbar.set)
-        
-        h_scrollbar = ttk.Scrollbar(tree_frame, orient=tk.HORIZONTAL, command=self.tree.xview)
-        h_scrollbar.grid(row=1, column=0, sticky="ew")
-        self.tree.configure(xscrollcommand=h_scrollbar.set)
+        # Only the visible rows exist as Treeview items; see VirtualGrid.
+        self.grid_view = VirtualGrid(results_frame, row_height=self.tree_row_height, row_tags=self.tree_tags, style='Custom.Treeview')
+        self.grid_view.grid(row=0, column=0, sticky="nsew")
+        self.tree = self.grid_view.tree
         
+        page_frame = ttk.Frame(results_frame)
+        page_frame.grid(row=1, column=0, sticky="ew", pady=(5, 0))
+        self.prev_page_btn = ttk.Button(page_frame, text="< Prev Page", command=self.prev_page, state=tk.DISABLED)
+        self.prev_page_btn.pack(side=tk.LEFT)
+        self.page_var = tk.StringVar(value="")
+        ttk.Label(page_frame, textvariable=self.page_var).pack(side=tk.LEFT, padx=10)
+        self.next_page_btn = ttk.Button(page_frame, text="Next Page >", command=self.next_page, state=tk.DISABLED)
+        self.next_page_btn.pack(side=tk.LEFT)
+
         self.tree.bind('<Button-1>', self.on_tree_click)
         self.tree.bind('<Button-3>', self.on_tree_right_click)
         # --- NEW BINDINGS FOR JSON INSPECTION ---
@@ -233,9 +353,17 @@ class DatabaseQueryGUI:
         self.configure_tree_tags()
 
         # --- Status Bar ---
+        status_frame = ttk.Frame(main_frame)
+        status_frame.grid(row=4, column=0, sticky="ew", pady=(10, 0))
+        status_frame.columnconfigure(0, weight=1)
         self.status_var = tk.StringVar(value="Connecting to database...")
-        status_bar = ttk.Label(main_frame, textvariable=self.status_var, relief=tk.SUNKEN, anchor=tk.W)
-        status_bar.grid(row=4, column=0, sticky="ew", pady=(10, 0))
+        status_bar = ttk.Label(status_frame, textvariable=self.status_var, relief=tk.SUNKEN, anchor=tk.W)
+        status_bar.grid(row=0, column=0, sticky="ew")
+        # Phase timings of the last displayed result (see metrics.QueryTimings)
+        self.timing_var = tk.StringVar(value="")
+        ttk.Label(status_frame, textvariable=self.timing_var, relief=tk.SUNKEN, anchor=tk.E).grid(
+            row=0, column=1, sticky="e", padx=(5, 0)
+        )
 
     def _setup_controls_ui(self, parent_frame: ttk.Frame):
         controls_frame = ttk.LabelFrame(parent_frame, text="Active Filters & Sorting", padding="10")
@@ -265,7 +393,8 @@ class DatabaseQueryGUI:
 
     def setup_treeview_style(self):
         style = ttk.Style()
-        style.configure('Custom.Treeview', background='white', foreground='black', rowheight=25, fieldbackground='white', borderwidth=1, relief='solid')
+        self.tree_row_height = 25
+        style.configure('Custom.Treeview', background='white', foreground='black', rowheight=self.tree_row_height, fieldbackground='white', borderwidth=1, relief='solid')
         style.map('Custom.Treeview', background=[('selected', 'lightblue')])
         style.configure('Custom.Treeview.Heading', background='lightgray', foreground='black', borderwidth=1, relief='solid', font=("TkDefaultFont", 10, "bold"))
         style.configure('Pill.TFrame', background='#e0e0e0')
@@ -292,8 +421,8 @@ class DatabaseQueryGUI:
         return AppState(
             schema=self.current_schema,
             table=self.current_table,
-            filters=copy.deepcopy(self.filters),
-            sorting=copy.deepcopy(self.sorting),
+            filters=self.filters,
+            sorting=self.sorting,
             row_limit=self.row_limit,
             is_manual_mode=is_manual,
             manual_query_text=manual_text
@@ -307,59 +436,34 @@ class DatabaseQueryGUI:
         if self.is_navigating_history:
             return
 
-        state = self._get_current_state_object()
-
-        # Check if the new state is identical to the current tip of history (deduplication)
-        if self.history_index >= 0 and self.history_index < len(self.history):
-            current_tip = self.history[self.history_index]
-            # Manual comparison to avoid issues with timestamps
-            if (current_tip.schema == state.schema and
-                current_tip.table == state.table and
-                current_tip.row_limit == state.row_limit and
-                current_tip.is_manual_mode == state.is_manual_mode and
-                str(current_tip.filters) == str(state.filters) and 
-                str(current_tip.sorting) == str(state.sorting) and
-                current_tip.manual_query_text == state.manual_query_text):
-                return
-
-        # If we are in the middle of the stack and do a new action, truncate future history
-        if self.history_index < len(self.history) - 1:
-            self.history = self.history[:self.history_index + 1]
-
-        self.history.append(state)
-        
-        # Enforce max history size
-        if len(self.history) > self.max_history:
-            self.history.pop(0)
-        else:
-            self.history_index += 1
-
-        self.update_history_buttons()
+        # Identical to the current tip (ignoring the timestamp) is not recorded again
+        if self.history.record(self._get_current_state_object()):
+            self.update_history_buttons()
 
     def update_history_buttons(self):
         """Enable/Disable Back and Forward buttons based on current index."""
-        if self.history_index > 0:
+        if self.history.can_go_back:
             self.btn_back.config(state=tk.NORMAL)
         else:
             self.btn_back.config(state=tk.DISABLED)
 
-        if self.history_index < len(self.history) - 1:
+        if self.history.can_go_forward:
             self.btn_fwd.config(state=tk.NORMAL)
         else:
             self.btn_fwd.config(state=tk.DISABLED)
 
     def go_back(self):
         """Navigate to the previous state."""
-        if self.history_index > 0:
-            self.history_index -= 1
-            self.restore_state(self.history[self.history_index])
+        state = self.history.back()
+        if state is not None:
+            self.restore_state(state)
             self.update_history_buttons()
 
     def go_forward(self):
         """Navigate to the next state."""
-        if self.history_index < len(self.history) - 1:
-            self.history_index += 1
-            self.restore_state(self.history[self.history_index])
+        state = self.history.forward()
+        if state is not None:
+            self.restore_state(state)
             self.update_history_buttons()
 
     def restore_state(self, state: AppState):
@@ -373,9 +477,9 @@ class DatabaseQueryGUI:
             self.current_schema = state.schema
             self.current_table = state.table
             self.row_limit = state.row_limit
-            # Restore deep copies to prevent reference issues
-            self.filters = copy.deepcopy(state.filters)
-            self.sorting = copy.deepcopy(state.sorting)
+            # Immutable, so the snapshot's tuples can be used as they are
+            self.filters = state.filters
+            self.sorting = state.sorting
             
             # Update UI Controls
             self.schema_var.set(state.schema if state.schema else "")
@@ -398,27 +502,29 @@ class DatabaseQueryGUI:
                 self._programmatic_update = False
                 
                 # Visuals for manual mode
-                self.filters.clear() # Clear visual filters for manual mode (though we stored them)
-                self.sorting.clear()
+                self.filters = () # Clear visual filters for manual mode (though we stored them)
+                self.sorting = ()
                 self.update_controls_display()
                 self.run_custom_query_btn.config(state=tk.NORMAL)
-                self.get_count_btn.config(state=tk.DISABLED) # Disable Count in Manual
+                self.set_count_buttons_state(tk.DISABLED) # Disable Count in Manual
                 
-                # Execute
-                self.execute_query(state.manual_query_text)
+                # Execute (or show the cached result)
+                self.reset_paging()
+                cache_key = self._result_key(state)
+                if not self._show_cached(cache_key):
+                    self.execute_streaming_query(state.manual_query_text, cache_key=cache_key)
                 
             else:
                 # GUI Mode Restoration
                 self.table_var.set(state.table)
                 self.run_custom_query_btn.config(state=tk.DISABLED)
-                self.get_count_btn.config(state=tk.NORMAL) # Enable Count in GUI mode
+                self.set_count_buttons_state(tk.NORMAL) # Enable Count in GUI mode
                 
                 self.update_controls_display()
                 
                 # Rebuild and run query
-                query = self.build_query()
-                self.update_query_display(query)
-                self.execute_query(query)
+                self.reset_paging()
+                self._with_primary_key(self._run_grid_query)
 
         finally:
             self.is_navigating_history = False
@@ -506,6 +612,22 @@ class DatabaseQueryGUI:
             self.json_output_text.config(state=tk.DISABLED)
             return
 
+        if len(input_text) > self.json_highlight_limit:
+            # Highlighting costs several Tk calls per token; large documents get the lazy tree.
+            inspector = JsonInspector(self.root, title="JSON Input")
+            self.json_output_text.insert("1.0", f"Document is {len(input_text):,} characters; opened in the JSON inspector.")
+            self.json_output_text.config(state=tk.DISABLED)
+
+            def parse():
+                try:
+                    return json.loads(input_text)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"Invalid JSON: {e}")
+
+            self.scheduler.submit("grid", parse, on_done=inspector.show_document,
+                                  on_error=lambda e: inspector.show_error(str(e)))
+            return
+
         try:
             json_obj = json.loads(input_text)
             self._recursive_highlight(json_obj)
@@ -571,8 +693,8 @@ class DatabaseQueryGUI:
             self.current_table = ""
             self.table_var.set("")
             self.table_combo['values'] = []
-            self.filters.clear()
-            self.sorting.clear()
+            self.filters = ()
+            self.sorting = ()
             self.clear_results()
             self.load_tables_for_schema(auto_select=True)
 
@@ -607,48 +729,293 @@ class DatabaseQueryGUI:
         self.table_var.set(self.current_table)
         
         self.is_fuzzy_finding = False
-        self.filters.clear()
-        self.sorting.clear()
+        self.filters = ()
+        self.sorting = ()
         self.save_csv_btn.config(state=tk.DISABLED)
-        self.get_count_btn.config(state=tk.NORMAL) # Enable count button for valid table
+        self.set_count_buttons_state(tk.NORMAL) # Enable count buttons for valid table
         self.load_table_data()
 
-    def build_query(self) -> str:
-        if not self.current_schema or not self.current_table:
-            return ""
+    def build_query(
+        self,
+        inline: bool = False,
+        sorting: Optional[Tuple[SortCriterion, ...]] = None,
+        page: Optional[Tuple[int, Optional[List[Any]]]] = None,
+        truncate: bool = True,
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        The grid query for the current page as (sql, params). The SQL has
+        placeholders so repeated browsing reuses one prepared statement;
+        inline=True renders the values as literals instead (for the query box).
+        `sorting` and `page` (page index, keyset cursor) build a neighbouring
+        view instead of the current one, for prefetching. truncate=False
+        fetches wide columns in full even in wide-column mode.
+        """
+        params = InlineParams() if inline else QueryParams()
+        sorting = self.sorting if sorting is None else sorting
+        page_index, after_values = page if page is not None else (self.page_index, self.page_cursors[self.page_index])
+        primary_key = self._primary_keys.get((self.current_schema, self.current_table), [])
+        page_start = page_index * self.row_limit
+        columns, wide = self._wide_columns(sorting) if truncate else ([], [])
+        query = build_grid_query(
+            self.current_schema,
+            self.current_table,
+            self.filters,
+            sorting,
+            self.row_limit,
+            primary_key=primary_key,
+            after_values=after_values,
+            offset=page_start,
+            row_offset=page_start,
+            not_null=self.db.get_not_null_columns(self.current_schema, self.current_table),
+            params=params,
+            columns=columns,
+            truncate=wide,
+            truncate_chars=self.wide_column_chars,
+        )
+        return query, params.values
 
-        inner_sorting = [s for s in self.sorting if s.column != "row"]
-        outer_sorting = [s for s in self.sorting if s.column == "row"]
+    def _wide_columns(self, sorting: Tuple[SortCriterion, ...]) -> Tuple[List[str], List[str]]:
+        """
+        (table columns, columns to truncate) for wide-column mode: the
+        text/json/bytea/xml columns from the catalog, except sort and key
+        columns, whose values the keyset cursor needs. Only for tables with a
+        primary key, by which full values are re-read on demand.
+        """
+        table_key = (self.current_schema, self.current_table)
+        primary_key = self._primary_keys.get(table_key, [])
+        relation = self.db.get_relation(*table_key)
+        if not self.wide_mode_var.get() or not primary_key or relation is None:
+            return [], []
+        keep = set(primary_key) | {s.column for s in sorting}
+        wide = [c.name for c in relation.columns if c.type_oid in WIDE_TYPE_OIDS and c.name not in keep]
+        return [c.name for c in relation.columns], wide
+
+    # --- PAGINATION METHODS ---
+
+    def reset_paging(self):
+        self.page_index = 0
+        self.page_cursors = [None]
+
+    def _with_primary_key(self, callback):
+        """Run callback once the current table's primary key (the keyset tiebreaker) is known."""
+        table_key = (self.current_schema, self.current_table)
+        if table_key in self._primary_keys:
+            callback()
+            return
 
-        inner_query = f'SELECT * FROM "{self.current_schema}"."{self.current_table}"'
-        
-        active_filters = [f.to_sql() for f in self.filters if f.state == FilterState.ACTIVE]
-        if active_filters:
-            inner_query += "\nWHERE\n"
-            inner_query += " AND\n  ".join(active_filters)
-        
-        if inner_sorting:
-            sort_clauses = [s.to_sql() for s in inner_sorting]
-            inner_query += f"\nORDER BY\n  {', '.join(sort_clauses)}"
-            
-        inner_query += f"\nLIMIT {self.row_limit}"
-        
-        inner_query_indented = "    " + inner_query.replace("\n", "\n    ")
+        def pk_thread():
+            primary_key = self.db.get_primary_key(*table_key)
+            self.scheduler.post(on_loaded, primary_key)
+
+        def on_loaded(primary_key):
+            self._primary_keys[table_key] = primary_key
+            if (self.current_schema, self.current_table) == table_key:
+                callback()
+
+        self.scheduler.submit("grid", pk_thread, key="primary_key")
+
+    def _run_grid_query(self):
+        query, params = self.build_query()
+        self.update_query_display(self.build_query(inline=True)[0])
+        cache_key = self._result_key()
+        if not self._show_cached(cache_key) and not self._show_local():
+            self.execute_query(query, params, cache_key=cache_key)
+
+    def _result_key(self, state: Optional[AppState] = None) -> Tuple:
+        state = state or self._get_current_state_object()
+        return (state.result_key(), self.page_index)
+
+    def _show_cached(self, cache_key: Tuple) -> bool:
+        """Display a cached result for this key, if there is one, without touching the server."""
+        entry = self.result_cache.get(cache_key)
+        prefetched = entry is None
+        if prefetched:
+            entry = self.prefetch_cache.get(cache_key)
+            if entry is None:
+                return False
+            # Promote it: it is a page the user has actually seen now.
+            self.prefetch_cache.invalidate(lambda key: key == cache_key)
+            self.result_cache.put(cache_key, entry.result)
+        self._show_instant(entry.result)
+        age = time.monotonic() - entry.stored_at
+        if prefetched:
+            self.status_var.set(f"Loaded {len(entry.result)} rows (prefetched {age:.0f}s ago).")
+        else:
+            self.status_var.set(
+                f"Showing {len(entry.result)} cached rows from {age:.0f}s ago. Press 'Refresh Data' to reload."
+            )
+        self._schedule_prefetch()
+        return True
+
+    def _show_instant(self, result: ResultSet):
+        """Display a result that needed no server round trip."""
+        # Anything still in flight belongs to the state we just navigated away from.
+        self._query_generation += 1
+        if self._grid_ticket is not None:
+            self._cancel_in_background(self._grid_ticket)
+            self._on_ticket_done("_grid_ticket", self._grid_ticket)
+        self.stream_truncated = False
+        self.last_query_results = result
+        start = time.perf_counter()
+        self.display_results(result)
+        self._record_display(QueryTimings(label="no query"), (time.perf_counter() - start) * 1000, len(result))
+
+    # --- LOCAL SORT / FILTER ---
+
+    def _active_filter_keys(self) -> frozenset:
+        return frozenset(
+            (f.column, f.operator, str(f.value)) for f in self.filters if f.state == FilterState.ACTIVE
+        )
 
-        query = f"""WITH sorted_results AS (
-{inner_query_indented}
-)
-SELECT
-    ROW_NUMBER() OVER () AS "row",
-    *
-FROM sorted_results"""
-
-        if outer_sorting:
-            sort_clauses = [s.to_sql() for s in outer_sorting]
-            query += f"\nORDER BY\n  {', '.join(sort_clauses)}"
-            
-        query += ";"
-        return query
+    def _local_base_for_view(self) -> Optional[ResultSet]:
+        """
+        The complete result the current view can be computed from: same table
+        and page size, still fresh, and filtered by a subset of the current
+        filters (extra filters only narrow it down). Page 0 only.
+        """
+        if self._local_base is None or self.page_index != 0:
+            return None
+        schema, table, row_limit, filter_keys, result, stored_at = self._local_base
+        if (schema, table, row_limit) != (self.current_schema, self.current_table, self.row_limit):
+            return None
+        if time.monotonic() - stored_at > self.result_cache.ttl_seconds:
+            self._local_base = None
+            return None
+        if not filter_keys <= self._active_filter_keys():
+            return None
+        return result
+
+    def _show_local(self) -> bool:
+        """Sort/filter the last complete result in memory, if that gives the server's answer."""
+        base = self._local_base_for_view()
+        if base is None:
+            return False
+        table_key = (self.current_schema, self.current_table)
+        start = time.perf_counter()
+        try:
+            result = LocalQuery(base, self._bytewise_columns.get(table_key, ())).run(
+                self.filters, self.sorting, self._primary_keys.get(table_key, [])
+            )
+        except Unsupported as e:
+            self.logger.debug(f"Local evaluation not possible ({e}); querying the server")
+            return False
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self._show_instant(result)
+        self.status_var.set(f"Loaded {len(result)} rows (sorted/filtered locally in {elapsed_ms:.0f} ms).")
+        return True
+
+    def _remember_local_base(self, results: ResultSet):
+        """Keep a page-0 grid result that holds every matching row as the base for local sorts/filters."""
+        if results.is_error or len(results) >= self.row_limit or self.page_index != 0:
+            return
+        filter_keys = self._active_filter_keys()
+        # A narrower result of the same table doesn't replace a broader base that still covers it.
+        if self._local_base_for_view() is not None:
+            return
+        table_key = (self.current_schema, self.current_table)
+        self._local_base = (*table_key, self.row_limit, filter_keys, results, time.monotonic())
+
+        if table_key not in self._bytewise_columns:
+            def collation_thread():
+                columns = self.db.get_bytewise_text_columns(*table_key)
+                self.scheduler.post(self._bytewise_columns.__setitem__, table_key, columns)
+
+            self.scheduler.submit("metadata", collation_thread, key="collation")
+
+    # --- PREFETCHING ---
+
+    def _schedule_prefetch(self):
+        """Once the user has been idle briefly, speculatively load the likely next views."""
+        self.root.after(self.prefetch_delay_ms, self._start_prefetch, self._query_generation)
+
+    def _start_prefetch(self, generation: int):
+        if generation != self._query_generation or self._grid_ticket is not None:
+            return  # The user has moved on (or a query is running); skip.
+        if self.suspended:
+            return  # Nobody is looking at this tab.
+        result = self.result
+        if (result is None or result.is_error or not self.current_table
+                or self.table_var.get() == "[Custom Query]"):
+            return
+        # A page larger than half the budget would just evict the other prefetches.
+        if result.estimated_size() > self.prefetch_cache.max_bytes // 2:
+            return
+
+        state = self._get_current_state_object()
+        targets = []
+        if len(result) >= self.row_limit:
+            page = (self.page_index + 1, self._next_page_cursor())
+            targets.append(("next_page", (state.result_key(), page[0]), self.sorting, page))
+
+        # on_header_click toggles ASC/DESC, so the flipped sort is the likeliest next click.
+        flipped = tuple(
+            replace(s, direction="DESC" if s.direction == "ASC" else "ASC") if s.column == self._last_sorted_column else s
+            for s in self.sorting
+        )
+        # A complete result is re-sorted locally (see _show_local); no need to ask the server.
+        if (self.page_index == 0 and self._last_sorted_column and flipped != self.sorting
+                and self._local_base_for_view() is None):
+            flipped_state = replace(state, sorting=flipped)
+            targets.append(("reverse_sort", (flipped_state.result_key(), 0), flipped, (0, None)))
+
+        for kind, cache_key, sorting, page in targets:
+            if self.result_cache.get(cache_key) or self.prefetch_cache.get(cache_key):
+                continue
+            query, params = self.build_query(sorting=sorting, page=page)
+            self.scheduler.submit("prefetch", self._prefetch, cache_key, query, params, key=kind)
+
+    def _prefetch(self, cache_key: Tuple, query: str, params: Dict[str, Any]):
+        """Worker side: run a speculative query on the prefetch connection and keep its result."""
+        results = self.db.execute_query(query, lane="prefetch", timeout_ms=self.prefetch_timeout_ms, params=params)
+        if not results.is_error:
+            self.prefetch_cache.put(cache_key, results)
+
+    def next_page(self):
+        """Seek past the last row of the current page using its keyset values."""
+        if self.result is None or self.result.is_error or len(self.result) < self.row_limit:
+            return
+
+        cursor = self._next_page_cursor()
+        self.page_cursors = self.page_cursors[:self.page_index + 1] + [cursor]
+        self.page_index += 1
+        self._run_grid_query()
+
+    def _next_page_cursor(self) -> Optional[List[Any]]:
+        """Keyset values of the current page's last row (None when paging by OFFSET)."""
+        primary_key = self._primary_keys.get((self.current_schema, self.current_table), [])
+        if not primary_key:
+            return None
+        index = {name: i for i, name in enumerate(self.result.column_names)}
+        # The last row in key order is the highest row number, whatever the outer sort.
+        row_numbers = self.result.column_values(index["row"])
+        last = max(range(len(row_numbers)), key=row_numbers.__getitem__)
+        return [
+            self.result.column_values(index[k.column])[last]
+            for k in paging_key(self.sorting, primary_key)
+        ]
+
+    def prev_page(self):
+        if self.page_index > 0:
+            self.page_index -= 1
+            self._run_grid_query()
+
+    def _update_page_controls(self):
+        is_manual = self.table_var.get() == "[Custom Query]"
+        has_full_page = (
+            self.result is not None and not self.result.is_error and len(self.result) >= self.row_limit
+        )
+        self.prev_page_btn.config(state=tk.NORMAL if self.page_index > 0 and not is_manual else tk.DISABLED)
+        self.next_page_btn.config(state=tk.NORMAL if has_full_page and not is_manual else tk.DISABLED)
+
+        if is_manual or not self.current_table:
+            self.page_var.set("")
+            return
+        label = f"Page {self.page_index + 1}"
+        if not self._primary_keys.get((self.current_schema, self.current_table)):
+            label += " (no primary key: OFFSET paging)"
+        self.page_var.set(label)
+
+    # --------------------------------
     
     def on_header_click(self, event):
         column_id = self.tree.identify_column(event.x)
@@ -663,11 +1030,14 @@ FROM sorted_results"""
             return
 
         column_name = self.column_names[col_index]
-        existing_sort = next((s for s in self.sorting if s.column == column_name), None)
-        if existing_sort:
-            existing_sort.direction = "DESC" if existing_sort.direction == "ASC" else "ASC"
+        self._last_sorted_column = column_name
+        if any(s.column == column_name for s in self.sorting):
+            self.sorting = tuple(
+                replace(s, direction="DESC" if s.direction == "ASC" else "ASC") if s.column == column_name else s
+                for s in self.sorting
+            )
         else:
-            self.sorting.append(SortCriterion(column=column_name, direction="ASC"))
+            self.sorting += (SortCriterion(column=column_name, direction="ASC"),)
 
         self.load_table_data()
 
@@ -685,7 +1055,6 @@ FROM sorted_results"""
         
         initial_op = filter_to_edit.operator if filter_to_edit else "="
         initial_val = filter_to_edit.value if filter_to_edit else value
-        initial_force_string = filter_to_edit.force_string if filter_to_edit else False
         
         main_frame = ttk.Frame(dialog, padding="15")
         main_frame.pack(fill=tk.BOTH, expand=True)
@@ -726,36 +1095,28 @@ FROM sorted_results"""
         value_entry.select_range(0, tk.END)
         value_entry.focus()
         
-        force_string_var = tk.BooleanVar(value=initial_force_string)
-        force_string_check = ttk.Checkbutton(main_frame, text="Treat value as string (e.g., for numeric IDs)", variable=force_string_var)
-        force_string_check.pack(anchor=tk.W, pady=(0, 15))
-        
         btn_frame = ttk.Frame(main_frame)
         btn_frame.pack(fill=tk.X, side="bottom")
 
         def apply_filter():
             operator = operator_var.get()
             filter_value_str = value_var.get().strip()
-            force_string = force_string_var.get()
-            
+
             if (value == "NULL" or filter_value_str.upper() == "NULL") and operator not in ["=", "!="]:
                 messagebox.showerror("Error", "Only '=' (IS NULL) or '!=' (IS NOT NULL) can be used with NULL values.")
                 return
 
             if filter_to_edit:
-                filter_to_edit.operator = operator
-                filter_to_edit.value = filter_value_str
-                filter_to_edit.force_string = force_string
-                filter_to_edit.state = FilterState.ACTIVE
+                edited = replace(filter_to_edit, operator=operator, value=filter_value_str, state=FilterState.ACTIVE)
+                self.filters = tuple(edited if f.id == filter_to_edit.id else f for f in self.filters)
             else:
                 new_filter = Filter(
                     id=next(self._filter_id_counter), 
                     column=column_name, 
                     operator=operator, 
-                    value=filter_value_str,
-                    force_string=force_string
+                    value=filter_value_str
                 )
-                self.filters.append(new_filter)
+                self.filters += (new_filter,)
             
             dialog.destroy()
             self.load_table_data()
@@ -813,60 +1174,97 @@ FROM sorted_results"""
         self.sorting_flow_frame.reorganize()
 
     def load_table_data(self):
-        """Load data for the currently selected table, resetting to GUI-driven mode."""
+        """Load data for the currently selected table, resetting to GUI-driven mode and page 1."""
         if not self.current_table or not self.current_schema: 
             return
         
         # RECORD STATE BEFORE LOADING
         self.record_current_state()
+        self.reset_paging()
 
         self.schema_var.set(self.current_schema)
         self.table_var.set(self.current_table)
         
-        query = self.build_query()
-        self.update_query_display(query)
         self.update_controls_display()
-        self.execute_query(query)
+        self._with_primary_key(self._run_grid_query)
 
     def refresh_current_table(self):
+        self.result_cache.invalidate()
+        self.prefetch_cache.invalidate()
+        self._local_base = None
         if self.current_table: 
             self.load_table_data()
+        self.refresh_catalog()
+
+    def set_count_buttons_state(self, state: str):
+        self.estimate_count_btn.config(state=state)
+        self.get_count_btn.config(state=state)
+
+    def get_estimated_count(self):
+        """
+        Shows an instant row estimate for the current table and filters:
+        pg_class statistics when unfiltered, the planner's EXPLAIN estimate otherwise.
+        Nothing is scanned; use Exact Count for a precise figure.
+        """
+        if not self.current_schema or not self.current_table:
+            return
+
+        schema, table = self.current_schema, self.current_table
+        has_filters = any(f.state == FilterState.ACTIVE for f in self.filters)
+        params = QueryParams()
+        query = build_estimate_query(schema, table, self.filters, params)
+        self.status_var.set("Estimating row count...")
+
+        def run_estimate():
+            estimate, source = None, "table statistics"
+            if not has_filters:
+                estimate = self.db.estimate_table_rows(schema, table)
+            if estimate is None:
+                estimate, source = self.db.estimate_query_rows(query, params.values), "planner"
+
+            if estimate is None:
+                message = "Could not estimate the row count. Use 'Exact Count' instead."
+            else:
+                message = f"Estimated Count ({source}): ~{estimate:,} rows. Use 'Exact Count' for a precise figure."
+            self.scheduler.post(lambda: self.status_var.set(message))
+
+        self.scheduler.submit("metadata", run_estimate, key="estimate")
 
     def get_total_count(self):
         """
-        Calculates the total number of rows matching the current filters
+        Calculates the exact number of rows matching the current filters
         (ignoring limit and sort) and displays it in the status bar.
         Does NOT change the visible result set or the query box.
+        Runs as a cancellable background query (see Cancel).
         """
         if not self.current_schema or not self.current_table:
             return
 
         # Build SQL strictly for counting (ignores sort/limit)
-        query = f'SELECT count(*) FROM "{self.current_schema}"."{self.current_table}"'
-        
-        active_filters = [f.to_sql() for f in self.filters if f.state == FilterState.ACTIVE]
-        if active_filters:
-            query += "\nWHERE\n"
-            query += " AND\n  ".join(active_filters)
-        
-        query += ";"
+        params = QueryParams()
+        query = build_count_query(self.current_schema, self.current_table, self.filters, params)
 
-        self.status_var.set("Calculating total count...")
+        self.status_var.set("Calculating exact count (Cancel to stop)...")
+        ticket = self._replace_ticket("_count_ticket")
         
         def run_count_query():
-            results = self.db.execute_query(query)
+            # Counts can take minutes on big tables; keep them off the grid lane.
+            results = self.db.execute_query(
+                query, lane="long", ticket=ticket, timeout_ms=self.statement_timeout_ms, params=params.values
+            )
+            self.scheduler.post(self._on_ticket_done, "_count_ticket", ticket)
+            if ticket.cancelled:
+                return
             
             count_val = "Error"
-            if results and len(results) > 1 and results[0][0] != 'Error':
-                # results[1][0] contains the actual count value
-                count_val = results[1][0]
+            if not results.is_error and len(results):
+                count_val = results.formatted_cell(0, 0)
             
             # Update UI from the main thread
-            self.root.after(0, lambda: self.status_var.set(f"Total Count (matching filters): {count_val}"))
+            self.scheduler.post(lambda: self.status_var.set(f"Exact Count (matching filters): {count_val}"))
                 
         # Run in background to prevent UI freeze
-        thread = threading.Thread(target=run_count_query, daemon=True)
-        thread.start()
+        self.scheduler.submit("long", run_count_query, key="count")
 
     def update_query_display(self, query: str):
         self._programmatic_update = True
@@ -894,20 +1292,58 @@ FROM sorted_results"""
             messagebox.showwarning("Empty Query", "Cannot execute an empty query.")
             return
 
-        self.filters.clear()
-        self.sorting.clear()
+        self.filters = ()
+        self.sorting = ()
         self.update_controls_display()
 
         self.schema_var.set("[Manual]")
         self.table_var.set("[Custom Query]")
         self.query_text.config(background='white')
         self.run_custom_query_btn.config(state=tk.DISABLED)
-        self.get_count_btn.config(state=tk.DISABLED) # Disable auto-count for custom queries
+        self.set_count_buttons_state(tk.DISABLED) # Disable auto-count for custom queries
         
         # RECORD STATE FOR MANUAL QUERY
         self.record_current_state()
+        self.reset_paging()
+
+        # Always runs fresh; the result is cached for back/forward navigation.
+        self.execute_streaming_query(custom_query, cache_key=self._result_key())
+
+    def explain_current_query(self):
+        """
+        EXPLAIN the SQL in the query box (the generated grid query or a manual
+        one) and show the plan tree. With "Analyze" checked the statement is
+        executed inside a transaction that is rolled back.
+        """
+        query = self.query_text.get("1.0", tk.END).strip()
+        if not query:
+            messagebox.showwarning("Empty Query", "There is no query to explain.")
+            return
+        analyze = self.explain_analyze_var.get()
+        ticket = self._replace_ticket("_explain_ticket")
+
+        def explain_thread():
+            result = self.db.explain_query(query, analyze=analyze, ticket=ticket, timeout_ms=self.statement_timeout_ms)
+            if result.is_error:
+                raise ValueError(result.error)
+            return parse_explain(result.column_values(0)[0])
 
-        self.execute_query(custom_query)
+        def on_done(plan: ExplainResult):
+            self._on_ticket_done("_explain_ticket", ticket)
+            window.show_plan(plan)
+
+        def on_error(error: Exception):
+            self._on_ticket_done("_explain_ticket", ticket)
+            window.show_error(str(error))
+
+        def on_close():
+            if self._explain_ticket is ticket:
+                self._cancel_in_background(ticket)
+                self._on_ticket_done("_explain_ticket", ticket)
+
+        title = "Query Plan (EXPLAIN ANALYZE)" if analyze else "Query Plan (EXPLAIN)"
+        window = PlanWindow(self.root, title=title, on_close=on_close)
+        self.scheduler.submit("long", explain_thread, on_done=on_done, on_error=on_error)
 
     def on_limit_changed(self):
         try:
@@ -923,54 +1359,273 @@ FROM sorted_results"""
             self.status_var.set("Invalid limit. Please enter a number.")
             self.limit_var.set(str(self.row_limit))
             
-    def execute_query(self, query: str):
+    def execute_query(self, query: str, params: Optional[Dict[str, Any]] = None, cache_key: Optional[Tuple] = None):
         if not query.strip(): 
             return
         
+        self._query_generation += 1
+        generation = self._query_generation
+        ticket = self._replace_ticket("_grid_ticket")
         self.status_var.set("Executing query...")
         self.root.update_idletasks()
+
+        profiler = None
+        if self.profile_next_var.get():
+            self.profile_next_var.set(False)
+            profiler = Profiler(f"{self.current_schema}.{self.current_table}")
         
         def query_thread():
-            results = self.db.execute_query(query)
-            self.last_query_results = results
-            self.root.after(0, lambda: self.display_results(results))
+            with profiler.profile("worker") if profiler else nullcontext():
+                results = self.db.execute_query(query, ticket=ticket, timeout_ms=self.statement_timeout_ms, params=params)
+            self.scheduler.post(self._on_grid_results, generation, ticket, results, cache_key, profiler)
                 
-        thread = threading.Thread(target=query_thread, daemon=True)
+        self.scheduler.submit("grid", query_thread, key="grid")
+
+    def _on_grid_results(
+        self,
+        generation: int,
+        ticket: QueryTicket,
+        results: ResultSet,
+        cache_key: Optional[Tuple] = None,
+        profiler: Optional[Profiler] = None,
+    ):
+        self._on_ticket_done("_grid_ticket", ticket)
+        if generation != self._query_generation:
+            return  # A newer query has been issued since; drop the stale result
+        if ticket.cancelled:
+            self.status_var.set("Query cancelled.")
+            return
+        self.last_query_results = results
+        if cache_key is not None:
+            self.result_cache.put(cache_key, results)
+        start = time.perf_counter()
+        with profiler.profile("render") if profiler else nullcontext():
+            self.display_results(results)
+        if results.timings is not None:
+            results.timings.label = f"{self.current_schema}.{self.current_table}"
+            self._record_display(results.timings, (time.perf_counter() - start) * 1000, len(results))
+        if profiler is not None:
+            self._save_profile(profiler)
+        if cache_key is not None and not results.is_error:
+            self._remember_local_base(results)
+            self._schedule_prefetch()
+
+    def _record_display(self, timings: QueryTimings, display_ms: float, rows: int):
+        """Add the format/render phases of a display_results call, show the breakdown and log it."""
+        format_ms = self.grid_view.last_format_ms
+        timings.rows = rows
+        timings.add("format", format_ms)
+        timings.add("render", max(0.0, display_ms - format_ms))
+        self.timing_var.set(timings.summary())
+        log_timings(timings)
+
+    def _save_profile(self, profiler: Profiler):
+        profile_dir = os.path.join(default_cache_dir(), "profiles")
+        try:
+            os.makedirs(profile_dir, exist_ok=True)
+            path = profiler.save(os.path.join(profile_dir, datetime.now().strftime("query-%Y%m%d-%H%M%S")))
+        except OSError as e:
+            self.logger.error(f"Could not write profile: {e}")
+            return
+        if path:
+            self.logger.info(f"Query profile written to {path}")
+            self.status_var.set(f"{self.status_var.get()} Profile written to {path}")
+
+    def execute_streaming_query(self, query: str, cache_key: Optional[Tuple] = None):
+        """
+        Executes a query through a server-side cursor. The first batch is shown
+        as soon as it arrives and later batches are appended to the grid, up to
+        max_streamed_rows rows, so huge custom queries never load all at once.
+        """
+        if not query.strip():
+            return
+
+        self._query_generation += 1
+        generation = self._query_generation
+        ticket = self._replace_ticket("_grid_ticket")
+        self.stream_truncated = False
+        self.status_var.set("Executing query (streaming)...")
+        self.root.update_idletasks()
+
+        def stream_thread():
+            stream = self.db.stream_query(
+                query, batch_size=self.stream_batch_size, ticket=ticket, timeout_ms=self.statement_timeout_ms
+            )
+            loaded = 0
+            truncated = False
+            try:
+                for batch_index, batch in enumerate(stream):
+                    if generation != self._query_generation or ticket.cancelled:
+                        return  # Superseded or cancelled; abandon the cursor
+                    remaining = self.max_streamed_rows - loaded
+                    if len(batch) > remaining:
+                        batch.columns, truncated = [col[:remaining] for col in batch.columns], True
+                    loaded += len(batch)
+                    self.scheduler.post(self.display_stream_batch, generation, batch, batch_index == 0)
+                    if truncated or loaded >= self.max_streamed_rows:
+                        truncated = True
+                        break
+            finally:
+                stream.close()
+                self.scheduler.post(self._on_ticket_done, "_grid_ticket", ticket)
+            self.scheduler.post(self.finish_stream, generation, loaded, truncated, cache_key)
+
+        self.scheduler.submit("grid", stream_thread, key="grid")
+
+    def _replace_ticket(self, attr: str) -> QueryTicket:
+        """
+        Issue a fresh ticket for a kind of work (grid, count, export), cancelling
+        the query it supersedes so it stops using server and network resources.
+        """
+        previous = getattr(self, attr)
+        if previous is not None:
+            self._cancel_in_background(previous)
+        ticket = QueryTicket()
+        setattr(self, attr, ticket)
+        self.cancel_btn.config(state=tk.NORMAL)
+        return ticket
+
+    def _on_ticket_done(self, attr: str, ticket: QueryTicket):
+        if getattr(self, attr) is ticket:
+            setattr(self, attr, None)
+        if not any((self._grid_ticket, self._count_ticket, self._export_ticket, self._explain_ticket)):
+            self.cancel_btn.config(state=tk.DISABLED)
+
+    def _cancel_in_background(self, ticket: QueryTicket):
+        # pg_cancel_backend is a network round trip; keep it off the UI thread.
+        self.scheduler.submit("control", self.db.cancel, ticket)
+
+    # --- Workspace tabs ---
+
+    def suspend(self):
+        """
+        This workspace went into a background tab: free what only the visible
+        grid needs. The grid's Treeview items, prefetched pages, the in-memory
+        sort base and every cached page except the one on screen are dropped.
+        Running queries continue, and their results are shown on resume().
+        """
+        if self.suspended:
+            return
+        self.suspended = True
+        self.grid_view.suspend()
+        self.prefetch_cache.invalidate()
+        self._local_base = None
+        current = self._result_key()
+        self.result_cache.invalidate(lambda key: key != current)
+
+    def resume(self):
+        if not self.suspended:
+            return
+        self.suspended = False
+        self.grid_view.resume()
+
+    def close(self, wait: bool = False):
+        """
+        Tear the workspace down: stop the UI pump and the workers, then cancel
+        its running queries and close its pool in the background (`wait`
+        blocks until that is done, for application exit).
+        """
+        self._closed = True
+        self.scheduler.shutdown()
+        tickets = [
+            ticket for ticket in (self._grid_ticket, self._count_ticket, self._export_ticket, self._explain_ticket)
+            if ticket is not None
+        ]
+        db = self.db
+
+        def teardown():
+            for ticket in tickets:
+                db.cancel(ticket)
+            db.close()
+
+        thread = threading.Thread(target=teardown, name="workspace-close", daemon=True)
         thread.start()
+        if wait:
+            thread.join(timeout=5)
+
+    def cancel_running_queries(self):
+        """Cancel every in-flight grid, count, export and EXPLAIN query."""
+        for attr in ("_grid_ticket", "_count_ticket", "_export_ticket", "_explain_ticket"):
+            ticket = getattr(self, attr)
+            if ticket is not None:
+                self._cancel_in_background(ticket)
+                self._on_ticket_done(attr, ticket)
+        self.status_var.set("Query cancelled.")
+
+    def on_timeout_changed(self):
+        try:
+            seconds = float(self.timeout_var.get() or 0)
+            if seconds < 0:
+                raise ValueError
+            self.statement_timeout_ms = round(seconds * 1000)
+        except ValueError:
+            self.status_var.set("Invalid timeout. Enter seconds (0 disables the timeout).")
+            self.timeout_var.set(self._timeout_seconds_text())
+
+    def _timeout_seconds_text(self) -> str:
+        """statement_timeout in seconds for the Timeout box, exact so it survives a round trip (500 ms -> "0.5")."""
+        return format(self.statement_timeout_ms / 1000, ".15g")
+
+    def display_stream_batch(self, generation: int, batch: ResultSet, first: bool):
+        if generation != self._query_generation:
+            return
+        if first:
+            self.display_results(batch)
+            return
+        if batch.is_error:
+            self.status_var.set(f"Query Error after {len(self.result)} rows: {batch.error}")
+            return
+        if self.result is None or self.result.is_error:
+            return
+
+        self.result.extend(batch)
+        self.grid_view.refresh()
+        self.status_var.set(f"Loaded {len(self.result)} rows (streaming...)")
+
+    def finish_stream(self, generation: int, loaded: int, truncated: bool, cache_key: Optional[Tuple] = None):
+        if generation != self._query_generation:
+            return
+        self.stream_truncated = truncated
+        if self.result is None or self.result.is_error:
+            return
+        self.last_query_results = self.result
+        if cache_key is not None and not truncated:
+            self.result_cache.put(cache_key, self.result)
+        if truncated:
+            self.status_var.set(
+                f"Showing the first {loaded} rows; the query returns more. "
+                f"'Save as CSV' streams the complete result to disk."
+            )
+        else:
+            self.status_var.set(f"Loaded {loaded} rows.")
 
-    def display_results(self, results: Optional[List[List[Any]]]):
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+    def display_results(self, results: Optional[ResultSet]):
+        self.grid_view.set_result(None)
         self.tree['columns'] = []
         self.save_csv_btn.config(state=tk.DISABLED)
         self.copy_results_btn.config(state=tk.DISABLED)
 
-        if not results or not results[0]:
+        if results is None or not results.column_names:
             self.status_var.set("Query failed or returned no data. Check logs.")
             self.column_names = []
-            self.data_rows = []
+            self.result = None
+            self._update_page_controls()
             return
 
-        raw_column_names = results[0]
-        raw_data_rows = results[1:]
+        self.result = results
+        self.column_names = results.column_names
         
-        if raw_column_names[0] == 'Error':
-            self.column_names, self.data_rows = raw_column_names, raw_data_rows
+        if results.is_error:
             self.tree['columns'] = self.column_names
             self.tree.heading(self.column_names[0], text=self.column_names[0])
             self.tree.column(self.column_names[0], width=1200)
-            if self.data_rows:
-                 self.tree.insert('', tk.END, values=self.data_rows[0])
-                 self.status_var.set(f"Query Error: {self.data_rows[0][0]}")
+            self.grid_view.set_result(results)
+            self.status_var.set(f"Query Error: {results.error}")
+            self._update_page_controls()
             return
 
-        self.column_names, self.data_rows = raw_column_names, raw_data_rows
         row_num_col_name = "row"
         
-        if not self.column_names:
-            self.status_var.set("Query returned no displayable columns.")
-            return
-        
         self.tree['columns'] = self.column_names
         for col in self.column_names:
             self.tree.heading(col, text=col)
@@ -979,26 +1634,25 @@ FROM sorted_results"""
             else:
                 self.tree.column(col, width=120, minwidth=100, anchor=tk.W)
             
-        for i, row in enumerate(self.data_rows):
-            tag = self.tree_tags[i % 2]
-            self.tree.insert('', tk.END, values=row, tags=(tag,))
+        self.grid_view.set_result(results)
         
-        if self.data_rows:
+        if len(results):
             self.save_csv_btn.config(state=tk.NORMAL)
             self.copy_results_btn.config(state=tk.NORMAL)
-            self.status_var.set(f"Loaded {len(self.data_rows)} rows.")
+            self.status_var.set(f"Loaded {len(results)} rows.")
         else:
              self.status_var.set(f"Query executed successfully, 0 rows returned.")
+        self._update_page_controls()
     
     def clear_results(self):
         self.save_csv_btn.config(state=tk.DISABLED) 
         self.copy_results_btn.config(state=tk.DISABLED)
-        for item in self.tree.get_children(): 
-            self.tree.delete(item)
+        self.grid_view.set_result(None)
         self.tree['columns'] = []
         self.column_names = []
-        self.data_rows = []
+        self.result = None
         self.last_query_results = None
+        self._update_page_controls()
         
     def on_tree_click(self, event):
         region = self.tree.identify("region", event.x, event.y)
@@ -1009,16 +1663,15 @@ FROM sorted_results"""
             item = self.tree.identify('item', event.x, event.y)
             column = self.tree.identify('column', event.x, event.y)
             
-            if item and column:
+            row_index = self.grid_view.row_index(item) if item else None
+            if row_index is not None and column:
                 col_index = int(column.replace('#', '')) - 1
                 if 0 <= col_index < len(self.column_names):
                     column_name = self.column_names[col_index]
                     if column_name == 'Error' or column_name == 'row': 
                         return
-                    values = self.tree.item(item, 'values')
-                    if col_index < len(values):
-                        value = values[col_index]
-                        self.create_filter_dialog(column_name, value)
+                    self._with_full_cell(row_index, col_index,
+                                         lambda value: self.create_filter_dialog(column_name, value))
     
     def on_tree_right_click(self, event):
         region = self.tree.identify("region", event.x, event.y)
@@ -1035,84 +1688,227 @@ FROM sorted_results"""
             column_name = self.column_names[col_index]
 
             if region == "heading":
-                if not self.data_rows: return
-                column_values = [row[col_index] for row in self.data_rows]
-                clipboard_text = ",".join(map(str, column_values))
-                self.root.clipboard_clear()
-                self.root.clipboard_append(clipboard_text)
-                self.status_var.set(f"Copied {len(column_values)} values from column '{column_name}'")
+                self._show_header_menu(event, col_index, column_name)
 
             elif region == "cell":
-                item_id = self.tree.identify_row(event.y)
-                if not item_id: return
-                values = self.tree.item(item_id, 'values')
-                cell_value = values[col_index]
-                self.root.clipboard_clear()
-                self.root.clipboard_append(cell_value)
-                display_value = (str(cell_value)[:50] + '...') if len(str(cell_value)) > 50 else cell_value
-                self.status_var.set(f"Copied '{display_value}' to clipboard.")
+                row_index = self.grid_view.row_index(self.tree.identify_row(event.y))
+                if row_index is None: return
+                self._with_full_cell(row_index, col_index, self._copy_cell_value)
 
         except (IndexError, ValueError) as e:
             self.logger.warning(f"Could not copy content: {e}")
 
+    def _copy_cell_value(self, cell_value: str):
+        self.root.clipboard_clear()
+        self.root.clipboard_append(cell_value)
+        display_value = (str(cell_value)[:50] + '...') if len(str(cell_value)) > 50 else cell_value
+        self.status_var.set(f"Copied '{display_value}' to clipboard.")
+
+    def _with_full_cell(self, row_index: int, col_index: int, callback):
+        """
+        Call callback with a cell's display text. A truncated cell (wide-column
+        mode) is re-read in full by its row's primary key first.
+        """
+        value = self.result.column_values(col_index)[row_index]
+        key = self._row_key(row_index) if isinstance(value, TruncatedText) else None
+        if key is None:
+            callback(self.result.formatted_cell(row_index, col_index))
+            return
+
+        schema, table = self.current_schema, self.current_table
+        column_name = self.column_names[col_index]
+        self.status_var.set(f"Reading the full value of '{column_name}' ({format_size(value.full_size)})...")
+
+        def load_cell():
+            params = QueryParams()
+            cell = self.db.execute_query(build_cell_query(schema, table, column_name, key, params), params=params.values)
+            if cell.is_error:
+                raise ValueError(f"Could not read the full value: {cell.error}")
+            if not len(cell):
+                raise ValueError("Could not read the full value: the row no longer exists.")
+            return format_value(cell.column_values(0)[0])
+
+        self.scheduler.submit("grid", load_cell, on_done=callback,
+                              on_error=lambda e: self.status_var.set(str(e)))
+
+    def _with_full_result(self, callback):
+        """
+        Call callback with the displayed result. If it has truncated cells
+        (wide-column mode), the page is fetched again with complete values first.
+        """
+        result = self.result
+        if self.table_var.get() == "[Custom Query]" or not result.has_truncated():
+            callback(result)
+            return
+
+        query, params = self.build_query(truncate=False)
+        self.status_var.set("Reading the full values of truncated cells...")
+
+        def load_page():
+            full = self.db.execute_query(query, timeout_ms=self.statement_timeout_ms, params=params)
+            if full.is_error:
+                raise ValueError(f"Could not read the full values: {full.error}")
+            return full
+
+        def on_loaded(full: ResultSet):
+            if self.result is result:  # still showing the page it was asked for
+                callback(full)
+
+        self.scheduler.submit("grid", load_page, on_done=on_loaded,
+                              on_error=lambda e: self.status_var.set(str(e)))
+
+    def _show_header_menu(self, event, col_index: int, column_name: str):
+        menu = tk.Menu(self.root, tearoff=0)
+        has_rows = bool(self.result and len(self.result))
+        menu.add_command(
+            label="Copy Column Values",
+            command=lambda: self.copy_column_values(col_index),
+            state=tk.NORMAL if has_rows else tk.DISABLED,
+        )
+        # Profiles come from the table's statistics, so only for browsed tables
+        can_profile = (
+            self.table_var.get() != "[Custom Query]" and bool(self.current_table)
+            and column_name not in ("row", "Error")
+        )
+        menu.add_command(
+            label="Column Profile...",
+            command=lambda: self.open_column_profile(column_name),
+            state=tk.NORMAL if can_profile else tk.DISABLED,
+        )
+        menu.tk_popup(event.x_root, event.y_root)
+
+    def copy_column_values(self, col_index: int):
+        column_name = self.column_names[col_index]
+
+        def copy(result: ResultSet):
+            column_values = result.formatted_column(result.column_names.index(column_name))
+            clipboard_text = ",".join(column_values)
+            self.root.clipboard_clear()
+            self.root.clipboard_append(clipboard_text)
+            self.status_var.set(f"Copied {len(column_values)} values from column '{column_name}'")
+
+        self._with_full_result(copy)
+
+    def open_column_profile(self, column_name: str):
+        """
+        Show a column's value distribution from pg_stats, which costs no table
+        scan; the window can also run a small TABLESAMPLE for live figures.
+        """
+        schema, table = self.current_schema, self.current_table
+        stats = {}
+
+        def load_stats():
+            params = QueryParams()
+            result = self.db.execute_query(build_stats_query(schema, table, column_name, params), lane="metadata", params=params.values)
+            if result.is_error:
+                raise ValueError(f"Could not read statistics: {result.error}")
+            if not len(result):
+                raise ValueError(f"Table {schema}.{table} not found.")
+            return profile_from_stats(schema, table, column_name, result.row(0))
+
+        def on_stats(profile: ColumnProfile):
+            stats["profile"] = profile
+            window.show_profile(profile)
+
+        def sample():
+            profile = stats.get("profile")
+            if profile is None or not profile.can_sample:
+                return
+            percent = sample_percent(profile.estimated_rows, profile.pages)
+            window.set_busy(f"Sampling {percent:g}% of the table's pages...")
+
+            def run_sample():
+                result = self.db.execute_query(build_sample_query(schema, table, column_name, percent), lane="long")
+                if result.is_error:
+                    raise ValueError(f"Sampling failed: {result.error}")
+                return profile_from_sample(profile, percent, result.row(0))
+
+            self.scheduler.submit("long", run_sample, on_done=window.show_profile,
+                                  on_error=lambda e: window.show_error(str(e)))
+
+        window = ColumnProfileWindow(self.root, title=f"Profile: {schema}.{table}.{column_name}", on_sample=sample)
+        self.scheduler.submit("metadata", load_stats, on_done=on_stats,
+                              on_error=lambda e: window.show_error(str(e)))
+
     def on_tree_inspect_json(self, event):
         """
-        Handles Middle Click or Double Right Click to check if cell content is JSON.
-        If valid JSON, opens the tool pane and formats it.
+        Handles Middle Click or Double Right Click on a JSON cell: opens a lazy
+        tree inspector. The complete value is re-read from the table by primary
+        key (the grid's copy may be partial) and parsed in the background.
         """
         region = self.tree.identify("region", event.x, event.y)
         if region != "cell":
             return
 
         column_id = self.tree.identify_column(event.x)
-        item_id = self.tree.identify_row(event.y)
+        row_index = self.grid_view.row_index(self.tree.identify_row(event.y))
 
-        if not column_id or not item_id or not self.column_names:
+        if not column_id or row_index is None or not self.column_names:
             return
 
         try:
             col_index = int(column_id.replace('#', '')) - 1
             if not (0 <= col_index < len(self.column_names)):
                 return
-            
-            values = self.tree.item(item_id, 'values')
-            if col_index < len(values):
-                cell_value = values[col_index]
-                
-                # Check if it looks like JSON before processing
-                if not cell_value or cell_value == "NULL":
-                    return
+        except ValueError:
+            return
 
-                try:
-                    # Attempt to parse. We specifically look for lists or dicts
-                    # because parsing a simple integer as JSON isn't useful here.
-                    parsed = json.loads(cell_value)
-                    if isinstance(parsed, (dict, list)):
-                        # It is valid complex JSON.
-                        self.toggle_middle_frame(force_show=True)
-                        
-                        # Set text
-                        self.json_input_text.delete("1.0", tk.END)
-                        self.json_input_text.insert("1.0", cell_value)
-                        
-                        # Trigger formatter
-                        self.format_and_highlight_json()
-                        self.status_var.set("JSON detected and formatted.")
-                    else:
-                        self.status_var.set("Cell value is valid primitive JSON, but not an object or array.")
-
-                except json.JSONDecodeError:
-                    self.status_var.set("Cell content is not valid JSON.")
+        value = self.result.column_values(col_index)[row_index]
+        is_json_type = self.result.type_oids[col_index] in (JSON_OID, JSONB_OID)
+        looks_like_json = isinstance(value, str) and value.lstrip()[:1] in ("{", "[")
+        if value is None or not (is_json_type or isinstance(value, (dict, list)) or looks_like_json):
+            self.status_var.set("Cell content is not JSON.")
+            return
 
-        except (IndexError, ValueError) as e:
-            self.logger.warning(f"Error inspecting JSON: {e}")
+        column_name = self.column_names[col_index]
+        schema, table = self.current_schema, self.current_table  # the worker must not read them later
+        key = self._row_key(row_index)
+        inspector = JsonInspector(self.root, title=f"{column_name} - row {row_index + 1}")
+        self.status_var.set(f"Inspecting '{column_name}'...")
+
+        def load_document():
+            text = value
+            if key is not None:
+                params = QueryParams()
+                query = build_cell_query(schema, table, column_name, key, params)
+                cell = self.db.execute_query(query, params=params.values)
+                if cell.is_error:
+                    raise ValueError(f"Could not read the full value: {cell.error}")
+                if len(cell):
+                    text = cell.column_values(0)[0]
+            if not isinstance(text, str):
+                return text  # already decoded by the driver
+            try:
+                return json.loads(text)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid JSON: {e}")
+
+        self.scheduler.submit(
+            "grid",
+            load_document,
+            on_done=inspector.show_document,
+            on_error=lambda e: inspector.show_error(str(e)),
+        )
+
+    def _row_key(self, row_index: int) -> Optional[Dict[str, Any]]:
+        """Primary key values of a displayed table row, or None (manual queries, keyless tables)."""
+        if self.table_var.get() == "[Custom Query]" or not self.current_table:
+            return None
+        primary_key = self._primary_keys.get((self.current_schema, self.current_table), [])
+        if not primary_key or not all(k in self.column_names for k in primary_key):
+            return None
+        return {
+            k: self.result.column_values(self.column_names.index(k))[row_index]
+            for k in primary_key
+        }
 
     def save_to_csv(self):
-        if not self.data_rows or not self.column_names:
+        if not self.result or not len(self.result) or not self.column_names:
             messagebox.showwarning("No Data", "There is no data to save.")
             return
         
-        default_filename_table = self.current_table if self.current_table and self.table_var.get() != "[Custom Query]" else "custom_query"
+        is_manual = self.table_var.get() == "[Custom Query]"
+        default_filename_table = self.current_table if self.current_table and not is_manual else "custom_query"
         try:
             default_filename = f"{default_filename_table}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
             filepath = filedialog.asksaveasfilename(
@@ -1125,12 +1921,20 @@ FROM sorted_results"""
                 self.status_var.set("Save operation cancelled.")
                 return
 
-            with open(filepath, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow(self.column_names)
-                writer.writerows(self.data_rows)
+            if is_manual and self.stream_truncated:
+                # The grid only holds a prefix of the result; stream the whole
+                # query from the server straight into the file instead.
+                self._stream_query_to_csv(self.query_text.get("1.0", tk.END).strip(), filepath)
+                return
+
+            if not is_manual and self.result.has_truncated():
+                # Wide-column mode: read the page again with complete values.
+                self._stream_query_to_csv(self.build_query(inline=True, truncate=False)[0], filepath)
+                return
+
+            row_count = write_csv(filepath, [(self.column_names, self.result.formatted_rows())])
 
-            self.status_var.set(f"Successfully saved {len(self.data_rows)} rows to {os.path.basename(filepath)}")
+            self.status_var.set(f"Successfully saved {row_count} rows to {os.path.basename(filepath)}")
             self.logger.info(f"Data saved to {filepath}")
 
         except Exception as e:
@@ -1138,6 +1942,97 @@ FROM sorted_results"""
             messagebox.showerror("Save Error", f"An error occurred while saving the file:\n{e}")
             self.status_var.set("Error saving file.")
 
+    def _stream_query_to_csv(self, query: str, filepath: str):
+        self.status_var.set(f"Streaming full result to {os.path.basename(filepath)}...")
+        ticket = self._replace_ticket("_export_ticket")
+
+        def export_thread():
+            def batches():
+                for batch in self.db.stream_query(query, batch_size=self.stream_batch_size, lane="long", ticket=ticket):
+                    if batch.is_error:
+                        raise RuntimeError(batch.error)
+                    yield batch.column_names, batch.formatted_rows()
+
+            try:
+                row_count = write_csv(filepath, batches())
+                self.logger.info(f"Data saved to {filepath}")
+                self.scheduler.post(lambda: self.status_var.set(
+                    f"Successfully saved {row_count} rows to {os.path.basename(filepath)}"))
+            except Exception as e:
+                self.logger.error(f"Failed to save CSV file: {e}")
+                message = f"Error saving file: {e}"
+                self.scheduler.post(lambda: self.status_var.set(message))
+            finally:
+                self.scheduler.post(self._on_ticket_done, "_export_ticket", ticket)
+
+        self.scheduler.submit("long", export_thread)
+
+    def export_full_result(self):
+        """
+        Stream every row of the current table view (filters and sort applied,
+        no row limit) or of the manual query straight from the server to a CSV
+        file with COPY ... TO STDOUT. Nothing is loaded into the grid, so memory
+        use stays flat whatever the size; progress shows in the status bar and
+        Cancel stops the export.
+        """
+        is_manual = self.table_var.get() == "[Custom Query]"
+        if is_manual:
+            query = self.query_text.get("1.0", tk.END).strip()
+            default_filename_table = "custom_query"
+        elif self.current_schema and self.current_table:
+            query = build_export_query(self.current_schema, self.current_table, self.filters, self.sorting)
+            default_filename_table = self.current_table
+        else:
+            query = ""
+        if not query:
+            messagebox.showwarning("No Query", "Select a table or run a query before exporting.")
+            return
+
+        filepath = filedialog.asksaveasfilename(
+            initialfile=f"{default_filename_table}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+            defaultextension=".csv",
+            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+        )
+        if not filepath:
+            self.status_var.set("Export cancelled.")
+            return
+
+        filename = os.path.basename(filepath)
+        self.status_var.set(f"Exporting full result to {filename} (Cancel to stop)...")
+        ticket = self._replace_ticket("_export_ticket")
+
+        def report_progress(bytes_written: int):
+            message = f"Exporting to {filename}: {bytes_written / (1024 * 1024):.1f} MB written (Cancel to stop)..."
+            self.scheduler.post(lambda: self.status_var.set(message))
+
+        def export_thread():
+            try:
+                # Large buffer: the server sends one message per row.
+                with open(filepath, "wb", buffering=1024 * 1024) as f:
+                    writer = ProgressWriter(f, report_progress)
+                    row_count = self.db.copy_to(query, writer, ticket=ticket, timeout_ms=self.statement_timeout_ms)
+                size_mb = writer.bytes_written / (1024 * 1024)
+                self.logger.info(f"Exported {row_count} rows to {filepath}")
+                message = f"Exported {row_count} rows ({size_mb:.1f} MB) to {filename}"
+            except QueryCancelled:
+                self._remove_partial_file(filepath)
+                message = "Export cancelled; the partial file was removed."
+            except Exception as e:
+                self.logger.error(f"Full export failed: {e}")
+                self._remove_partial_file(filepath)
+                message = f"Export failed: {e}"
+            finally:
+                self.scheduler.post(self._on_ticket_done, "_export_ticket", ticket)
+            self.scheduler.post(lambda: self.status_var.set(message))
+
+        self.scheduler.submit("long", export_thread)
+
+    def _remove_partial_file(self, filepath: str):
+        try:
+            os.remove(filepath)
+        except OSError:
+            pass
+
     def copy_query_to_clipboard(self):
         query = self.query_text.get("1.0", tk.END).strip()
         if not query or query == "Select a schema and table to begin.":
@@ -1153,23 +2048,25 @@ FROM sorted_results"""
             self.status_var.set("Error: Could not access clipboard.")
 
     def copy_query_and_results_to_clipboard(self):
-        if not self.data_rows or not self.column_names or self.column_names[0] == 'Error':
+        if not self.result or not len(self.result) or self.result.is_error:
             messagebox.showwarning("No Data", "There is no data to copy.")
             self.status_var.set("No results to copy.")
             return
 
         query = self.query_text.get("1.0", tk.END).strip()
+        self._with_full_result(lambda result: self._copy_query_and_results(query, result))
+
+    def _copy_query_and_results(self, query: str, result: ResultSet):
+        formatted_table = self._format_results_as_text_table(result)
         
-        formatted_table = self._format_results_as_text_table()
-        
-        row_count_footer = f"\n({len(self.data_rows)} rows)"
+        row_count_footer = f"\n({len(result)} rows)"
 
         full_text = f"{query}\n{formatted_table}{row_count_footer}"
 
         try:
             self.root.clipboard_clear()
             self.root.clipboard_append(full_text)
-            self.status_var.set(f"Query and {len(self.data_rows)} results copied to clipboard.")
+            self.status_var.set(f"Query and {len(result)} results copied to clipboard.")
         except tk.TclError:
             self.logger.warning("Could not access clipboard.")
             self.status_var.set("Error: Could not access clipboard.")
@@ -1178,14 +2075,13 @@ FROM sorted_results"""
             messagebox.showerror("Clipboard Error", f"Could not copy to clipboard:\n{e}")
             self.status_var.set("Error copying to clipboard.")
 
-    def _format_results_as_text_table(self) -> str:
-        headers = self.column_names
-        data = self.data_rows
+    def _format_results_as_text_table(self, result: ResultSet) -> str:
+        headers = result.column_names
 
-        if not headers:
+        if not headers or not result:
             return ""
 
-        str_data = [[str(item) for item in row] for row in data]
+        str_data = list(result.formatted_rows())
         
         col_widths = [len(h) for h in headers]
         for row in str_data:
@@ -1204,36 +2100,56 @@ FROM sorted_results"""
         return "\n".join([header_line, separator_line] + data_lines)
 
     def toggle_filter_active(self, filter_to_toggle: Filter):
-        filter_to_toggle.state = FilterState.ACTIVE if filter_to_toggle.state == FilterState.INACTIVE else FilterState.INACTIVE
+        new_state = FilterState.ACTIVE if filter_to_toggle.state == FilterState.INACTIVE else FilterState.INACTIVE
+        self.filters = tuple(
+            replace(f, state=new_state) if f.id == filter_to_toggle.id else f for f in self.filters
+        )
         self.load_table_data()
 
     def remove_filter(self, filter_to_remove: Filter):
-        self.filters = [f for f in self.filters if f.id != filter_to_remove.id]
+        self.filters = tuple(f for f in self.filters if f.id != filter_to_remove.id)
         self.load_table_data()
 
     def remove_sort_criterion(self, sort_to_remove: SortCriterion):
-        self.sorting = [s for s in self.sorting if s is not sort_to_remove]
+        self.sorting = tuple(s for s in self.sorting if s != sort_to_remove)
         self.load_table_data()
 
     def on_clear_all_filters(self):
         if self.filters:
-            self.filters.clear()
+            self.filters = ()
             self.load_table_data()
 
     def on_clear_all_sorting(self):
         if self.sorting:
-            self.sorting.clear()
+            self.sorting = ()
             self.load_table_data()
     
+    def connect_in_background(self):
+        """Open the first connection on a worker (bounded by connect_timeout_s), then load the schemas."""
+        config = self.db.config
+        if not config.host or not config.database:
+            self._on_connected(False)
+            return
+        self.status_var.set(f"Connecting to {config.host}:{config.port}/{config.database}...")
+        self.scheduler.submit("metadata", self.db.connect, key="connect", on_done=self._on_connected)
+
+    def _on_connected(self, connected: bool):
+        if self.startup is not None:
+            self.startup.mark("connect", connected=connected)
+        if connected:
+            self.load_schemas()
+        else:
+            config = self.db.config
+            self.status_var.set(f"Could not connect to {config.host}:{config.port}/{config.database}. See the log for details.")
+
     def load_schemas(self):
         self.status_var.set("Loading schemas...")
         
         def load_thread():
             schemas = self.db.get_schemas()
-            self.root.after(0, lambda: self.update_schema_list(schemas))
+            self.scheduler.post(lambda: self.update_schema_list(schemas))
                 
-        thread = threading.Thread(target=load_thread, daemon=True)
-        thread.start()
+        self.scheduler.submit("metadata", load_thread, key="schemas")
 
     def update_schema_list(self, schemas: List[str]):
         self.schema_combo['values'] = schemas
@@ -1243,6 +2159,31 @@ FROM sorted_results"""
             self.on_schema_selected()
         else:
             self.status_var.set("No schemas found in the database.")
+        # Schemas may have come from the on-disk catalog; catch up with the server.
+        self.refresh_catalog()
+
+    def refresh_catalog(self):
+        """Re-sync the metadata catalog in the background and update lists that changed."""
+        def refresh_thread():
+            changed = self.db.refresh_catalog()
+            if changed:
+                self._index_tables(changed)
+                schemas = self.db.get_schemas()
+                all_tables = self.db.get_all_tables()
+                self.scheduler.post(lambda: self.apply_catalog_changes(changed, schemas, all_tables))
+
+        self.scheduler.submit("metadata", refresh_thread, key="catalog")
+
+    def apply_catalog_changes(self, changed: Set[str], schemas: List[str], all_tables: List[Tuple[str, str]]):
+        self.logger.info(f"Catalog changed in schema(s): {', '.join(sorted(changed))}")
+        self.schema_combo['values'] = schemas
+        self.update_all_tables_cache(all_tables)
+        for key in [k for k in self._primary_keys if k[0] in changed]:
+            del self._primary_keys[key]
+        for key in [k for k in self._bytewise_columns if k[0] in changed]:
+            del self._bytewise_columns[key]
+        if self.current_schema in changed:
+            self.load_tables_for_schema(auto_select=not self.current_table)
 
     def load_tables_for_schema(self, auto_select=True):
         if not self.current_schema:
@@ -1251,10 +2192,9 @@ FROM sorted_results"""
         
         def load_thread():
             tables = self.db.get_tables(self.current_schema)
-            self.root.after(0, lambda: self.update_available_tables(tables, auto_select=auto_select))
+            self.scheduler.post(lambda: self.update_available_tables(tables, auto_select=auto_select))
 
-        thread = threading.Thread(target=load_thread, daemon=True)
-        thread.start()
+        self.scheduler.submit("metadata", load_thread, key="tables")
 
     def update_available_tables(self, tables: List[str], auto_select=True):
         self.available_tables = tables
@@ -1280,10 +2220,18 @@ FROM sorted_results"""
         
         def cache_thread():
             all_tables = self.db.get_all_tables()
-            self.root.after(0, self.update_all_tables_cache, all_tables)
+            self._index_tables()
+            self.scheduler.post(self.update_all_tables_cache, all_tables)
 
-        thread = threading.Thread(target=cache_thread, daemon=True)
-        thread.start()
+        self.scheduler.submit("metadata", cache_thread, key="all_tables")
+
+    def _index_tables(self, schemas: Optional[Set[str]] = None):
+        """(Re)index table and column names from the catalog - only `schemas`, if given. Runs on a worker."""
+        relations = self.db.get_relations(schemas)
+        self.table_index.sync(
+            ((rel.schema, rel.name, [c.name for c in rel.columns]) for rel in relations),
+            schemas=schemas,
+        )
 
     def update_all_tables_cache(self, table_list: List[Tuple[str, str]]):
         self.all_tables_cache = table_list
@@ -1304,22 +2252,9 @@ FROM sorted_results"""
             return
 
         self.is_fuzzy_finding = True
-        
-        filtered_results = [
-            f"{schema}.{table}" 
-            for schema, table in self.all_tables_cache 
-            if search_term in table.lower()
-        ]
 
-        current_schema_prefix = f"{self.current_schema}."
-        filtered_results.sort(key=lambda item: (
-            0 if search_term == item.split('.', 1)[1].lower() else 1,
-            0 if item.startswith(current_schema_prefix) else 1,
-            0 if item.startswith("public.") else 1,
-            item
-        ))
-        
-        self.table_combo['values'] = filtered_results
+        matches = self.table_index.search(search_term, prefer_schema=self.current_schema)
+        self.table_combo['values'] = [f"{schema}.{table}" for schema, table in matches]
 
     def on_table_focus_in(self, event=None):
         if not self.is_fuzzy_finding:
@@ -1,6 +1,13 @@
+import itertools
+import json
+import time
 import tkinter as tk
+from dataclasses import replace
 from tkinter import ttk
 
+from ..config import DatabaseConfig
+from ..plan import MISESTIMATE_FACTOR
+
 
 class FlowFrame(ttk.Frame):
     def __init__(self, parent, **kwargs):
@@ -27,3 +34,677 @@ class FlowFrame(ttk.Frame):
         required_height = y_pos + row_height
         if self.winfo_reqheight() != required_height:
             self.config(height=required_height)
+
+
+class VirtualGrid(ttk.Frame):
+    """
+    Treeview that shows a ResultSet of any size by materializing only the rows
+    that fit on screen.
+
+    A fixed set of Treeview items is recycled as the user scrolls: scrolling
+    just rewrites their values from the result store, so the cost of a redraw
+    depends on the window height, not on the number of rows. Use row_index()
+    to map a Treeview item back to its row in the result.
+    """
+
+    WHEEL_ROWS = 3
+
+    def __init__(self, parent, row_height: int = 25, row_tags=("evenrow", "oddrow"), **tree_kwargs):
+        super().__init__(parent)
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(0, weight=1)
+        self.row_height = row_height
+        self.row_tags = row_tags
+
+        self.tree = ttk.Treeview(self, show='headings', selectmode='browse', **tree_kwargs)
+        self.tree.grid(row=0, column=0, sticky="nsew")
+
+        self.v_scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.v_scrollbar.grid(row=0, column=1, sticky="ns")
+
+        h_scrollbar = ttk.Scrollbar(self, orient=tk.HORIZONTAL, command=self.tree.xview)
+        h_scrollbar.grid(row=1, column=0, sticky="ew")
+        self.tree.configure(xscrollcommand=h_scrollbar.set)
+
+        self.result = None
+        self.first = 0                 # result index of the top visible row
+        self.selected_index = None     # result index of the selected row, if any
+        self._items = []               # recycled Treeview item ids, top to bottom
+        self.last_format_ms = 0.0      # time the last render() spent turning cells into strings
+        self.suspended = False         # hidden (background tab): no Treeview items, nothing rendered
+
+        self.tree.bind("<Configure>", lambda e: self.render())
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda e: self._scroll_by(-self.WHEEL_ROWS))
+        self.tree.bind("<Button-5>", lambda e: self._scroll_by(self.WHEEL_ROWS))
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        for key, handler in (
+            ("<Up>", lambda e: self._move_selection(-1)),
+            ("<Down>", lambda e: self._move_selection(1)),
+            ("<Prior>", lambda e: self._move_selection(-self.visible_rows())),
+            ("<Next>", lambda e: self._move_selection(self.visible_rows())),
+            ("<Home>", lambda e: self._move_selection(-self.total_rows())),
+            ("<End>", lambda e: self._move_selection(self.total_rows())),
+        ):
+            self.tree.bind(key, handler)
+
+    # --- Public API ---
+
+    def set_result(self, result):
+        """Show a new result (or nothing, for None) from the top."""
+        self.result = result
+        self.first = 0
+        self.selected_index = None
+        self.render()
+
+    def refresh(self):
+        """Redraw after the current result grew (e.g. a streamed batch was appended)."""
+        self.render()
+
+    def suspend(self):
+        """Delete the Treeview items while the grid is hidden; set_result() still takes effect on resume()."""
+        self.suspended = True
+        if self._items:
+            self.tree.delete(*self._items)
+            self._items = []
+
+    def resume(self):
+        self.suspended = False
+        self.render()
+
+    def total_rows(self) -> int:
+        return len(self.result) if self.result is not None else 0
+
+    def visible_rows(self) -> int:
+        height = self.tree.winfo_height()
+        top = self.row_height  # heading; refined from the first row's position once shown
+        if self._items:
+            bbox = self.tree.bbox(self._items[0])
+            if bbox:
+                top = bbox[1]
+        return max(1, (height - top) // self.row_height)
+
+    def row_index(self, item_id):
+        """Result row shown by a Treeview item, or None."""
+        try:
+            index = self.first + self._items.index(item_id)
+        except ValueError:
+            return None
+        return index if index < self.total_rows() else None
+
+    def scroll_to(self, index: int):
+        max_first = max(0, self.total_rows() - self.visible_rows())
+        first = min(max(0, index), max_first)
+        if first != self.first:
+            self.first = first
+            self.render()
+
+    # --- Rendering ---
+
+    def render(self):
+        if self.suspended:
+            self.last_format_ms = 0.0
+            return
+        total = self.total_rows()
+        visible = self.visible_rows()
+        self.first = min(self.first, max(0, total - visible))
+        count = min(visible, total - self.first)
+
+        while len(self._items) < count:
+            self._items.append(self.tree.insert('', tk.END))
+        if len(self._items) > count:
+            self.tree.delete(*self._items[count:])
+            del self._items[count:]
+
+        start = time.perf_counter()
+        values = [self.result.formatted_row(self.first + offset) for offset in range(count)]
+        self.last_format_ms = (time.perf_counter() - start) * 1000
+
+        selected_item = None
+        for offset, item in enumerate(self._items):
+            index = self.first + offset
+            self.tree.item(item, values=values[offset], tags=(self.row_tags[index % 2],))
+            if index == self.selected_index:
+                selected_item = item
+
+        # Selection follows the data row, not the recycled item.
+        if selected_item is not None:
+            if self.tree.selection() != (selected_item,):
+                self.tree.selection_set(selected_item)
+        elif self.tree.selection():
+            self.tree.selection_remove(*self.tree.selection())
+
+        if total:
+            self.v_scrollbar.set(self.first / total, (self.first + count) / total)
+        else:
+            self.v_scrollbar.set(0.0, 1.0)
+
+    # --- Event handlers ---
+
+    def _scroll_by(self, rows: int):
+        self.scroll_to(self.first + rows)
+        return "break"
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * self.total_rows()))
+        elif action == "scroll":
+            step = self.visible_rows() if unit == "pages" else 1
+            self._scroll_by(int(amount) * step)
+
+    def _on_mousewheel(self, event):
+        # Windows reports multiples of 120 per notch, macOS small deltas.
+        notches = event.delta // 120 if abs(event.delta) >= 120 else (1 if event.delta > 0 else -1)
+        return self._scroll_by(-notches * self.WHEEL_ROWS)
+
+    def _on_select(self, event=None):
+        selection = self.tree.selection()
+        index = self.row_index(selection[0]) if selection else None
+        if index is not None:
+            self.selected_index = index
+
+    def _move_selection(self, rows: int):
+        total = self.total_rows()
+        if not total:
+            return "break"
+        if self.selected_index is None:
+            target = self.first
+        else:
+            target = min(max(0, self.selected_index + rows), total - 1)
+        self.selected_index = target
+        visible = self.visible_rows()
+        if target < self.first:
+            self.scroll_to(target)
+        elif target >= self.first + visible:
+            self.scroll_to(target - visible + 1)
+        self.render()
+        return "break"
+
+
+class JsonInspector(tk.Toplevel):
+    """
+    Window showing a JSON document as a collapsible tree.
+
+    Nothing is rendered up front: a container's children are inserted only
+    when it is expanded, BATCH at a time (a "more" node loads the next
+    batch), so even multi-megabyte documents open instantly. The document
+    itself is parsed by the caller off the UI thread and handed to
+    show_document(); until then the window shows a loading message.
+    """
+
+    BATCH = 200
+    PREVIEW_CHARS = 200
+
+    _TAGS = {
+        "string": "#008000",
+        "number": "#FF0000",
+        "boolean": "#FF00FF",
+        "null": "#DAA520",
+        "more": "gray",
+    }
+
+    def __init__(self, parent, title: str = "JSON Inspector"):
+        super().__init__(parent)
+        self.title(title)
+        self.geometry("700x500")
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(0, weight=1)
+
+        self.tree = ttk.Treeview(self, columns=("value",), show="tree headings")
+        self.tree.heading("#0", text="Key")
+        self.tree.heading("value", text="Value")
+        self.tree.column("#0", width=220, stretch=False)
+        self.tree.column("value", width=460)
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        v_scroll = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.tree.yview)
+        v_scroll.grid(row=0, column=1, sticky="ns")
+        self.tree.configure(yscrollcommand=v_scroll.set)
+        for tag, color in self._TAGS.items():
+            self.tree.tag_configure(tag, foreground=color)
+
+        self.status_var = tk.StringVar(value="Loading full value...")
+        ttk.Label(self, textvariable=self.status_var, anchor=tk.W).grid(row=1, column=0, columnspan=2, sticky="ew")
+
+        # item -> (container, index of the next child to insert, iterator over the
+        # remaining (key, value) pairs of a dict, or None for a list) for unexpanded nodes
+        self._pending = {}
+        self._more_items = set()  # "N more item(s)" placeholders
+        self._values = {}
+        self.tree.bind("<<TreeviewOpen>>", self._on_open)
+        self.tree.bind("<Control-c>", self._copy_selected)
+
+    def show_document(self, document):
+        if not self.winfo_exists():
+            return
+        self.tree.delete(*self.tree.get_children())
+        self._pending.clear()
+        self._more_items.clear()
+        self._values.clear()
+        root = self._insert_node("", "(root)", document)
+        if root in self._pending:
+            self.tree.item(root, open=True)
+            self._expand(root)
+        self.status_var.set(f"{self._describe(document)}. Expand nodes to explore; Ctrl+C copies the selected value.")
+
+    def show_error(self, message: str):
+        if self.winfo_exists():
+            self.status_var.set(message)
+
+    def _insert_node(self, parent: str, key: str, value) -> str:
+        if isinstance(value, (dict, list)):
+            item = self.tree.insert(parent, tk.END, text=key, values=(self._describe(value),))
+            if value:
+                self._pending[item] = (value, 0, iter(value.items()) if isinstance(value, dict) else None)
+                self.tree.insert(item, tk.END, text="...")  # makes the node expandable
+        else:
+            text, tag = self._leaf(value)
+            item = self.tree.insert(parent, tk.END, text=key, values=(text,), tags=(tag,))
+        self._values[item] = value
+        return item
+
+    def _on_open(self, event=None):
+        self._expand(self.tree.focus())
+
+    def _expand(self, item: str):
+        if item not in self._pending:
+            return
+        container, start, remaining = self._pending.pop(item)
+        if item in self._more_items:
+            self._more_items.discard(item)
+            parent = self.tree.parent(item)
+            self.tree.delete(item)
+        else:
+            parent = item
+            self.tree.delete(*self.tree.get_children(item))
+
+        stop = min(start + self.BATCH, len(container))
+        if isinstance(container, dict):
+            # Continue the dict's iterator where the last batch stopped; islice
+            # from the start would re-walk every earlier key on each batch.
+            for key, value in itertools.islice(remaining, stop - start):
+                self._insert_node(parent, str(key), value)
+        else:
+            for index in range(start, stop):
+                self._insert_node(parent, f"[{index}]", container[index])
+
+        if stop < len(container):
+            more = self.tree.insert(
+                parent, tk.END, text="more", values=(f"{len(container) - stop} more item(s) - expand to load",), tags=("more",)
+            )
+            self._pending[more] = (container, stop, remaining)
+            self._more_items.add(more)
+            self.tree.insert(more, tk.END, text="...")
+
+    def _copy_selected(self, event=None):
+        item = self.tree.focus()
+        if item not in self._values:
+            return
+        value = self._values[item]
+        self.clipboard_clear()
+        self.clipboard_append(value if isinstance(value, str) else json.dumps(value, indent=2))
+        self.status_var.set(f"Copied '{self.tree.item(item, 'text')}' to clipboard.")
+
+    @staticmethod
+    def _describe(value) -> str:
+        if isinstance(value, dict):
+            return f"{{{len(value)} key(s)}}"
+        if isinstance(value, list):
+            return f"[{len(value)} item(s)]"
+        return type(value).__name__
+
+    def _leaf(self, value):
+        if value is None:
+            return "null", "null"
+        if isinstance(value, bool):
+            return str(value).lower(), "boolean"
+        if isinstance(value, (int, float)):
+            return str(value), "number"
+        text = json.dumps(value)
+        if len(text) > self.PREVIEW_CHARS:
+            text = text[:self.PREVIEW_CHARS] + f"... ({len(value)} chars)"
+        return text, "string"
+
+
+class ColumnProfileWindow(tk.Toplevel):
+    """
+    Shows a ColumnProfile: summary figures, the most common values and the
+    histogram buckets, each with its share of the table's rows. The
+    "Sample Live" button calls on_sample; the caller runs the sample and
+    hands the result back to show_profile(). It stays disabled for relations
+    TABLESAMPLE can't read (views, foreign tables).
+    """
+
+    BAR_WIDTH = 30
+
+    def __init__(self, parent, title: str, on_sample=None):
+        super().__init__(parent)
+        self.title(title)
+        self.geometry("620x480")
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(1, weight=1)
+
+        self.summary_var = tk.StringVar(value="Reading planner statistics...")
+        ttk.Label(self, textvariable=self.summary_var, anchor=tk.W, justify=tk.LEFT, wraplength=600).grid(
+            row=0, column=0, columnspan=2, sticky="ew", padx=5, pady=5
+        )
+
+        self.tree = ttk.Treeview(self, columns=("value", "share", "bar"), show="headings")
+        self.tree.heading("value", text="Value")
+        self.tree.heading("share", text="Rows")
+        self.tree.heading("bar", text="")
+        self.tree.column("value", width=260)
+        self.tree.column("share", width=70, anchor=tk.E, stretch=False)
+        self.tree.column("bar", width=240)
+        self.tree.tag_configure("section", foreground="gray")
+        self.tree.grid(row=1, column=0, sticky="nsew")
+        v_scroll = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.tree.yview)
+        v_scroll.grid(row=1, column=1, sticky="ns")
+        self.tree.configure(yscrollcommand=v_scroll.set)
+
+        bottom = ttk.Frame(self)
+        bottom.grid(row=2, column=0, columnspan=2, sticky="ew", padx=5, pady=5)
+        self.status_var = tk.StringVar(value="")
+        ttk.Label(bottom, textvariable=self.status_var).pack(side=tk.LEFT)
+        self.sample_btn = ttk.Button(bottom, text="Sample Live (TABLESAMPLE)", command=on_sample, state=tk.DISABLED)
+        self.sample_btn.pack(side=tk.RIGHT)
+        self._can_sample = False
+
+    def show_profile(self, profile):
+        if not self.winfo_exists():
+            return
+        self.tree.delete(*self.tree.get_children())
+        self.summary_var.set(self._summary(profile))
+        self.status_var.set("")
+        self._can_sample = profile.can_sample
+        self.sample_btn.config(state=tk.NORMAL if self._can_sample else tk.DISABLED)
+
+        rows = [(value, share) for value, share in profile.most_common]
+        buckets = profile.histogram_buckets()
+        top = max([share for _, share in rows] + [share for _, _, share in buckets] + [1e-9])
+
+        if rows:
+            self.tree.insert("", tk.END, values=("Most common values", "", ""), tags=("section",))
+            for value, share in rows:
+                self._insert_row("NULL" if value is None else value, share, top)
+        if buckets:
+            self.tree.insert("", tk.END, values=("Histogram (equal-count buckets)", "", ""), tags=("section",))
+            for low, high, share in buckets:
+                self._insert_row(f"{low} .. {high}", share, top)
+
+    def show_error(self, message: str):
+        if self.winfo_exists():
+            self.status_var.set(message)
+            self.sample_btn.config(state=tk.NORMAL if self._can_sample else tk.DISABLED)
+
+    def set_busy(self, message: str):
+        self.status_var.set(message)
+        self.sample_btn.config(state=tk.DISABLED)
+
+    def _insert_row(self, label: str, share: float, top: float):
+        if len(label) > 120:
+            label = label[:117] + "..."
+        bar = "█" * max(1, round(self.BAR_WIDTH * share / top)) if share > 0 else ""
+        self.tree.insert("", tk.END, values=(label, f"{share:.2%}", bar))
+
+    @staticmethod
+    def _summary(profile) -> str:
+        rows = f"~{profile.estimated_rows:,}" if profile.estimated_rows >= 0 else "unknown"
+        if profile.source == "sample":
+            if not profile.sampled_rows:
+                return f"The sample ({profile.sample_percent:g}% of pages) returned no rows; table rows: {rows}."
+            return (
+                f"Live sample: {profile.sampled_rows:,} rows ({profile.sample_percent:g}% of pages) of {rows}.\n"
+                f"NULL: {profile.null_frac:.1%}   Distinct values in sample: {profile.distinct_values:,}"
+            )
+        if not profile.has_stats:
+            if not profile.can_sample:
+                return (
+                    "No planner statistics for this column: the relation is a view or foreign table, "
+                    "which has no statistics and can't be sampled."
+                )
+            return (
+                f"Table rows: {rows}. No planner statistics for this column "
+                "(the table was never analyzed). Use 'Sample Live' for a quick profile."
+            )
+        parts = [f"NULL: {profile.null_frac:.1%}", f"Distinct values: ~{profile.distinct_values:,}"]
+        if profile.avg_width is not None:
+            parts.append(f"Avg width: {profile.avg_width} B")
+        if profile.correlation is not None:
+            parts.append(f"Physical order correlation: {profile.correlation:.2f}")
+        return f"Planner statistics (pg_stats) for {rows} rows.\n" + "   ".join(parts)
+
+
+class PlanWindow(tk.Toplevel):
+    """
+    Shows an ExplainResult as a tree of plan nodes with each node's own
+    share of the execution time, estimated vs. actual rows and shared
+    buffer hits/reads. Nodes taking a large share of the time are
+    highlighted, and row estimates that are off by MISESTIMATE_FACTOR or
+    more are flagged. Selecting a node lists its remaining EXPLAIN fields.
+    """
+
+    _TAGS = {
+        "hot": {"background": "#ffc7c7"},
+        "warm": {"background": "#fff0c0"},
+        "misestimate": {"foreground": "#b35900"},
+        "never": {"foreground": "gray"},
+    }
+
+    def __init__(self, parent, title: str = "Query Plan", on_close=None):
+        super().__init__(parent)
+        self.title(title)
+        self.geometry("1000x600")
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(1, weight=3)
+        self.rowconfigure(2, weight=1)
+        self.on_close = on_close
+        self.protocol("WM_DELETE_WINDOW", self._close)
+
+        self.summary_var = tk.StringVar(value="Running EXPLAIN...")
+        ttk.Label(self, textvariable=self.summary_var, anchor=tk.W, justify=tk.LEFT, wraplength=980).grid(
+            row=0, column=0, columnspan=2, sticky="ew", padx=5, pady=5
+        )
+
+        columns = ("share", "self_ms", "rows", "estimate", "loops", "buffers", "cost")
+        self.tree = ttk.Treeview(self, columns=columns, show="tree headings")
+        self.tree.heading("#0", text="Node")
+        self.tree.column("#0", width=330)
+        for column, text, width in (
+            ("share", "Self %", 60),
+            ("self_ms", "Self ms", 80),
+            ("rows", "Rows (est. / actual)", 150),
+            ("estimate", "Estimate", 80),
+            ("loops", "Loops", 55),
+            ("buffers", "Buffers (hit / read)", 130),
+            ("cost", "Cost", 100),
+        ):
+            self.tree.heading(column, text=text)
+            self.tree.column(column, width=width, anchor=tk.E, stretch=False)
+        for tag, options in self._TAGS.items():
+            self.tree.tag_configure(tag, **options)
+        self.tree.grid(row=1, column=0, sticky="nsew")
+        v_scroll = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.tree.yview)
+        v_scroll.grid(row=1, column=1, sticky="ns")
+        self.tree.configure(yscrollcommand=v_scroll.set)
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+
+        self.details_text = tk.Text(self, height=8, wrap=tk.WORD, state=tk.DISABLED)
+        self.details_text.grid(row=2, column=0, columnspan=2, sticky="nsew", padx=5, pady=(5, 0))
+
+        bottom = ttk.Frame(self)
+        bottom.grid(row=3, column=0, columnspan=2, sticky="ew", padx=5, pady=5)
+        self.status_var = tk.StringVar(value="")
+        ttk.Label(bottom, textvariable=self.status_var).pack(side=tk.LEFT)
+        self.copy_btn = ttk.Button(bottom, text="Copy Plan JSON", command=self._copy_json, state=tk.DISABLED)
+        self.copy_btn.pack(side=tk.RIGHT)
+
+        self._result = None
+        self._nodes = {}  # tree item -> PlanNode
+
+    def show_plan(self, result):
+        if not self.winfo_exists():
+            return
+        self._result = result
+        self.tree.delete(*self.tree.get_children())
+        self._nodes.clear()
+        self._insert_node("", result.root)
+        self.summary_var.set(self._summary(result))
+        self.copy_btn.config(state=tk.NORMAL)
+
+    def show_error(self, message: str):
+        if self.winfo_exists():
+            self.summary_var.set(f"EXPLAIN failed: {message}")
+
+    def _insert_node(self, parent: str, node):
+        result = self._result
+        tags = []
+        heat = result.heat(node)
+        if heat:
+            tags.append(heat)
+        misestimate = node.row_misestimate
+        if misestimate is not None and abs(misestimate) >= MISESTIMATE_FACTOR:
+            tags.append("misestimate")
+        if node.never_executed:
+            tags.append("never")
+
+        if node.analyzed:
+            if node.never_executed:
+                values = ("", "", f"{node.plan_rows:,} / never executed", "", "0", "", "")
+            else:
+                values = (
+                    f"{result.share(node):.0%}",
+                    f"{node.self_ms:,.2f}",
+                    f"{node.plan_rows:,} / {node.actual_rows:,.0f}",
+                    self._estimate_text(misestimate),
+                    f"{node.loops:,}",
+                    f"{node.self_hit:,} / {node.self_read:,}",
+                    f"{node.total_cost:,.0f}",
+                )
+        else:
+            values = ("", "", f"{node.plan_rows:,}", "", "", "", f"{node.total_cost:,.0f}")
+
+        item = self.tree.insert(parent, tk.END, text=node.label, values=values, tags=tags, open=True)
+        self._nodes[item] = node
+        for child in node.children:
+            self._insert_node(item, child)
+
+    @staticmethod
+    def _estimate_text(misestimate) -> str:
+        if misestimate is None or abs(misestimate) < 2:
+            return ""
+        direction = "under" if misestimate > 0 else "over"
+        return f"x{abs(misestimate):,.0f} {direction}"
+
+    def _on_select(self, event=None):
+        node = self._nodes.get(next(iter(self.tree.selection()), None))
+        if node is None:
+            return
+        lines = [f"{key}: {value}" for key, value in node.details.items()]
+        if node.analyzed:
+            lines.append(f"Inclusive time: {node.total_ms:,.3f} ms over {node.loops or 0:,} loop(s)")
+            lines.append(f"Inclusive buffers: {node.shared_hit:,} hit / {node.shared_read:,} read")
+        self.details_text.config(state=tk.NORMAL)
+        self.details_text.delete("1.0", tk.END)
+        self.details_text.insert("1.0", "\n".join(lines))
+        self.details_text.config(state=tk.DISABLED)
+
+    def _copy_json(self):
+        if self._result is not None:
+            self.clipboard_clear()
+            self.clipboard_append(json.dumps(self._result.raw, indent=2))
+            self.status_var.set("Plan JSON copied to clipboard.")
+
+    def _close(self):
+        if self.on_close is not None:
+            self.on_close()
+        self.destroy()
+
+    @staticmethod
+    def _summary(result) -> str:
+        root = result.root
+        if not result.analyzed:
+            return (
+                f"Estimated plan only (not executed). Total cost {root.total_cost:,.0f}, "
+                f"~{root.plan_rows:,} rows."
+            )
+        parts = [f"Execution: {result.total_ms:,.2f} ms"]
+        if result.planning_ms is not None:
+            parts.append(f"planning: {result.planning_ms:,.2f} ms")
+        parts.append(f"buffers: {root.shared_hit:,} hit / {root.shared_read:,} read")
+        lines = [", ".join(parts) + ". The statement was rolled back."]
+        for trigger in result.triggers:
+            lines.append(f"Trigger {trigger.get('Trigger Name', '?')}: {trigger.get('Time', 0):,.2f} ms "
+                         f"({trigger.get('Calls', 0):,} call(s))")
+        hottest = result.hottest()
+        if hottest:
+            lines.append("Most expensive: " + "; ".join(
+                f"{node.label} ({result.share(node):.0%})" for node in hottest
+            ))
+        return "\n".join(lines)
+
+
+class ConnectionDialog(tk.Toplevel):
+    """
+    Asks for a connection profile (host, port, database, user, password),
+    prefilled from `initial`. "Load .env" fills in the .env / DB_* settings.
+    on_connect(config) is called with the new DatabaseConfig and the dialog
+    closes; other settings (timeouts) are carried over from `initial`.
+    """
+
+    FIELDS = (("host", "Host"), ("port", "Port"), ("database", "Database"), ("user", "User"), ("password", "Password"))
+
+    def __init__(self, parent, initial: DatabaseConfig, on_connect, title: str = "New Connection"):
+        super().__init__(parent)
+        self.title(title)
+        self.resizable(False, False)
+        self.transient(parent)
+        self.initial = initial
+        self.on_connect = on_connect
+
+        main_frame = ttk.Frame(self, padding="15")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+        main_frame.columnconfigure(1, weight=1)
+
+        self.vars = {}
+        for row, (name, label) in enumerate(self.FIELDS):
+            ttk.Label(main_frame, text=f"{label}:").grid(row=row, column=0, sticky=tk.W, pady=2)
+            var = tk.StringVar(value=str(getattr(initial, name)))
+            entry = ttk.Entry(main_frame, textvariable=var, width=36, show="*" if name == "password" else "")
+            entry.grid(row=row, column=1, sticky="ew", pady=2)
+            entry.bind('<Return>', lambda e: self.connect())
+            self.vars[name] = var
+
+        self.error_var = tk.StringVar(value="")
+        ttk.Label(main_frame, textvariable=self.error_var, foreground="red").grid(
+            row=len(self.FIELDS), column=0, columnspan=2, sticky=tk.W, pady=(5, 0)
+        )
+
+        btn_frame = ttk.Frame(main_frame)
+        btn_frame.grid(row=len(self.FIELDS) + 1, column=0, columnspan=2, sticky="ew", pady=(10, 0))
+        ttk.Button(btn_frame, text="Load .env", command=self.load_env).pack(side=tk.LEFT)
+        ttk.Button(btn_frame, text="Connect", command=self.connect).pack(side=tk.RIGHT, padx=(5, 0))
+        ttk.Button(btn_frame, text="Cancel", command=self.destroy).pack(side=tk.RIGHT)
+
+        self.wait_visibility()
+        self.grab_set()
+        self.geometry(f"+{parent.winfo_rootx()+80}+{parent.winfo_rooty()+80}")
+
+    def load_env(self):
+        config = DatabaseConfig.from_env_file()
+        for name, _ in self.FIELDS:
+            self.vars[name].set(str(getattr(config, name)))
+
+    def connect(self):
+        values = {name: var.get().strip() for name, var in self.vars.items()}
+        values["password"] = self.vars["password"].get()
+        if not values["host"] or not values["database"]:
+            self.error_var.set("Host and database are required.")
+            return
+        try:
+            values["port"] = int(values["port"])
+        except ValueError:
+            self.error_var.set("Port must be a number.")
+            return
+        config = replace(self.initial, **values)
+        self.destroy()
+        self.on_connect(config)
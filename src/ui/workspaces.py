@@ -0,0 +1,97 @@
+import tkinter as tk
+from tkinter import ttk
+from typing import Dict, Optional
+
+from ..config import DatabaseConfig
+from ..database import DatabaseConnection
+from ..metrics import StartupTimer
+from .app import DatabaseQueryGUI
+from .components import ConnectionDialog
+
+
+class WorkspaceTabs(ttk.Frame):
+    """
+    Tabbed workspaces, e.g. a primary next to its replica or staging next to
+    prod. Each tab is a DatabaseQueryGUI with its own DatabaseConnection
+    (connection profile and pool), scheduler, history and result caches, so
+    tabs query in parallel and never share state. Only the selected tab keeps
+    its grid rendered; the others are suspended to release memory
+    (see DatabaseQueryGUI.suspend).
+    """
+
+    def __init__(self, root: tk.Tk, **kwargs):
+        super().__init__(root, **kwargs)
+        self.root = root
+        self.root.title("DB_GUI_Viewer")
+        self.root.geometry("1600x900")
+
+        toolbar = ttk.Frame(self, padding=(10, 5, 10, 0))
+        toolbar.pack(fill=tk.X)
+        ttk.Button(toolbar, text="+ New Connection...", command=self.ask_new_tab).pack(side=tk.LEFT)
+        ttk.Button(toolbar, text="Duplicate Tab", command=self.duplicate_tab).pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Button(toolbar, text="Close Tab", command=self.close_tab).pack(side=tk.LEFT, padx=(5, 0))
+
+        self.notebook = ttk.Notebook(self)
+        self.notebook.pack(fill=tk.BOTH, expand=True)
+        self.notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
+
+        # Notebook tab (frame path) -> its workspace
+        self.workspaces: Dict[str, DatabaseQueryGUI] = {}
+
+    def open_tab(self, config: DatabaseConfig, startup: Optional[StartupTimer] = None) -> DatabaseQueryGUI:
+        """Add a workspace connected to `config` and switch to it."""
+        frame = ttk.Frame(self.notebook)
+        app = DatabaseQueryGUI(self.root, DatabaseConnection(config), startup=startup, parent=frame)
+        self.workspaces[str(frame)] = app
+        self.notebook.add(frame, text=self._tab_title(config))
+        self.notebook.select(frame)
+        return app
+
+    def current(self) -> Optional[DatabaseQueryGUI]:
+        selected = self.notebook.select()
+        return self.workspaces.get(str(selected)) if selected else None
+
+    def ask_new_tab(self):
+        """Open a tab for a profile entered in a ConnectionDialog, starting from the current tab's."""
+        app = self.current()
+        initial = app.db.config if app is not None else DatabaseConfig.from_env_file()
+        ConnectionDialog(self.root, initial, on_connect=self.open_tab)
+
+    def duplicate_tab(self):
+        """Another workspace on the current tab's profile (a separate pool, so it runs in parallel)."""
+        app = self.current()
+        if app is not None:
+            self.open_tab(app.db.config)
+
+    def close_tab(self):
+        selected = self.notebook.select()
+        app = self.workspaces.pop(str(selected), None) if selected else None
+        if app is None:
+            return
+        app.close()
+        self.notebook.forget(selected)
+        self.nametowidget(selected).destroy()
+
+    def close_all(self):
+        """Close every workspace's connections (on application exit)."""
+        for app in self.workspaces.values():
+            app.close(wait=True)
+        self.workspaces.clear()
+
+    def _tab_title(self, config: DatabaseConfig) -> str:
+        title = f"{config.database} @ {config.host}"
+        existing = {self.notebook.tab(tab, "text") for tab in self.notebook.tabs()}
+        n = 2
+        unique = title
+        while unique in existing:
+            unique = f"{title} ({n})"
+            n += 1
+        return unique
+
+    def _on_tab_changed(self, event=None):
+        selected = str(self.notebook.select())
+        for tab, app in self.workspaces.items():
+            if tab == selected:
+                app.resume()
+            else:
+                app.suspend()
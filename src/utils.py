@@ -1,12 +1,84 @@
 import logging
+import os
 import sys
+import time
+from logging.handlers import RotatingFileHandler
+from typing import Any, BinaryIO, Callable, Iterable, List, Optional, Tuple
 
+from .metrics import METRICS_LOGGER
 
-def setup_logging(log_level: str = "INFO") -> logging.Logger:
-    """Configure application-wide logging."""
+
+def setup_logging(
+    log_level: str = "INFO",
+    metrics_file: Optional[str] = None,
+    metrics_max_bytes: int = 5 * 1024 * 1024,
+    metrics_backups: int = 3,
+) -> logging.Logger:
+    """
+    Configure application-wide logging. With `metrics_file`, per-query
+    timing records (see metrics.log_timings) go to that rotating file as
+    JSON lines instead of the console.
+    """
     logging.basicConfig(
         level=getattr(logging, log_level.upper()),
         format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
         handlers=[logging.StreamHandler(sys.stdout)],
     )
+    metrics_logger = logging.getLogger(METRICS_LOGGER)
+    if metrics_file:
+        os.makedirs(os.path.dirname(os.path.abspath(metrics_file)), exist_ok=True)
+        handler = RotatingFileHandler(
+            metrics_file, maxBytes=metrics_max_bytes, backupCount=metrics_backups, encoding="utf-8"
+        )
+        handler.setFormatter(logging.Formatter('{"time": "%(asctime)s", "metrics": %(message)s}'))
+        metrics_logger.addHandler(handler)
+        metrics_logger.setLevel(logging.INFO)
+        metrics_logger.propagate = False
+    else:
+        # Without a file, keep timing records out of the INFO console output.
+        metrics_logger.setLevel(logging.DEBUG if log_level.upper() == "DEBUG" else logging.WARNING)
     return logging.getLogger("db_viewer")
+
+
+def write_csv(filepath: str, batches: Iterable[Tuple[List[str], Iterable[List[Any]]]]) -> int:
+    """
+    Write (column_names, rows) batches to a CSV file as they arrive.
+    The header comes from the first batch. Returns the number of data rows written.
+    """
+    import csv  # deferred: only exports need it
+
+    row_count = 0
+    with open(filepath, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        header_written = False
+        for column_names, rows in batches:
+            if not header_written:
+                writer.writerow(column_names)
+                header_written = True
+            for row in rows:  # rows may be a generator (ResultSet.formatted_rows)
+                writer.writerow(row)
+                row_count += 1
+    return row_count
+
+
+class ProgressWriter:
+    """
+    Binary file wrapper that reports the number of bytes written so far to
+    `on_progress`, at most once every `interval` seconds.
+    """
+
+    def __init__(self, f: BinaryIO, on_progress: Callable[[int], None], interval: float = 0.25):
+        self.f = f
+        self.on_progress = on_progress
+        self.interval = interval
+        self.bytes_written = 0
+        self._last_report = 0.0
+
+    def write(self, data: bytes) -> int:
+        written = self.f.write(data)
+        self.bytes_written += len(data)
+        now = time.monotonic()
+        if now - self._last_report >= self.interval:
+            self._last_report = now
+            self.on_progress(self.bytes_written)
+        return written
@@ -0,0 +1,4 @@
+"""
+Unit tests for the server-free parts of the viewer. Run from the repository
+root with `python -m pytest tests`; nothing here needs PostgreSQL or a display.
+"""
@@ -0,0 +1,108 @@
+import csv
+import json
+from datetime import datetime
+
+import pytest
+
+from src import batch
+from src.database import QueryCancelled, QueryTicket
+from src.models import AppState, Filter, SortCriterion
+from src.results import ResultSet
+
+
+class FakeDatabase:
+    """Streams canned batches; `error` makes the second batch fail."""
+
+    def __init__(self, batches, error=None, cancelled=False):
+        self.batches = batches
+        self.error = error
+        self.cancelled = cancelled
+        self.queries = []
+
+    def get_primary_key(self, schema, table):
+        return ["id"]
+
+    def get_not_null_columns(self, schema, table):
+        return {"id"}
+
+    def stream_query(self, query, lane, ticket, timeout_ms, params):
+        self.queries.append((query, params))
+        yield self.batches[0]
+        if self.error is not None:
+            ticket.cancelled = self.cancelled
+            yield ResultSet.from_error(self.error)
+        yield from self.batches[1:]
+
+
+def saved_state(**changes):
+    fields = dict(
+        schema="public", table="items", filters=(Filter(0, "price", ">", "3"),),
+        sorting=(SortCriterion("price", "DESC"),), row_limit=50, is_manual_mode=False,
+        manual_query_text="", timestamp=datetime(2024, 1, 1),
+    )
+    fields.update(changes)
+    return AppState(**fields)
+
+
+def batches():
+    return [
+        ResultSet.from_rows(["id", "doc"], [23, 3802], [[1, {"a": 1}], [2, None]]),
+        ResultSet.from_rows(["id", "doc"], [23, 3802], [[3, [1, 2]]]),
+    ]
+
+
+def job(tmp_path, fmt, state=None):
+    return batch.BatchJob("q.json", state or saved_state(), str(tmp_path / f"q.{fmt}"), QueryTicket())
+
+
+def test_grid_state_rebuilds_the_first_page_query():
+    sql, params = batch.build_state_query(FakeDatabase([]), saved_state())
+    assert 'FROM "public"."items"' in sql and "LIMIT" in sql
+    assert '"price" DESC, "id" ASC' in sql
+    assert "3" in params.values() and 50 in params.values()
+
+
+def test_all_rows_drops_the_limit():
+    sql, _ = batch.build_state_query(FakeDatabase([]), saved_state(), all_rows=True)
+    assert "LIMIT" not in sql
+
+
+def test_manual_state_runs_its_text():
+    state = saved_state(is_manual_mode=True, manual_query_text="SELECT 1")
+    assert batch.build_state_query(FakeDatabase([]), state) == ("SELECT 1", {})
+
+
+def test_csv_export(tmp_path):
+    current = job(tmp_path, "csv")
+    assert batch.run_job(FakeDatabase(batches()), current, "csv", False, None) == 3
+    with open(current.output, newline="", encoding="utf-8") as f:
+        assert list(csv.reader(f)) == [["id", "doc"], ["1", '{"a": 1}'], ["2", "NULL"], ["3", "[1, 2]"]]
+
+
+def test_jsonl_export_keeps_json_values(tmp_path):
+    current = job(tmp_path, "jsonl")
+    assert batch.run_job(FakeDatabase(batches()), current, "jsonl", False, None) == 3
+    with open(current.output, encoding="utf-8") as f:
+        assert [json.loads(line) for line in f] == [
+            {"id": 1, "doc": {"a": 1}}, {"id": 2, "doc": None}, {"id": 3, "doc": [1, 2]},
+        ]
+
+
+@pytest.mark.parametrize("cancelled, error", [(False, RuntimeError), (True, QueryCancelled)])
+def test_failed_queries_leave_no_file(tmp_path, cancelled, error):
+    current = job(tmp_path, "csv")
+    with pytest.raises(error):
+        batch.run_job(FakeDatabase(batches(), error="canceling statement", cancelled=cancelled), current, "csv", False, None)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_inputs_with_the_same_output_name_are_refused(tmp_path, monkeypatch):
+    for folder in ("a", "b"):
+        (tmp_path / folder).mkdir()
+        with open(tmp_path / folder / "q.json", "w") as f:
+            json.dump(saved_state().to_dict(), f)
+    # Every input is refused before a connection is made.
+    monkeypatch.setattr(batch, "DatabaseConnection", None)
+    status = batch.main([str(tmp_path / "a" / "q.json"), str(tmp_path / "b" / "q.json"), "--output-dir", str(tmp_path / "out")])
+    assert status == 1
+    assert list((tmp_path / "out").iterdir()) == []
@@ -0,0 +1,39 @@
+from benchmarks import compare
+from benchmarks.harness import BenchmarkRun, measure, skipped
+
+
+def run_with(medians, commit="a" * 40):
+    run = BenchmarkRun(commit=commit, dirty=False, started_at="2024-01-01T00:00:00+00:00",
+                       python="3", platform="test", server_version="16", profile="quick")
+    for name, median in medians.items():
+        m = measure(name, lambda: (10, 100), params={"rows": 10}, repeat=1, warmup=0, trace_memory=False)
+        m.latency_ms["median"] = median
+        run.measurements.append(m)
+    run.measurements.append(skipped("render", "no display"))
+    return run
+
+
+def test_measure_summarises_runs_and_throughput():
+    m = measure("noop", lambda: (1000, 2048), params={"b": 2, "a": 1}, repeat=3, warmup=1)
+    assert m.key == "noop[a=1,b=2]"
+    assert m.runs == 3
+    assert m.latency_ms["min"] <= m.latency_ms["median"] <= m.latency_ms["max"]
+    assert m.rows == 1000 and m.bytes == 2048
+    assert m.peak_alloc_mb is not None
+
+
+def test_saved_runs_round_trip_through_compare(tmp_path):
+    path = run_with({"fetch": 10.0}).save(str(tmp_path))
+    assert compare.medians(compare.load(path)) == {"fetch[rows=10]": 10.0}
+
+
+def test_compare_flags_regressions_over_the_threshold(tmp_path, capsys):
+    old = run_with({"fetch": 10.0, "sort": 10.0, "gone": 1.0}).save(str(tmp_path / "old"))
+    new = run_with({"fetch": 10.5, "sort": 5.0, "added": 1.0}, commit="b" * 40).save(str(tmp_path / "new"))
+    assert compare.main([old, new, "--threshold", "0.10"]) == 0
+    out = capsys.readouterr().out
+    assert "faster" in out and "only in old" in out and "only in new" in out
+
+    slower = run_with({"fetch": 12.0}, commit="c" * 40).save(str(tmp_path / "slower"))
+    assert compare.main([old, slower, "--threshold", "0.10"]) == 1
+    assert "REGRESSION" in capsys.readouterr().out
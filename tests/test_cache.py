@@ -0,0 +1,65 @@
+from src.cache import ResultCache
+from src.results import ResultSet
+
+
+def result(rows=10, text="x" * 100):
+    return ResultSet(["id", "name"], [23, 25], [list(range(rows)), [text] * rows])
+
+
+def test_get_returns_what_was_put():
+    cache = ResultCache()
+    page = result()
+    cache.put(("t", 0), page)
+    assert cache.get(("t", 0)).result is page
+    assert cache.get(("t", 1)) is None
+
+
+def test_least_recently_used_entries_go_first():
+    size = result().estimated_size()
+    cache = ResultCache(max_bytes=size * 2)
+    cache.put("a", result())
+    cache.put("b", result())
+    cache.get("a")
+    cache.put("c", result())
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.total_bytes <= cache.max_bytes
+
+
+def test_results_over_the_budget_are_not_stored():
+    cache = ResultCache(max_bytes=result(rows=1).estimated_size())
+    cache.put("big", result(rows=1000))
+    assert len(cache) == 0
+
+
+def test_errors_are_not_stored():
+    cache = ResultCache()
+    cache.put("e", ResultSet.from_error("boom"))
+    assert cache.get("e") is None
+
+
+def test_expired_entries_are_dropped(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("src.cache.time.monotonic", lambda: now[0])
+    cache = ResultCache(ttl_seconds=60)
+    cache.put("a", result())
+    now[0] += 61
+    assert cache.get("a") is None
+    assert cache.total_bytes == 0
+
+
+def test_replacing_a_key_keeps_the_size_accounting():
+    cache = ResultCache()
+    cache.put("a", result(rows=10))
+    cache.put("a", result(rows=1))
+    assert cache.total_bytes == result(rows=1).estimated_size()
+
+
+def test_invalidate_by_predicate():
+    cache = ResultCache()
+    for key in [("s", "t", 0), ("s", "t", 1), ("s", "u", 0)]:
+        cache.put(key, result())
+    cache.invalidate(lambda key: key[1] == "t")
+    assert len(cache) == 1 and cache.get(("s", "u", 0)) is not None
+    cache.invalidate()
+    assert len(cache) == 0 and cache.total_bytes == 0
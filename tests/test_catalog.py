@@ -0,0 +1,115 @@
+import json
+import re
+
+import pytest
+
+from src.catalog import CatalogCache, profile_key
+from src.results import ResultSet
+
+
+class FakeCatalog:
+    """Answers CatalogCache's bulk queries from a dict of schema -> {table: (columns, primary key)}."""
+
+    def __init__(self, schemas):
+        self.schemas = schemas
+        self.versions = {name: 1 for name in schemas}
+        self.loaded = []
+        self.fail = False
+
+    def run_query(self, sql):
+        if self.fail:
+            return ResultSet.from_error("connection lost")
+        tables = []
+        for schema, contents in sorted(self.schemas.items()):
+            for table, (columns, pk) in sorted(contents.items()):
+                tables.append((len(tables), schema, table, columns, pk))
+        if "concat_ws" in sql:
+            return ResultSet.from_rows(["nspname", "sig"], None, [
+                [schema, f"{len(contents)}:{self.versions[schema]}"] for schema, contents in self.schemas.items()
+            ])
+        wanted = set(re.findall(r"'([^']*)'", sql.split("nspname IN", 1)[1]))
+        tables = [t for t in tables if t[1] in wanted]
+        if "reltuples" in sql:
+            self.loaded.append(wanted)
+            return ResultSet.from_rows(["oid", "s", "t", "k", "n"], None, [[oid, s, t, "r", 10] for oid, s, t, _, _ in tables])
+        if "attnotnull" in sql:
+            return ResultSet.from_rows(["r", "n", "t", "o", "nn"], None, [
+                [oid, column, "integer", 23, column in pk] for oid, _, _, columns, pk in tables for column in columns
+            ])
+        return ResultSet.from_rows(["r", "n", "u", "p", "c"], None, [
+            [oid, f"{t}_pkey", True, True, list(pk)] for oid, _, t, _, pk in tables if pk
+        ])
+
+
+@pytest.fixture
+def server():
+    return FakeCatalog({
+        "public": {"users": (["id", "email"], ["id"]), "notes": (["body"], [])},
+        "sales": {"orders": (["id", "user_id"], ["id"])},
+    })
+
+
+def cache_for(server, tmp_path):
+    return CatalogCache(server.run_query, profile_key("h", 5432, "db", "u"), cache_dir=str(tmp_path))
+
+
+def test_first_refresh_loads_every_schema(server, tmp_path):
+    cache = cache_for(server, tmp_path)
+    assert cache.refresh() == {"public", "sales"}
+    assert cache.tables("public") == ["notes", "users"]
+    users = cache.relation("public", "users")
+    assert users.primary_key == ["id"]
+    assert users.not_null_columns == {"id"}
+    assert cache.relation("public", "notes").primary_key == []
+
+
+def test_refresh_reloads_only_changed_schemas(server, tmp_path):
+    cache = cache_for(server, tmp_path)
+    cache.refresh()
+    server.loaded.clear()
+    assert cache.refresh() == set()
+    assert server.loaded == []
+
+    server.schemas["sales"]["refunds"] = (["id"], ["id"])
+    server.versions["sales"] += 1
+    assert cache.refresh() == {"sales"}
+    assert server.loaded == [{"sales"}]
+    assert cache.tables("sales") == ["orders", "refunds"]
+
+
+def test_dropped_schemas_are_removed(server, tmp_path):
+    cache = cache_for(server, tmp_path)
+    cache.refresh()
+    del server.schemas["sales"]
+    assert cache.refresh() == {"sales"}
+    assert cache.relation("sales", "orders") is None
+
+
+def test_cache_survives_a_restart_without_queries(server, tmp_path):
+    cache_for(server, tmp_path).refresh()
+    server.fail = True
+    reopened = cache_for(server, tmp_path)
+    assert reopened.ensure_loaded()
+    assert reopened.relation("sales", "orders").primary_key == ["id"]
+
+
+def test_unreadable_or_outdated_cache_files_are_ignored(server, tmp_path):
+    cache = cache_for(server, tmp_path)
+    with open(cache.cache_path, "w") as f:
+        json.dump({"version": 0, "relations": [], "signatures": {}}, f)
+    assert not cache.load_from_disk()
+    with open(cache.cache_path, "w") as f:
+        f.write("{not json")
+    assert not cache.load_from_disk()
+
+
+def test_failed_refresh_keeps_the_cached_catalog(server, tmp_path):
+    cache = cache_for(server, tmp_path)
+    cache.refresh()
+    server.fail = True
+    assert cache.refresh() is None
+    assert cache.tables("public") == ["notes", "users"]
+
+
+def test_profiles_do_not_share_cache_files():
+    assert profile_key("h", 5432, "db", "u") != profile_key("h", 5432, "db2", "u")
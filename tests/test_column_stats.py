@@ -0,0 +1,63 @@
+import pytest
+
+from src.column_stats import (
+    SAMPLE_MAX_PAGES, SAMPLE_TARGET_ROWS, ColumnProfile, parse_array_text, profile_from_sample,
+    profile_from_stats, sample_percent,
+)
+
+
+@pytest.mark.parametrize("text, items", [
+    (None, []),
+    ("{}", []),
+    ("{a,b}", ["a", "b"]),
+    ('{"a b","c,d",NULL,"NULL"}', ["a b", "c,d", None, "NULL"]),
+    ('{"say \\"hi\\"","back\\\\slash"}', ['say "hi"', "back\\slash"]),
+])
+def test_parse_array_text(text, items):
+    assert parse_array_text(text) == items
+
+
+def stats_row(reltuples=1000, relkind="r", pages=10):
+    return [reltuples, 0.1, -0.5, 4, 0.9, "{x,y}", [0.3, 0.2], "{a,m,z}", relkind, pages]
+
+
+def test_profile_from_stats():
+    profile = profile_from_stats("public", "t", "c", stats_row())
+    assert profile.has_stats and profile.can_sample
+    assert profile.distinct_values == 500  # stored as a negative fraction of rows
+    assert profile.most_common == [("x", 0.3), ("y", 0.2)]
+    # 40% of rows are neither NULL nor a most common value, spread over two buckets
+    assert profile.histogram_buckets() == [("a", "m", pytest.approx(0.2)), ("m", "z", pytest.approx(0.2))]
+
+
+@pytest.mark.parametrize("relkind, can_sample", [("r", True), ("m", True), ("p", True), ("v", False), ("f", False)])
+def test_only_tables_can_be_sampled(relkind, can_sample):
+    assert profile_from_stats("public", "t", "c", stats_row(relkind=relkind)).can_sample == can_sample
+
+
+def test_sample_percent_targets_a_row_count():
+    assert sample_percent(SAMPLE_TARGET_ROWS // 2) == 100.0
+    assert sample_percent(SAMPLE_TARGET_ROWS * 10) == 10.0
+    assert sample_percent(10 ** 12) == 0.01
+
+
+@pytest.mark.parametrize("estimated_rows", [-1, 0])
+def test_unanalyzed_tables_read_a_bounded_number_of_pages(estimated_rows):
+    assert sample_percent(estimated_rows, pages=SAMPLE_MAX_PAGES * 4) == 25.0
+    assert sample_percent(estimated_rows, pages=SAMPLE_MAX_PAGES // 2) == 100.0
+
+
+def test_sampled_profile_scales_to_the_table():
+    stats = ColumnProfile("public", "t", "c", "pg_stats", estimated_rows=-1, pages=4000)
+    profile = profile_from_sample(stats, 25.0, [200, 50, 3, ["a", "b"], [100, 40]])
+    assert profile.estimated_rows == 800  # no estimate: extrapolated from the sample
+    assert profile.null_frac == 0.25
+    assert profile.distinct_values == 3
+    assert profile.most_common == [("a", 0.5), ("b", 0.2)]
+
+
+def test_empty_sample_has_no_figures():
+    stats = ColumnProfile("public", "t", "c", "pg_stats", estimated_rows=500)
+    profile = profile_from_sample(stats, 100.0, [0, 0, 0, None, None])
+    assert profile.estimated_rows == 500
+    assert not profile.has_stats
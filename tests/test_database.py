@@ -0,0 +1,126 @@
+import pytest
+
+from src.config import DatabaseConfig
+from src.database import DatabaseConnection, QueryCancelled, QueryTicket
+from src.pool import PooledConnection
+
+
+class FakeStatement:
+    def __init__(self, query):
+        self.query = query
+        self.columns = [{"name": "x"}]
+        self.closed = False
+        self.runs = 0
+
+    def run(self, **params):
+        self.runs += 1
+        return [[params.get("p0")]]
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnection:
+    def __init__(self):
+        self.prepared = []
+
+    def prepare(self, query):
+        statement = FakeStatement(query)
+        self.prepared.append(statement)
+        return statement
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setenv("DB_VIEWER_CACHE_DIR", str(tmp_path))
+    return DatabaseConnection(DatabaseConfig("localhost", 5432, "db", "user", "pw"))
+
+
+def test_statements_are_prepared_once_per_connection(db):
+    pooled = PooledConnection(raw=FakeConnection(), lane="grid")
+    for value in (1, 2, 3):
+        columns, rows = db._run_prepared(pooled, "SELECT :p0", {"p0": value})
+        assert rows == [[value]]
+    assert len(pooled.raw.prepared) == 1
+    assert pooled.raw.prepared[0].runs == 3
+
+
+def test_least_recently_used_statement_is_closed(db, monkeypatch):
+    monkeypatch.setattr(DatabaseConnection, "STATEMENT_CACHE_SIZE", 2)
+    pooled = PooledConnection(raw=FakeConnection(), lane="grid")
+    db._run_prepared(pooled, "SELECT 1", {})
+    db._run_prepared(pooled, "SELECT 2", {})
+    db._run_prepared(pooled, "SELECT 1", {})  # now the most recently used
+    db._run_prepared(pooled, "SELECT 3", {})
+    closed = [s.query for s in pooled.raw.prepared if s.closed]
+    assert closed == ["SELECT 2"]
+    assert list(pooled.info["statements"]) == ["SELECT 1", "SELECT 3"]
+
+
+class FakeServerConnection:
+    """Enough of pg8000's Connection for _checkout and cancel; records what it was asked to run."""
+
+    pids = iter(range(100, 200))
+
+    def __init__(self, log, hooks):
+        self._sock = object()
+        self._transaction_status = b"I"
+        self.pid = next(self.pids)
+        self.log = log
+        self.hooks = hooks
+
+    def run(self, sql, **params):
+        for hook in self.hooks:
+            hook(sql)
+        self.log.append((self.pid, sql, params))
+        if sql == "SELECT pg_backend_pid()":
+            return [[self.pid]]
+        return []
+
+    def close(self):
+        self._sock = None
+
+
+@pytest.fixture
+def server_db(db):
+    db.log, db.hooks = [], []
+    db._open_connection = lambda: FakeServerConnection(db.log, db.hooks)
+    db.pool = db._create_pool()
+    return db
+
+
+def test_cancel_before_the_query_starts_sends_nothing(server_db):
+    ticket = QueryTicket()
+    assert not server_db.cancel(ticket)
+    with pytest.raises(QueryCancelled):
+        with server_db._checkout("grid", ticket):
+            pass
+    assert not any("pg_cancel_backend" in sql for _, sql, _ in server_db.log)
+
+
+def test_cancel_targets_the_running_backend_without_holding_the_ticket(server_db):
+    ticket = QueryTicket()
+    with server_db._checkout("grid", ticket) as pooled:
+        server_db.hooks.append(lambda sql: ticket.lock.locked() and pytest.fail(f"{sql} sent under ticket.lock"))
+        assert server_db.cancel(ticket)
+        running_pid = pooled.raw.pid
+    cancels = [(pid, params) for pid, sql, params in server_db.log if "pg_cancel_backend" in sql]
+    assert cancels[0][1] == {"pid": running_pid}
+    assert cancels[0][0] != running_pid  # sent from a control connection
+
+
+def test_late_cancel_does_not_hit_the_next_query(server_db):
+    ticket = QueryTicket()
+    with server_db._checkout("grid", ticket):
+        pass
+    assert ticket.backend_pid is None
+    assert not server_db.cancel(ticket)
+
+
+def test_statement_timeout_is_only_set_when_it_changes(server_db):
+    for timeout_ms in (500, 500, 0):
+        with server_db._checkout("grid", timeout_ms=timeout_ms):
+            pass
+    assert [sql for _, sql, _ in server_db.log if sql.startswith("SET")] == [
+        "SET statement_timeout = 500", "SET statement_timeout = 0",
+    ]
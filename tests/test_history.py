@@ -0,0 +1,96 @@
+import json
+from datetime import datetime
+
+from src.history import HistoryStore, estimated_size
+from src.models import AppState, Filter, FilterState, SortCriterion
+
+
+def state(table="items", filters=(), sorting=(), query="", manual=False, when=None):
+    return AppState(
+        schema="public", table=table, filters=filters, sorting=sorting, row_limit=50,
+        is_manual_mode=manual, manual_query_text=query, timestamp=when or datetime.now(),
+    )
+
+
+def test_equal_snapshots_are_the_same_object():
+    first = state(filters=[Filter(0, "id", ">", "3")], when=datetime(2024, 1, 1))
+    second = state(filters=[Filter(0, "id", ">", "3")], when=datetime(2024, 6, 1))
+    assert first == second  # the timestamp is not compared
+    assert first.snapshot() is second.snapshot()
+    assert first.snapshot().filters[0] is second.snapshot().filters[0]
+
+
+def test_snapshots_share_unchanged_filters():
+    shared = Filter(0, "id", ">", "3")
+    before = state(filters=[shared]).snapshot()
+    after = state(filters=[shared, Filter(1, "name", "=", "x")]).snapshot()
+    assert before.filters[0] is after.filters[0]
+
+
+def test_states_are_immutable_and_hashable():
+    snapshot = state(filters=[Filter(0, "id", ">", "3")], sorting=[SortCriterion("id")])
+    assert isinstance(snapshot.filters, tuple)
+    assert len({snapshot, state(filters=[Filter(0, "id", ">", "3")], sorting=[SortCriterion("id")])}) == 1
+
+
+def test_result_key_ignores_inactive_filters_and_filter_order():
+    a = Filter(0, "id", ">", "3")
+    b = Filter(1, "name", "=", "x")
+    off = Filter(2, "id", "<", "9", state=FilterState.INACTIVE)
+    assert state(filters=[a, b]).result_key() == state(filters=[b, off, a]).result_key()
+    assert state(manual=True, query=" SELECT 1 ").result_key() == ("manual", "SELECT 1")
+
+
+def test_round_trip_through_json():
+    original = state(filters=[Filter(0, "id", "IN", "1,2")], sorting=[SortCriterion("id", "DESC")])
+    loaded = AppState.from_dict(json.loads(json.dumps(original.to_dict())))
+    assert loaded == original
+    assert loaded is original.snapshot()
+
+
+def test_back_and_forward():
+    history = HistoryStore()
+    for table in ("a", "b", "c"):
+        history.record(state(table))
+    assert history.back().table == "b"
+    assert history.back().table == "a"
+    assert history.back() is None
+    assert history.forward().table == "b"
+
+
+def test_recording_after_going_back_drops_forward_history():
+    history = HistoryStore()
+    for table in ("a", "b", "c"):
+        history.record(state(table))
+    history.back()
+    history.record(state("d"))
+    assert not history.can_go_forward
+    assert [history.back().table, history.back().table] == ["b", "a"]
+
+
+def test_recording_the_current_state_again_is_a_no_op():
+    history = HistoryStore()
+    assert history.record(state("a"))
+    assert not history.record(state("a"))
+    assert len(history) == 1
+
+
+def test_entry_limit_drops_the_oldest():
+    history = HistoryStore(max_entries=3)
+    for table in "abcde":
+        history.record(state(table))
+    assert len(history) == 3
+    assert [history.back().table, history.back().table] == ["d", "c"]
+
+
+def test_memory_limit_counts_repeated_states_once():
+    big = state(manual=True, query="SELECT " + "x" * 10_000)
+    history = HistoryStore(max_bytes=estimated_size(big) + 2 * estimated_size(state()))
+    history.record(big)
+    history.record(state("a"))
+    history.record(big)  # the same interned object: no extra memory
+    assert history.total_bytes == estimated_size(big) + estimated_size(state("a"))
+    history.record(state("b"))
+    history.record(state("c"))
+    assert history.total_bytes <= history.max_bytes
+    assert history.current.table == "c"
@@ -0,0 +1,166 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from src.local_engine import LocalQuery, Unsupported
+from src.models import Filter, FilterState, SortCriterion
+from src.results import ResultSet, TruncatedText
+
+INT4, FLOAT4, NUMERIC, TEXT, TIMESTAMP, JSONB = 23, 700, 1700, 25, 1114, 3802
+
+
+def people():
+    return ResultSet(
+        ["row", "id", "name", "score"],
+        [INT4, INT4, TEXT, NUMERIC],
+        [
+            [1, 2, 3, 4],
+            [3, 1, 4, 2],
+            ["carol", "alice", None, "bob"],
+            [Decimal("2.5"), Decimal("10"), Decimal("7"), None],
+        ],
+    )
+
+
+def column(result, name):
+    return result.columns[result.column_names.index(name)]
+
+
+def where(column_name, operator, value, state=FilterState.ACTIVE):
+    return Filter(0, column_name, operator, value, state=state)
+
+
+def test_sort_puts_nulls_last_ascending_and_first_descending():
+    query = LocalQuery(people(), bytewise_columns={"name"})
+    assert column(query.run([], [SortCriterion("score")]), "score") == [
+        Decimal("2.5"), Decimal("7"), Decimal("10"), None,
+    ]
+    assert column(query.run([], [SortCriterion("name", "DESC")]), "name") == [None, "carol", "bob", "alice"]
+
+
+def test_primary_key_breaks_ties_and_rows_are_renumbered():
+    base = ResultSet(["row", "id", "grp"], [INT4, INT4, INT4], [[1, 2, 3], [3, 1, 2], [1, 1, 1]])
+    result = LocalQuery(base).run([], [SortCriterion("grp")], primary_key=["id"])
+    assert column(result, "id") == [1, 2, 3]
+    assert column(result, "row") == [1, 2, 3]
+
+
+def test_row_number_descending_reverses_the_order():
+    result = LocalQuery(people()).run([], [SortCriterion("row", "DESC")], primary_key=["id"])
+    assert column(result, "id") == [4, 3, 2, 1]
+    assert column(result, "row") == [4, 3, 2, 1]
+
+
+def test_input_is_not_modified():
+    base = people()
+    LocalQuery(base).run([where("id", ">", "1")], [SortCriterion("id", "DESC")])
+    assert base.columns[1] == [3, 1, 4, 2]
+
+
+@pytest.mark.parametrize("operator, value, expected", [
+    ("=", "3", [3]),
+    ("!=", "3", [1, 4, 2]),
+    (">", "2", [3, 4]),
+    ("<=", "2", [1, 2]),
+    ("IN", "1, 4", [1, 4]),
+    ("NOT IN", "1,4", [3, 2]),
+])
+def test_integer_filters(operator, value, expected):
+    result = LocalQuery(people()).run([where("id", operator, value)], [])
+    assert column(result, "id") == expected
+
+
+def test_null_filters_and_comparisons_skip_nulls():
+    query = LocalQuery(people())
+    assert column(query.run([where("name", "=", "NULL")], []), "id") == [4]
+    assert column(query.run([where("name", "!=", None)], []), "id") == [3, 1, 2]
+    assert column(query.run([where("score", "<", "100")], []), "id") == [3, 1, 4]
+
+
+def test_inactive_filters_are_ignored():
+    result = LocalQuery(people()).run([where("id", "=", "1", state=FilterState.INACTIVE)], [])
+    assert len(result) == 4
+
+
+def test_ilike_matches_plain_ascii_substrings():
+    result = LocalQuery(people()).run([where("name", "ILIKE", "AR")], [])
+    assert column(result, "name") == ["carol"]
+
+
+@pytest.mark.parametrize("value", ["a%", "a_", "é"])
+def test_ilike_with_wildcards_or_non_ascii_falls_back(value):
+    with pytest.raises(Unsupported):
+        LocalQuery(people()).run([where("name", "ILIKE", value)], [])
+
+
+def test_text_ordering_needs_a_bytewise_collation():
+    with pytest.raises(Unsupported):
+        LocalQuery(people()).run([], [SortCriterion("name")])
+    with pytest.raises(Unsupported):
+        LocalQuery(people()).run([where("name", ">", "b")], [])
+
+
+def test_unparseable_values_and_unknown_types_fall_back():
+    with pytest.raises(Unsupported):
+        LocalQuery(people()).run([where("id", "=", "abc")], [])
+    base = ResultSet(["doc"], [JSONB], [[{"a": 1}]])
+    with pytest.raises(Unsupported):
+        LocalQuery(base).run([where("doc", "=", "{}")], [])
+
+
+def test_truncated_columns_fall_back():
+    base = ResultSet(["body"], [TEXT], [[TruncatedText("abc", 10_000)]])
+    with pytest.raises(Unsupported):
+        LocalQuery(base, bytewise_columns={"body"}).run([], [SortCriterion("body")])
+
+
+def test_float4_equality_matches_the_server():
+    # The driver may decode a real either from its shortest text form (0.1)
+    # or widened (0.10000000149011612); the server matches both to '0.1'.
+    base = ResultSet(["x"], [FLOAT4], [[0.1, 0.10000000149011612, 0.2]])
+    query = LocalQuery(base)
+    assert len(query.run([where("x", "=", "0.1")], [])) == 2
+    assert len(query.run([where("x", "IN", "0.1, 0.3")], [])) == 2
+    assert len(query.run([where("x", ">", "0.1")], [])) == 1
+
+
+def test_float4_literal_out_of_range_falls_back():
+    base = ResultSet(["x"], [FLOAT4], [[1.0]])
+    with pytest.raises(Unsupported):
+        LocalQuery(base).run([where("x", "<", "1e40")], [])
+
+
+def test_float_nan_falls_back():
+    base = ResultSet(["x"], [701], [[1.0, float("nan")]])
+    with pytest.raises(Unsupported):
+        LocalQuery(base).run([], [SortCriterion("x")])
+    with pytest.raises(Unsupported):
+        LocalQuery(base).run([where("x", "=", "NaN")], [])
+
+
+def test_numeric_nan_falls_back():
+    base = ResultSet(["n"], [NUMERIC], [[Decimal("1"), Decimal("NaN")]])
+    query = LocalQuery(base)
+    with pytest.raises(Unsupported):
+        query.run([], [SortCriterion("n")])
+    with pytest.raises(Unsupported):
+        query.run([where("n", ">", "0")], [])
+    with pytest.raises(Unsupported):
+        query.run([where("n", "=", "NaN")], [])
+    assert column(query.run([where("n", "=", "1")], []), "n") == [Decimal("1")]
+
+
+def test_timestamp_filter_with_utc_offset_falls_back():
+    base = ResultSet(["t"], [TIMESTAMP], [[datetime(2024, 1, 1, 10)]])
+    query = LocalQuery(base)
+    with pytest.raises(Unsupported):
+        query.run([where("t", "=", "2024-01-01 10:00+02")], [])
+    assert len(query.run([where("t", "=", "2024-01-01 10:00")], [])) == 1
+
+
+def test_infinite_dates_fall_back():
+    # 'infinity' timestamps arrive from the driver as strings
+    base = ResultSet(["t"], [TIMESTAMP], [[datetime(2024, 1, 1), "infinity"]])
+    with pytest.raises(Unsupported):
+        LocalQuery(base).run([], [SortCriterion("t")])
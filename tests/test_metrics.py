@@ -0,0 +1,64 @@
+import io
+import json
+import logging
+
+from src.metrics import METRICS_LOGGER, QueryTimings, StartupTimer, TimedStream, log_timings
+
+
+def test_phases_accumulate_and_summarise_in_order():
+    timings = QueryTimings(label="grid", rows=50)
+    timings.add("server", 12.0)
+    timings.add("connect", 0.25)
+    timings.add("server", 3.0)
+    assert timings.phases == {"server": 15.0, "connect": 0.25}
+    assert timings.total_ms == 15.25
+    assert timings.summary() == "connect 0.2 | server 15 ms"
+    assert QueryTimings().summary() == ""
+
+
+def test_phase_context_manager_times_its_block():
+    timings = QueryTimings()
+    with timings.phase("format"):
+        pass
+    assert timings.phases["format"] >= 0.0
+
+
+def test_records_are_logged_as_json(caplog):
+    timings = QueryTimings(label="grid", rows=3)
+    timings.add("render", 1.23456)
+    with caplog.at_level(logging.INFO, logger=METRICS_LOGGER):
+        log_timings(timings)
+    assert json.loads(caplog.records[-1].getMessage()) == {
+        "label": "grid", "rows": 3, "render_ms": 1.235, "total_ms": 1.235,
+    }
+
+
+def test_timed_stream_only_times_the_first_read_after_a_flush(monkeypatch):
+    clock = iter([10.0, 10.5, 20.0, 20.25])
+    monkeypatch.setattr("src.metrics.time.perf_counter", lambda: next(clock))
+    raw = io.BytesIO(b"abcdef")
+    stream = TimedStream(raw)
+    assert stream.read(1) == b"a"  # no request pending: not timed
+    stream.flush()
+    assert stream.read(2) == b"bc"
+    assert stream.read(1) == b"d"  # rest of the reply: not timed
+    stream.flush()
+    stream.read(1)
+    assert stream.reply_wait == 0.75
+    assert stream.tell() == 5  # everything else passes through
+
+
+def test_startup_record_is_logged_once_all_milestones_are_reached(caplog, monkeypatch):
+    now = [1.0]
+    monkeypatch.setattr("src.metrics.time.perf_counter", lambda: now[0])
+    timer = StartupTimer(started=0.0, required=("imports", "window"))
+    with caplog.at_level(logging.INFO, logger=METRICS_LOGGER):
+        timer.mark("window")
+        assert not caplog.records
+        now[0] = 1.5
+        timer.mark("imports", tables=3)
+        timer.mark("imports")  # repeated marks keep the first time
+        timer.mark("connect")
+    records = [json.loads(r.getMessage()) for r in caplog.records if r.name == METRICS_LOGGER]
+    assert records == [{"label": "startup", "window_ms": 1000.0, "imports_ms": 1500.0, "tables": 3}]
+    assert timer.marks["connect"] == 1500.0
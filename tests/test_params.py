@@ -0,0 +1,73 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from src.models import Filter
+from src.params import InlineParams, QueryParams, array_literal, sql_literal
+
+
+@pytest.mark.parametrize("value, literal", [
+    (None, "NULL"),
+    (True, "TRUE"),
+    (3, "3"),
+    (Decimal("1.50"), "1.50"),
+    (float("inf"), "'inf'"),
+    ("O'Brien", "'O''Brien'"),
+    (date(2024, 1, 2), "'2024-01-02'"),
+    (datetime(2024, 1, 2, 3, 4, 5), "'2024-01-02T03:04:05'"),
+    (b"\x00\xff", "'\\x00ff'::bytea"),
+    ({"a": [1]}, '\'{"a": [1]}\''),
+])
+def test_sql_literal(value, literal):
+    assert sql_literal(value) == literal
+
+
+def test_array_literal_quotes_and_escapes():
+    assert array_literal(['a', 'b"c', "d\\e"]) == '{"a","b\\"c","d\\\\e"}'
+
+
+def test_placeholders_are_numbered_in_order():
+    params = QueryParams()
+    assert [params.add(v) for v in ("x", 2, None)] == [":p0", ":p1", ":p2"]
+    assert params.values == {"p0": "x", "p1": 2, "p2": None}
+
+
+def test_filter_values_never_reach_the_sql_text():
+    params = QueryParams()
+    sql = Filter(0, "name", "=", "x'; DROP TABLE t; --").to_sql(params)
+    assert sql == '"name" = :p0'
+    assert params.values["p0"] == "x'; DROP TABLE t; --"
+
+
+def test_in_lists_bind_one_array_whatever_their_length():
+    short, long = QueryParams(), QueryParams()
+    short_sql = Filter(0, "id", "IN", "1, 2").to_sql(short)
+    long_sql = Filter(0, "id", "IN", "1, 2, 3, '4'").to_sql(long)
+    assert short_sql == long_sql == '"id" = ANY(:p0)'
+    assert long.values["p0"] == '{"1","2","3","4"}'
+    assert Filter(0, "id", "NOT IN", "1").to_sql(QueryParams()) == '"id" <> ALL(:p0)'
+
+
+def test_inline_in_lists_render_each_literal():
+    assert Filter(0, "id", "IN", "1, 'b'").to_sql() == '"id" IN (\'1\', \'b\')'
+
+
+def test_ilike_wraps_the_value_in_wildcards():
+    params = QueryParams()
+    assert Filter(0, "name", "ILIKE", "ann").to_sql(params) == '"name" ILIKE :p0'
+    assert params.values["p0"] == "%ann%"
+
+
+@pytest.mark.parametrize("operator, sql", [
+    ("=", '"name" IS NULL'),
+    ("!=", '"name" IS NOT NULL'),
+])
+def test_null_filters(operator, sql):
+    params = QueryParams()
+    assert Filter(0, "name", operator, "null").to_sql(params) == sql
+    assert params.values == {}
+
+
+def test_empty_in_list_matches_nothing():
+    assert Filter(0, "id", "IN", " , ").to_sql(InlineParams()) == "1=0"
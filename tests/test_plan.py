@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from src.plan import build_explain_query, parse_explain
+
+ANALYZED = [{
+    "Plan": {
+        "Node Type": "Limit", "Startup Cost": 0.0, "Total Cost": 10.0, "Plan Rows": 10,
+        "Actual Total Time": 5.0, "Actual Rows": 10, "Actual Loops": 1,
+        "Shared Hit Blocks": 12, "Shared Read Blocks": 3,
+        "Plans": [{
+            "Node Type": "Seq Scan", "Relation Name": "items", "Alias": "i",
+            "Startup Cost": 0.0, "Total Cost": 100.0, "Plan Rows": 1000,
+            "Actual Total Time": 4.0, "Actual Rows": 10, "Actual Loops": 1,
+            "Shared Hit Blocks": 10, "Shared Read Blocks": 3,
+        }],
+    },
+    "Planning Time": 0.2,
+    "Execution Time": 5.0,
+}]
+
+
+def test_explain_is_estimate_only_unless_asked_to_analyze():
+    assert build_explain_query("SELECT 1;") == "EXPLAIN (FORMAT JSON) SELECT 1"
+    assert build_explain_query(" SELECT 1 ", analyze=True) == "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) SELECT 1"
+
+
+def test_parse_analyzed_plan():
+    result = parse_explain(json.dumps(ANALYZED))
+    scan = result.root.children[0]
+    assert result.analyzed
+    assert scan.label == "Seq Scan on items i"
+    assert scan.self_ms == 4.0
+    assert result.root.self_ms == 1.0
+    assert result.root.self_hit == 2
+    assert result.heat(scan) == "hot"
+    assert result.hottest(1) == [scan]
+
+
+def test_fewer_rows_than_estimated_below_a_limit_is_not_a_misestimate():
+    result = parse_explain(ANALYZED)
+    assert result.root.children[0].row_misestimate is None
+
+
+def test_parse_estimate_only_plan():
+    result = parse_explain([{"Plan": {"Node Type": "Result", "Total Cost": 0.01, "Plan Rows": 1}}])
+    assert not result.analyzed
+    assert result.total_ms == 0.0
+    assert result.root.row_misestimate is None
+
+
+def test_rejects_other_documents():
+    with pytest.raises(ValueError):
+        parse_explain({"rows": []})
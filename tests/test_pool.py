@@ -0,0 +1,175 @@
+import threading
+import time
+
+import pytest
+
+from src.pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    """Stands in for a driver connection: `broken` makes every round trip fail."""
+
+    def __init__(self):
+        self.open = True
+        self.broken = False
+        self.statements = []
+
+    def run(self, sql):
+        if self.broken:
+            raise OSError("network error")
+        self.statements.append(sql)
+
+
+def make_pool(**kwargs):
+    opened = []
+
+    def factory():
+        conn = FakeConnection()
+        opened.append(conn)
+        return conn
+
+    def closer(conn):
+        conn.open = False
+
+    kwargs.setdefault("reset", lambda conn: conn.run("ROLLBACK"))
+    pool = ConnectionPool(
+        factory=factory,
+        is_alive=lambda conn: conn.open,
+        ping=lambda conn: conn.run("SELECT 1"),
+        closer=closer,
+        **kwargs,
+    )
+    return pool, opened
+
+
+def test_connections_are_reused_within_a_lane():
+    pool, opened = make_pool()
+    with pool.connection("grid") as first:
+        pass
+    with pool.connection("grid") as second:
+        pass
+    assert first is second
+    assert len(opened) == 1
+
+
+def test_lanes_do_not_share_connections():
+    pool, opened = make_pool(lanes={"grid": 1, "long": 1})
+    with pool.connection("long") as long_conn:
+        with pool.connection("grid") as grid_conn:
+            assert grid_conn.raw is not long_conn.raw
+    assert len(opened) == 2
+
+
+def test_unknown_lane_is_rejected():
+    pool, _ = make_pool()
+    with pytest.raises(ValueError):
+        pool.acquire("nope")
+
+
+def test_full_lane_times_out():
+    pool, _ = make_pool(lanes={"grid": 1})
+    held = pool.acquire("grid")
+    with pytest.raises(PoolTimeout):
+        pool.acquire("grid", timeout=0.05)
+    pool.release(held)
+
+
+def test_waiter_gets_the_released_connection():
+    pool, opened = make_pool(lanes={"grid": 1})
+    held = pool.acquire("grid")
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(pool.acquire("grid", timeout=5)))
+    waiter.start()
+    time.sleep(0.05)
+    pool.release(held)
+    waiter.join(timeout=5)
+    assert got and got[0] is held
+    assert len(opened) == 1
+
+
+def test_failed_query_resets_the_session_before_reuse():
+    pool, opened = make_pool()
+    with pytest.raises(RuntimeError):
+        with pool.connection("grid"):
+            raise RuntimeError("query failed")
+    assert opened[0].statements == ["ROLLBACK"]
+    with pool.connection("grid") as pooled:
+        assert pooled.raw is opened[0]
+
+
+def test_dead_socket_is_discarded_even_when_it_looks_alive():
+    # The driver keeps its socket object after a network error, so is_alive
+    # can't tell; the reset round trip must.
+    pool, opened = make_pool()
+    with pytest.raises(OSError):
+        with pool.connection("grid") as pooled:
+            pooled.raw.broken = True
+            pooled.raw.run("SELECT 42")
+    assert not opened[0].open
+    with pool.connection("grid") as pooled:
+        assert pooled.raw is opened[1]
+
+
+def test_failed_connection_is_discarded_without_a_reset_hook():
+    pool, opened = make_pool(reset=None)
+    with pytest.raises(RuntimeError):
+        with pool.connection("grid"):
+            raise RuntimeError("query failed")
+    assert not opened[0].open
+    assert pool.stats()["grid"]["idle"] == 0
+
+
+def test_unhealthy_idle_connection_is_replaced_on_checkout():
+    pool, opened = make_pool(health_check_after=0.0)
+    with pool.connection("grid"):
+        pass
+    opened[0].broken = True
+    with pool.connection("grid") as pooled:
+        assert pooled.raw is opened[1]
+    assert not opened[0].open
+
+
+def test_evict_idle_closes_only_stale_connections():
+    pool, opened = make_pool(lanes={"grid": 2}, max_idle_seconds=60.0)
+    first = pool.acquire("grid")
+    second = pool.acquire("grid")
+    pool.release(first)
+    pool.release(second)
+    first.last_used -= 120
+    pool.evict_idle()
+    assert not opened[0].open
+    assert opened[1].open
+    assert pool.stats()["grid"]["idle"] == 1
+
+
+def test_stale_connections_are_closed_outside_the_lock():
+    pool, _ = make_pool(max_idle_seconds=60.0)
+    lock_held = []
+    pool.closer = lambda conn: lock_held.append(pool._cond._is_owned())
+    with pool.connection("grid") as pooled:
+        pass
+    pooled.last_used -= 120
+    pool.acquire("grid")
+    assert lock_held == [False]
+
+
+def test_closed_pool_refuses_checkouts_and_closes_returned_connections():
+    pool, opened = make_pool()
+    held = pool.acquire("grid")
+    pool.close_all()
+    with pytest.raises(ConnectionError):
+        pool.acquire("grid")
+    pool.release(held)
+    assert not opened[0].open
+
+
+def test_session_reset_probes_idle_connections_too():
+    from src.database import DatabaseConnection
+
+    conn = FakeConnection()
+    conn._transaction_status = b"I"  # pg8000 reports idle after a network error
+    DatabaseConnection._reset_session(conn)
+    assert conn.statements == ["ROLLBACK"]
+    conn.broken = True
+    with pytest.raises(OSError):
+        DatabaseConnection._reset_session(conn)
@@ -0,0 +1,116 @@
+import itertools
+import random
+import sqlite3
+
+import pytest
+
+from src.models import Filter, FilterState, SortCriterion
+from src.params import InlineParams, QueryParams
+from src.query_builder import build_grid_query, build_where, keyset_predicate, paging_key
+
+
+def postgres_order(rows, key):
+    """Sort dict rows like Postgres: NULLs last for ASC, first for DESC."""
+    ordered = list(rows)
+    for criterion in reversed(key):
+        ordered.sort(
+            key=lambda row: (row[criterion.column] is None, row[criterion.column]
+                             if row[criterion.column] is not None else 0),
+            reverse=criterion.direction == "DESC",
+        )
+    return ordered
+
+
+def rows_after(rows, key, cursor, not_null):
+    """Evaluate keyset_predicate over the rows; SQLite's WHERE uses the same three-valued logic."""
+    params = QueryParams()
+    predicate = keyset_predicate(key, [cursor[s.column] for s in key], params, not_null)
+    db = sqlite3.connect(":memory:")
+    db.execute('CREATE TABLE t ("id" INTEGER, "a" INTEGER, "b" INTEGER)')
+    db.executemany("INSERT INTO t VALUES (:id, :a, :b)", rows)
+    return {row_id for (row_id,) in db.execute(f'SELECT "id" FROM t WHERE {predicate}', params.values)}
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_predicate_selects_exactly_the_rows_after_the_cursor(seed):
+    rng = random.Random(seed)
+    rows = [
+        {"id": i, "a": rng.choice([None, 1, 2, 3]), "b": rng.choice([None, 1, 2])}
+        for i in range(25)
+    ]
+    directions = [rng.choice(["ASC", "DESC"]) for _ in range(2)]
+    sorting = [SortCriterion("a", directions[0]), SortCriterion("b", directions[1])]
+    key = paging_key(sorting, ["id"])
+    ordered = postgres_order(rows, key)
+    for position, cursor in enumerate(ordered):
+        expected = {row["id"] for row in ordered[position + 1:]}
+        assert rows_after(rows, key, cursor, not_null={"id"}) == expected
+
+
+@pytest.mark.parametrize("directions", list(itertools.product(["ASC", "DESC"], repeat=2)))
+def test_not_null_columns_in_one_direction_use_a_row_comparison(directions):
+    rows = [{"id": i, "a": i % 3, "b": i % 2} for i in range(12)]
+    key = [SortCriterion("a", directions[0]), SortCriterion("id", directions[1])]
+    predicate = keyset_predicate(key, [1, 4], QueryParams(), not_null={"a", "id"})
+    assert predicate.startswith('("a", "id")') == (directions[0] == directions[1])
+    ordered = postgres_order(rows, key)
+    for position, cursor in enumerate(ordered):
+        expected = {row["id"] for row in ordered[position + 1:]}
+        assert rows_after(rows, key, cursor, not_null={"a", "id"}) == expected
+
+
+def test_nothing_comes_after_the_last_null_in_ascending_order():
+    assert keyset_predicate([SortCriterion("a")], [None], QueryParams()) == "FALSE"
+
+
+def test_leading_not_null_column_gets_an_index_bound():
+    params = QueryParams()
+    key = [SortCriterion("a"), SortCriterion("b")]
+    predicate = keyset_predicate(key, [5, None], params, not_null={"a"})
+    assert predicate.startswith('"a" >= :p')
+
+
+def test_paging_key_appends_the_primary_key_once():
+    key = paging_key([SortCriterion("row", "DESC"), SortCriterion("id", "DESC"), SortCriterion("a")], ["id", "tenant"])
+    assert [(s.column, s.direction) for s in key] == [("id", "DESC"), ("a", "ASC"), ("tenant", "ASC")]
+
+
+def test_where_skips_inactive_filters_and_binds_values():
+    params = QueryParams()
+    filters = [
+        Filter(0, "name", "=", "O'Brien"),
+        Filter(1, "id", ">", "3", state=FilterState.INACTIVE),
+    ]
+    where = build_where(filters, params)
+    assert "O'Brien" not in where
+    assert list(params.values.values()) == ["O'Brien"]
+    assert build_where(filters[1:], params) == ""
+
+
+def test_inline_where_renders_literals():
+    where = build_where([Filter(0, "name", "=", "O'Brien")], InlineParams())
+    assert "'O''Brien'" in where
+
+
+def test_keyset_pages_cover_every_row_once_with_the_same_sql():
+    db = sqlite3.connect(":memory:")
+    db.execute('CREATE TABLE items ("id" INTEGER PRIMARY KEY, "price" INTEGER NOT NULL)')
+    db.executemany("INSERT INTO items VALUES (?, ?)", [(i, (i * 7) % 5) for i in range(1, 24)])
+    sorting = [SortCriterion("price", "DESC")]
+    seen, texts, after = [], set(), None
+    while True:
+        params = QueryParams()
+        sql = build_grid_query(
+            "main", "items", [], sorting, row_limit=5, primary_key=["id"],
+            after_values=after, not_null={"price"}, params=params,
+        )
+        texts.add(sql)
+        page = db.execute(sql.rstrip(";"), params.values).fetchall()
+        if not page:
+            break
+        seen.extend(row[1] for row in page)
+        after = [page[-1][2], page[-1][1]]  # price, id of the last row ("row" comes first)
+    expected = [row_id for (row_id,) in db.execute('SELECT "id" FROM items ORDER BY "price" DESC, "id"')]
+    assert seen == expected
+    # Page 1 has no keyset clause; every later page shares one statement text.
+    assert len(texts) == 2
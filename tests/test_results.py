@@ -0,0 +1,82 @@
+import csv
+from datetime import datetime
+
+from src.query_builder import build_grid_query
+from src.results import FULL_SIZE_PREFIX, PREVIEW_PREFIX, ResultSet, TruncatedText
+from src.utils import write_csv
+
+
+def test_columns_keep_raw_values_and_format_on_demand():
+    result = ResultSet.from_rows(
+        ["id", "doc", "data", "at"], [23, 3802, 17, 1114],
+        [[1, {"a": 1}, b"\x01", datetime(2024, 1, 2, 3, 4, 5, 600)], [None, None, None, None]],
+    )
+    assert result.columns[0] == [1, None]
+    assert result.row(0)[1] == {"a": 1}
+    assert result.formatted_row(0) == ["1", '{"a": 1}', "\\x01", "2024-01-02 03:04:05"]
+    assert result.formatted_row(1) == ["NULL"] * 4
+
+
+def test_from_rows_without_rows_keeps_the_columns():
+    result = ResultSet.from_rows(["a", "b"], None, [])
+    assert len(result) == 0
+    assert result.columns == [[], []]
+
+
+def test_from_driver_reads_names_and_types():
+    result = ResultSet.from_driver([{"name": "id", "type_oid": 23}], [[1], [2]])
+    assert result.column_names == ["id"]
+    assert result.type_oids == [23]
+    assert list(result.rows()) == [[1], [2]]
+
+
+def test_extend_appends_batches():
+    result = ResultSet.from_rows(["id"], [23], [[1]])
+    result.extend(ResultSet.from_rows(["id"], [23], [[2], [3]]))
+    assert result.column_values(0) == [1, 2, 3]
+
+
+def test_formatted_rows_slice():
+    result = ResultSet.from_rows(["id"], [23], [[i] for i in range(5)])
+    assert list(result.formatted_rows(3, 10)) == [["3"], ["4"]]
+
+
+def test_errors():
+    result = ResultSet.from_error("boom")
+    assert result.is_error
+    assert result.formatted_cell(0, 0) == "boom"
+
+
+def test_write_csv_streams_row_generators(tmp_path):
+    result = ResultSet.from_rows(["id", "name"], [23, 25], [[1, "a,b"], [2, None]])
+    more = ResultSet.from_rows(["id", "name"], [23, 25], [[3, 'say "hi"']])
+    path = tmp_path / "out.csv"
+    count = write_csv(str(path), (
+        (batch.column_names, batch.formatted_rows()) for batch in (result, more)
+    ))
+    assert count == 3
+    with open(path, newline="", encoding="utf-8") as f:
+        assert list(csv.reader(f)) == [["id", "name"], ["1", "a,b"], ["2", "NULL"], ["3", 'say "hi"']]
+
+
+def test_wide_column_previews_fold_into_their_columns():
+    driver_columns = [
+        {"name": "row", "type_oid": 20},
+        {"name": "id", "type_oid": 23},
+        {"name": "body", "type_oid": 25},
+        {"name": PREVIEW_PREFIX + "body", "type_oid": 25},
+        {"name": FULL_SIZE_PREFIX + "body", "type_oid": 23},
+    ]
+    rows = [[1, 1, "short", None, None], [2, 2, None, "abc", 5000]]
+    result = ResultSet.from_driver(driver_columns, rows)
+    assert result.column_names == ["row", "id", "body"]
+    assert result.columns[2][0] == "short"
+    cut = result.columns[2][1]
+    assert isinstance(cut, TruncatedText) and cut == "abc" and cut.full_size == 5000
+    assert result.formatted_cell(1, 2) == "abc… [4.9 KB]"
+    assert result.has_truncated(2) and not result.has_truncated(1)
+
+    # The grid query asks for exactly these preview columns.
+    sql = build_grid_query("public", "t", [], [], 50, columns=["id", "body"], truncate={"body"}, truncate_chars=3)
+    assert f'"{PREVIEW_PREFIX}body"' in sql and f'"{FULL_SIZE_PREFIX}body"' in sql
+    assert f'"{PREVIEW_PREFIX}id"' not in sql
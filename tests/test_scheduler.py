@@ -0,0 +1,125 @@
+import threading
+import time
+
+import pytest
+
+from src.scheduler import JobScheduler, Lane
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def scheduler():
+    lanes = {
+        "control": Lane(priority=0, max_concurrent=1, urgent=True),
+        "grid": Lane(priority=1, max_concurrent=1),
+        "long": Lane(priority=3, max_concurrent=1),
+        "prefetch": Lane(priority=4, max_concurrent=1, idle_only=True),
+    }
+    scheduler = JobScheduler(lanes=lanes, max_workers=2)
+    yield scheduler
+    scheduler.shutdown()
+
+
+def test_callbacks_run_only_when_drained(scheduler):
+    results = []
+    scheduler.submit("grid", lambda: 42, on_done=results.append)
+    wait_for(lambda: scheduler.stats()["grid"] == {"pending": 0, "running": 0})
+    assert results == []
+    assert scheduler.drain() == 1
+    assert results == [42]
+
+
+def test_errors_go_to_on_error(scheduler):
+    errors = []
+
+    def fail():
+        raise ValueError("boom")
+
+    scheduler.submit("grid", fail, on_error=errors.append)
+    wait_for(lambda: scheduler.drain() or errors)
+    assert isinstance(errors[0], ValueError)
+
+
+def test_unknown_lane_is_rejected(scheduler):
+    with pytest.raises(ValueError):
+        scheduler.submit("nope", lambda: None)
+
+
+def test_latest_pending_job_with_a_key_wins(scheduler):
+    gate = threading.Event()
+    ran = []
+    scheduler.submit("grid", gate.wait)  # occupies the lane's only slot
+    wait_for(lambda: scheduler.stats()["grid"]["running"] == 1)
+    for page in range(5):
+        scheduler.submit("grid", ran.append, page, key="page")
+    assert scheduler.stats()["grid"]["pending"] == 1
+    gate.set()
+    wait_for(lambda: ran)
+    assert ran == [4]
+
+
+def test_lane_concurrency_is_bounded(scheduler):
+    gate = threading.Event()
+    scheduler.submit("long", gate.wait)
+    scheduler.submit("long", gate.wait)
+    time.sleep(0.05)
+    assert scheduler.stats()["long"] == {"pending": 1, "running": 1}
+    gate.set()
+
+
+def test_urgent_lane_runs_while_shared_workers_are_busy(scheduler):
+    gate = threading.Event()
+    done = threading.Event()
+    scheduler.submit("grid", gate.wait)
+    scheduler.submit("long", gate.wait)
+    wait_for(lambda: scheduler.stats()["long"]["running"] == 1)
+    scheduler.submit("control", done.set)
+    assert done.wait(5)
+    gate.set()
+
+
+def test_idle_only_lane_waits_for_other_work(scheduler):
+    gate = threading.Event()
+    started = threading.Event()
+    scheduler.submit("grid", gate.wait)
+    wait_for(lambda: scheduler.stats()["grid"]["running"] == 1)
+    scheduler.submit("grid", lambda: None)  # queued behind the first
+    scheduler.submit("prefetch", started.set)
+    assert not started.wait(0.1)
+    gate.set()
+    assert started.wait(5)
+
+
+def test_higher_priority_lanes_start_first():
+    lanes = {"grid": Lane(priority=1, max_concurrent=1), "long": Lane(priority=3, max_concurrent=1)}
+    scheduler = JobScheduler(lanes=lanes, max_workers=1)
+    gate = threading.Event()
+    order = []
+    scheduler.submit("grid", gate.wait)
+    wait_for(lambda: scheduler.stats()["grid"]["running"] == 1)
+    scheduler.submit("long", order.append, "long")
+    scheduler.submit("grid", order.append, "grid")
+    gate.set()
+    wait_for(lambda: len(order) == 2)
+    scheduler.shutdown()
+    assert order == ["grid", "long"]
+
+
+def test_shutdown_drops_pending_jobs(scheduler):
+    gate = threading.Event()
+    ran = []
+    scheduler.submit("grid", gate.wait)
+    wait_for(lambda: scheduler.stats()["grid"]["running"] == 1)
+    scheduler.submit("grid", ran.append, 1)
+    scheduler.shutdown()
+    scheduler.submit("grid", ran.append, 2)
+    gate.set()
+    time.sleep(0.05)
+    assert ran == []
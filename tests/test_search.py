@@ -0,0 +1,105 @@
+import pytest
+
+from src.search import TrigramIndex, edit_distance
+
+
+def names(results):
+    return [table for _, table in results]
+
+
+@pytest.fixture
+def index():
+    index = TrigramIndex()
+    index.add("public", "users", ["id", "email"])
+    index.add("public", "orders", ["id", "user_id", "total"])
+    index.add("public", "customers", ["id", "name"])
+    index.add("public", "order_items", ["order_id", "sku"])
+    index.add("sales", "orders", ["id"])
+    return index
+
+
+def test_exact_name_comes_first(index):
+    assert names(index.search("orders"))[:3] == ["orders", "orders", "order_items"]
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("er", {"users", "orders", "customers"}),
+    ("se", {"users"}),
+    ("rs", {"users", "orders", "customers"}),
+    ("u", {"users", "customers"}),
+])
+def test_short_queries_match_anywhere_in_the_name(index, query, expected):
+    assert set(names(index.search(query))) >= expected
+
+
+def test_short_queries_rank_word_prefixes_first():
+    index = TrigramIndex()
+    for table in ("abuse", "users", "user_roles", "status"):
+        index.add("public", table)
+    # By rank alone, the shorter "abuse" and "status" would come first.
+    assert names(index.search("us")) == ["users", "user_roles", "abuse", "status"]
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("usres", "users"),
+    ("odrers", "orders"),
+    ("custmer", "customers"),
+    ("custmoers", "customers"),
+    ("ordre_items", "order_items"),
+])
+def test_typos_still_find_the_table(index, query, expected):
+    assert names(index.search(query))[0] == expected
+
+
+def test_column_names_find_their_tables(index):
+    assert names(index.search("email")) == ["users"]
+    assert "order_items" in names(index.search("sku"))
+
+
+def test_schema_prefix_restricts_the_schema(index):
+    assert index.search("sales.ord") == [("sales", "orders")]
+
+
+def test_preferred_schema_comes_first_within_a_kind_of_match(index):
+    assert index.search("orders", prefer_schema="sales")[0] == ("sales", "orders")
+
+
+def test_unrelated_queries_find_nothing(index):
+    assert index.search("zzzz") == []
+
+
+def test_sync_adds_changes_and_removes_tables(index):
+    index.sync([("public", "users", ["id"]), ("public", "invoices", ["id"])], schemas={"public"})
+    assert names(index.search("invoices")) == ["invoices"]
+    assert index.search("custom") == []
+    assert ("sales", "orders") in index
+    assert names(index.search("email")) == []
+
+
+def test_removed_ids_are_compacted():
+    index = TrigramIndex()
+    for i in range(2000):
+        index.add("public", f"t{i}")
+    for i in range(1500):
+        index.remove("public", f"t{i}")
+    assert len(index) == 500
+    assert len(index._keys) < 2000
+    assert names(index.search("t1999"))[0] == "t1999"
+
+
+@pytest.mark.parametrize("a, b, distance", [
+    ("users", "users", 0),
+    ("usres", "users", 1),   # swap
+    ("user", "users", 1),    # insertion
+    ("usrs", "users", 1),    # deletion
+    ("usets", "users", 1),   # substitution
+    ("suers", "users", 1),
+    ("sures", "users", 2),
+])
+def test_edit_distance(a, b, distance):
+    assert edit_distance(a, b, 2) == distance
+
+
+def test_edit_distance_stops_at_the_limit():
+    assert edit_distance("orders", "customers", 1) == 2
+    assert edit_distance("a", "abcd", 1) == 2